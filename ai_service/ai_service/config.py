@@ -18,6 +18,151 @@ class Settings(BaseSettings):
     AUTH_SERVICE_URL: str = os.getenv("AUTH_SERVICE_URL", "http://localhost:8081/api/v001/user/auth/check") # Example default
     USER_SERVICE_URL: str = "http://user-service:8080/api/v001/users/info"
 
+    # --- Upstream HTTP connection pools ---
+    HTTP_POOL_MAX_CONNECTIONS: int = int(os.getenv("HTTP_POOL_MAX_CONNECTIONS", "100"))
+    HTTP_POOL_MAX_KEEPALIVE: int = int(os.getenv("HTTP_POOL_MAX_KEEPALIVE", "20"))
+    HTTP_POOL_KEEPALIVE_EXPIRY: float = float(os.getenv("HTTP_POOL_KEEPALIVE_EXPIRY", "30.0"))
+    HTTP_CONNECT_TIMEOUT: float = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5.0"))
+    HTTP_POOL_TIMEOUT: float = float(os.getenv("HTTP_POOL_TIMEOUT", "10.0"))
+    LLM_TIMEOUT: float = float(os.getenv("LLM_TIMEOUT", "90.0"))
+    LLM_HTTP2: bool = os.getenv("LLM_HTTP2", "false").lower() in ("1", "true", "yes")
+    AUTH_TIMEOUT: float = float(os.getenv("AUTH_TIMEOUT", "10.0"))
+    USER_SERVICE_TIMEOUT: float = float(os.getenv("USER_SERVICE_TIMEOUT", "10.0"))
+
+    # --- Auth check cache (positive results only; 0 disables) ---
+    AUTH_CACHE_TTL: float = float(os.getenv("AUTH_CACHE_TTL", "30.0"))
+    AUTH_CACHE_MAX_ENTRIES: int = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000"))
+
+    # --- Auth mode: "remote" asks AUTH_SERVICE_URL on every request, "local" verifies the
+    # access token in-process and only calls the auth service for expired/missing tokens ---
+    AUTH_MODE: str = os.getenv("AUTH_MODE", "remote")
+    JWT_JWKS: str = os.getenv("JWT_JWKS", "")  # Inline JWKS JSON: {"keys": [...]}
+    JWT_JWKS_FILE: str = os.getenv("JWT_JWKS_FILE", "")
+    JWT_JWKS_URL: str = os.getenv("JWT_JWKS_URL", "")
+    JWT_JWKS_REFRESH_INTERVAL: float = float(os.getenv("JWT_JWKS_REFRESH_INTERVAL", "300.0"))
+    JWT_HS256_SECRET: str = os.getenv("JWT_HS256_SECRET", "")
+    JWT_LEEWAY: float = float(os.getenv("JWT_LEEWAY", "5.0"))
+
+    # --- PDF render pool ---
+    PDF_WORKERS: int = int(os.getenv("PDF_WORKERS", "2"))  # 0 renders in a thread instead of worker processes
+    PDF_QUEUE_SIZE: int = int(os.getenv("PDF_QUEUE_SIZE", "8"))
+    PDF_RENDER_TIMEOUT: float = float(os.getenv("PDF_RENDER_TIMEOUT", "30.0"))
+    PDF_RETRY_AFTER: int = int(os.getenv("PDF_RETRY_AFTER", "5"))
+    PDF_MP_START_METHOD: str = os.getenv("PDF_MP_START_METHOD", "spawn")
+
+    # --- Rendered PDF cache (content-addressed; the spill dir is optional) ---
+    PDF_CACHE_MAX_BYTES: int = int(os.getenv("PDF_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    PDF_CACHE_SPILL_DIR: str = os.getenv("PDF_CACHE_SPILL_DIR", "")
+    PDF_CACHE_SPILL_MAX_BYTES: int = int(os.getenv("PDF_CACHE_SPILL_MAX_BYTES", str(512 * 1024 * 1024)))
+
+    # --- LLM response cache (LLM_CACHE_TTL=0 disables, empty LLM_CACHE_DB_PATH keeps it memory-only) ---
+    PROMPT_VERSION: str = os.getenv("PROMPT_VERSION", "1")  # Bump when prompt wording in code changes
+    LLM_CACHE_TTL: float = float(os.getenv("LLM_CACHE_TTL", str(24 * 60 * 60)))
+    LLM_CACHE_MAX_ENTRIES: int = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1000"))
+    LLM_CACHE_DB_PATH: str = os.getenv("LLM_CACHE_DB_PATH", "/tmp/ai_service_llm_cache.sqlite3")
+    LLM_CACHE_DB_MAX_ENTRIES: int = int(os.getenv("LLM_CACHE_DB_MAX_ENTRIES", "50000"))
+
+    # --- Outbound LLM scheduler (0 disables a bucket; the provider's x-ratelimit-* headers still apply) ---
+    LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+    LLM_REQUESTS_PER_MINUTE: float = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "30"))
+    LLM_TOKENS_PER_MINUTE: float = float(os.getenv("LLM_TOKENS_PER_MINUTE", "0"))
+    LLM_CHARS_PER_TOKEN: float = float(os.getenv("LLM_CHARS_PER_TOKEN", "3.0"))  # Token estimate for the TPM bucket
+    LLM_QUEUE_TIMEOUT: float = float(os.getenv("LLM_QUEUE_TIMEOUT", "30.0"))  # Max wait for dispatch before 503
+    LLM_RATE_LIMIT_RETRIES: int = int(os.getenv("LLM_RATE_LIMIT_RETRIES", "2"))  # Retries of a 429 after its Retry-After
+
+    # --- LLM backend pool: JSON list of {"name", "url", "model", "api_key" | "api_key_env", "weight", "timeout"};
+    # empty means the single API_URL / MODEL_ID / API_KEY backend ---
+    LLM_BACKENDS: str = os.getenv("LLM_BACKENDS", "")
+    LLM_EWMA_ALPHA: float = float(os.getenv("LLM_EWMA_ALPHA", "0.3"))
+    LLM_BACKEND_COOLDOWN: float = float(os.getenv("LLM_BACKEND_COOLDOWN", "10.0"))  # Seconds a failed backend is skipped
+    LLM_BACKEND_EXPLORE_RATE: float = float(os.getenv("LLM_BACKEND_EXPLORE_RATE", "0.05"))
+    LLM_HEDGE_ENABLED: bool = os.getenv("LLM_HEDGE_ENABLED", "false").lower() in ("1", "true", "yes")
+    LLM_HEDGE_MIN_DELAY: float = float(os.getenv("LLM_HEDGE_MIN_DELAY", "2.0"))  # Floor for the p95-based hedge delay
+
+    # --- Per-task LLM profiles (empty model = MODEL_ID, MAX_TOKENS=0 = derived from the expected output, TIMEOUT=0 = LLM_TIMEOUT) ---
+    LLM_MAX_TOKENS_CAP: int = int(os.getenv("LLM_MAX_TOKENS_CAP", "4096"))
+    LLM_REASONING_TOKENS: int = int(os.getenv("LLM_REASONING_TOKENS", "1536"))  # Headroom for a <think> trace; 0 for non-reasoning models
+    LLM_QUESTIONS_MODEL: str = os.getenv("LLM_QUESTIONS_MODEL", "")
+    LLM_QUESTIONS_TEMPERATURE: float = float(os.getenv("LLM_QUESTIONS_TEMPERATURE", "0.4"))
+    LLM_QUESTIONS_MAX_TOKENS: int = int(os.getenv("LLM_QUESTIONS_MAX_TOKENS", "0"))
+    LLM_QUESTIONS_TIMEOUT: float = float(os.getenv("LLM_QUESTIONS_TIMEOUT", "0"))
+    LLM_EXTRACT_MODEL: str = os.getenv("LLM_EXTRACT_MODEL", "")
+    LLM_EXTRACT_TEMPERATURE: float = float(os.getenv("LLM_EXTRACT_TEMPERATURE", "0.4"))
+    LLM_EXTRACT_MAX_TOKENS: int = int(os.getenv("LLM_EXTRACT_MAX_TOKENS", "0"))
+    LLM_EXTRACT_TIMEOUT: float = float(os.getenv("LLM_EXTRACT_TIMEOUT", "0"))
+    LLM_UPDATE_MODEL: str = os.getenv("LLM_UPDATE_MODEL", "")
+    LLM_UPDATE_TEMPERATURE: float = float(os.getenv("LLM_UPDATE_TEMPERATURE", "0.4"))
+    LLM_UPDATE_MAX_TOKENS: int = int(os.getenv("LLM_UPDATE_MAX_TOKENS", "0"))
+    LLM_UPDATE_TIMEOUT: float = float(os.getenv("LLM_UPDATE_TIMEOUT", "0"))
+    LLM_UPDATE_MODE: str = os.getenv("LLM_UPDATE_MODE", "delta")  # "delta": model returns add/modify/delete ops; "full": whole list. Streamed updates always use "full"
+
+    # --- Reasoning models: options are only sent to models matching LLM_REASONING_MODEL_PATTERNS (comma-separated substrings).
+    # LLM_REASONING_FORMAT: "parsed" (trace in a separate field), "hidden", "raw" or empty to not send it;
+    # LLM_REASONING_EFFORT: provider-specific (e.g. "none"/"default" for qwen3), empty to not send it ---
+    LLM_REASONING_MODEL_PATTERNS: str = os.getenv("LLM_REASONING_MODEL_PATTERNS", "deepseek-r1,qwq,qwen3")
+    LLM_REASONING_FORMAT: str = os.getenv("LLM_REASONING_FORMAT", "parsed")
+    LLM_REASONING_EFFORT: str = os.getenv("LLM_REASONING_EFFORT", "")
+
+    # --- Speculative extraction: /question/get starts a background extraction of the stage-one answers.
+    # Off by default: each speculation is an extra LLM call against LLM_REQUESTS_PER_MINUTE ---
+    SPECULATIVE_EXTRACTION: bool = os.getenv("SPECULATIVE_EXTRACTION", "false").lower() in ("1", "true", "yes")
+    SPECULATIVE_TTL: float = float(os.getenv("SPECULATIVE_TTL", "900"))
+    SPECULATIVE_MAX_ENTRIES: int = int(os.getenv("SPECULATIVE_MAX_ENTRIES", "1000"))
+    SPECULATIVE_MAX_INFLIGHT: int = int(os.getenv("SPECULATIVE_MAX_INFLIGHT", "4"))
+
+    # --- Interview sessions ---
+    SESSION_STORE: str = os.getenv("SESSION_STORE", "memory")  # "memory" or "tarantool"
+    SESSION_TTL: float = float(os.getenv("SESSION_TTL", "86400"))
+    SESSION_MAX_ENTRIES: int = int(os.getenv("SESSION_MAX_ENTRIES", "10000"))
+    SESSION_TARANTOOL_HOST: str = os.getenv("SESSION_TARANTOOL_HOST", "127.0.0.1")
+    SESSION_TARANTOOL_PORT: int = int(os.getenv("SESSION_TARANTOOL_PORT", "3301"))
+    SESSION_TARANTOOL_USER: str = os.getenv("SESSION_TARANTOOL_USER", "")
+    SESSION_TARANTOOL_PASSWORD: str = os.getenv("SESSION_TARANTOOL_PASSWORD", "")
+    SESSION_TARANTOOL_SPACE: str = os.getenv("SESSION_TARANTOOL_SPACE", "ai_sessions")
+
+    # --- Asynchronous PDF jobs: finished PDFs go to the S3-compatible bucket (MinIO) and are handed out as presigned URLs.
+    # An empty PDF_STORAGE_ENDPOINT disables the job API. PDF_STORAGE_PUBLIC_ENDPOINT is the host clients can reach,
+    # if it differs from the one the service uses (URLs are signed for it) ---
+    PDF_STORAGE_ENDPOINT: str = os.getenv("PDF_STORAGE_ENDPOINT", "")
+    PDF_STORAGE_PUBLIC_ENDPOINT: str = os.getenv("PDF_STORAGE_PUBLIC_ENDPOINT", "")
+    PDF_STORAGE_ACCESS_KEY: str = os.getenv("PDF_STORAGE_ACCESS_KEY", "")
+    PDF_STORAGE_SECRET_KEY: str = os.getenv("PDF_STORAGE_SECRET_KEY", "")
+    PDF_STORAGE_SECURE: bool = os.getenv("PDF_STORAGE_SECURE", "false").lower() in ("1", "true", "yes")
+    PDF_STORAGE_REGION: str = os.getenv("PDF_STORAGE_REGION", "us-east-1")
+    PDF_STORAGE_BUCKET: str = os.getenv("PDF_STORAGE_BUCKET", "users-resume-pdf")
+    PDF_STORAGE_PREFIX: str = os.getenv("PDF_STORAGE_PREFIX", "ai-service/")
+    PDF_URL_TTL: int = int(os.getenv("PDF_URL_TTL", "900"))
+    PDF_JOB_TTL: float = float(os.getenv("PDF_JOB_TTL", "3600"))
+    PDF_JOB_MAX_ENTRIES: int = int(os.getenv("PDF_JOB_MAX_ENTRIES", "1000"))
+    PDF_JOB_CONCURRENCY: int = int(os.getenv("PDF_JOB_CONCURRENCY", "2"))
+    PDF_JOB_MAX_PENDING: int = int(os.getenv("PDF_JOB_MAX_PENDING", "100"))
+
+    # --- Batch extraction (/label/generate/batch); items run at BACKGROUND priority ---
+    BATCH_MAX_ITEMS: int = int(os.getenv("BATCH_MAX_ITEMS", "1000"))
+    BATCH_MAX_BYTES: int = int(os.getenv("BATCH_MAX_BYTES", str(10 * 1024 * 1024)))
+    BATCH_CONCURRENCY: int = int(os.getenv("BATCH_CONCURRENCY", "4"))
+    BATCH_BUSY_RETRIES: int = int(os.getenv("BATCH_BUSY_RETRIES", "3"))
+
+    # --- Metrics (Prometheus text format; the path is not behind the auth middleware) ---
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+    METRICS_PATH: str = os.getenv("METRICS_PATH", "/metrics")
+
+    # --- Per-request tracing: Server-Timing header, X-Request-ID and an optional span log.
+    # SPAN_LOG: "" (off), "log" (one JSON line per request via the ai_service.spans logger) or "otlp" (OTLP/JSON lines to SPAN_LOG_FILE) ---
+    SERVER_TIMING_ENABLED: bool = os.getenv("SERVER_TIMING_ENABLED", "true").lower() in ("1", "true", "yes")
+    REQUEST_ID_HEADER: str = os.getenv("REQUEST_ID_HEADER", "X-Request-ID")
+    SPAN_LOG: str = os.getenv("SPAN_LOG", "")
+    SPAN_LOG_FILE: str = os.getenv("SPAN_LOG_FILE", "spans.otlp.jsonl")
+
+    # --- Event loop monitor: logs the loop thread's stack when it is blocked longer than LOOP_STALL_THRESHOLD ---
+    LOOP_MONITOR_ENABLED: bool = os.getenv("LOOP_MONITOR_ENABLED", "true").lower() in ("1", "true", "yes")
+    LOOP_LAG_INTERVAL: float = float(os.getenv("LOOP_LAG_INTERVAL", "0.1"))
+    LOOP_STALL_THRESHOLD: float = float(os.getenv("LOOP_STALL_THRESHOLD", "0.5"))
+
+    # --- Debug endpoints (/debug/*): off unless DEBUG_TOKEN is set; requests must send it in X-Debug-Token ---
+    DEBUG_TOKEN: str = os.getenv("DEBUG_TOKEN", "")
+    PROFILE_MAX_SECONDS: float = float(os.getenv("PROFILE_MAX_SECONDS", "60"))
+
     SYSTEM_PROMPT: str = """Ты профессиональный HR-ассистент для IT-сферы. Твоя задача - извлечь ключевую информацию из ответов пользователя и представить ее в структурированном виде.
 
 ### Правила извлечения:
@@ -99,6 +244,28 @@ class Settings(BaseSettings):
     В ответе НЕ ДОЛЖНО БЫТЬ ничего, кроме самого JSON-списка (никаких объяснений, json оберток и т.д.). Ответ должен быть напрямую парсируемым json.loads().
     """
 
+    UPDATE_DELTA_PROMPT: str = """Ты профессиональный HR-ассистент. Твоя задача - определить, какие изменения нужно внести в структурированные данные резюме на основе дополнительной информации от пользователя.
+    Входные данные:
+    Текущие структурированные данные: пары label-value.
+    Дополнительная информация/инструкции: текст от пользователя с указаниями, что изменить, добавить или удалить.
+    Правила:
+    Верни ТОЛЬКО изменения, а не весь список. Пары, которые не затронуты, НЕ включай в ответ.
+    "modify" - заменить value существующего label (label пиши точно так же, как в текущих данных); полное новое value, а не только добавку.
+    "add" - новая пара, которой не было. Придумай подходящий label.
+    "delete" - удалить существующий label, если пользователь явно просит об этом или новая информация делает его неактуальным.
+    Сами label и value могут быть ТОЛЬКО строками.
+    Формат ответа:
+    СТРОГО JSON-объект вида:
+    {"operations": [
+    {"op": "modify", "label": "Базы данных", "value": "PostgreSQL, Redis, ClickHouse"},
+    {"op": "add", "label": "Контейнеризация", "value": "Docker, Kubernetes"},
+    {"op": "delete", "label": "Фреймворки Frontend"}
+    ]}
+    Если ничего менять не нужно, верни {"operations": []}.
+    Обязательно используй ДВОЙНЫЕ кавычки для всех строк и ключей в JSON.
+    В ответе НЕ ДОЛЖНО БЫТЬ ничего, кроме самого JSON-объекта. Ответ должен быть напрямую парсируемым json.loads().
+    """
+
 
     BASE_QUESTIONS: list[str] = [ # Explicitly typed as list[str]
         "Сколько лет вы занимаетесь программированием?",
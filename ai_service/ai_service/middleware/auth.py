@@ -1,11 +1,58 @@
-    from fastapi import Request, status, HTTPException
+import hashlib
+from typing import Dict, Optional, Tuple
+
+from fastapi import Request, status, HTTPException
 from fastapi.responses import JSONResponse
 import httpx
 from ai_service.config import settings
+from ai_service.services.cache import SingleFlight, TTLCache
+from ai_service.services.http_clients import http_clients
+from ai_service.services.jwt_verifier import TokenStatus, jwt_verifier
+from ai_service.services.metrics import record_upstream_error, track
 
 ACCESS_TOKEN_COOKIE_NAME = "Authorization"
 REFRESH_TOKEN_COOKIE_NAME = "Refresh-Token"
 
+# Positive auth results only; 401/403 and upstream errors are never cached.
+_auth_cache = TTLCache(maxsize=settings.AUTH_CACHE_MAX_ENTRIES, ttl=settings.AUTH_CACHE_TTL)
+_auth_singleflight = SingleFlight()
+
+
+def auth_stats() -> Dict[str, Dict[str, int]]:
+    """Counters of the auth result cache and of the coalesced remote checks, for the metrics endpoint."""
+    return {"cache": _auth_cache.stats(), "singleflight": _auth_singleflight.stats()}
+
+
+def _auth_cache_key(access_token: Optional[str], refresh_token: Optional[str]) -> str:
+    """Hashes the session cookies so raw tokens are never kept as cache keys."""
+    digest = hashlib.sha256()
+    digest.update((access_token or "").encode("utf-8"))
+    digest.update(b"\0")
+    digest.update((refresh_token or "").encode("utf-8"))
+    return digest.hexdigest()
+
+
+async def _check_remote(access_token: Optional[str], refresh_token: Optional[str]) -> Tuple[int, str]:
+    """Asks the auth service about the session. Returns its status code and response body."""
+    auth_service_cookies = {}
+    if access_token:
+         auth_service_cookies[ACCESS_TOKEN_COOKIE_NAME] = access_token
+    if refresh_token:
+         auth_service_cookies[REFRESH_TOKEN_COOKIE_NAME] = refresh_token
+
+    with track("auth"):
+        try:
+            response = await http_clients.auth.get(
+                settings.AUTH_SERVICE_URL,
+                cookies=auth_service_cookies,
+            )
+        except httpx.RequestError:
+            record_upstream_error("auth", None)
+            raise
+    if response.status_code not in (200, 204, 401, 403):
+        record_upstream_error("auth", response.status_code)
+    return response.status_code, response.text
+
 async def verify_tokens_via_cookies(request: Request, call_next):
     if request.method == "OPTIONS":
         return await call_next(request)
@@ -13,7 +60,7 @@ async def verify_tokens_via_cookies(request: Request, call_next):
     docs_url = getattr(request.app, "docs_url", "/docs")
     redoc_url = getattr(request.app, "redoc_url", "/redoc")
     openapi_url = getattr(request.app, "openapi_url", "/openapi.json")
-    if request.url.path in [docs_url, redoc_url, openapi_url]:
+    if request.url.path in [docs_url, redoc_url, openapi_url, settings.METRICS_PATH]:
          return await call_next(request)
 
     access_token = request.cookies.get(ACCESS_TOKEN_COOKIE_NAME)
@@ -27,50 +74,58 @@ async def verify_tokens_via_cookies(request: Request, call_next):
 
     if not access_token:
          print(f"Warning: Missing '{ACCESS_TOKEN_COOKIE_NAME}' cookie, proceeding with refresh token only.")
+    elif jwt_verifier.enabled:
+        token_status, claims = jwt_verifier.verify(access_token)
+        if token_status == TokenStatus.VALID:
+            request.state.user_id = claims.get("sub")
+            return await call_next(request)
+        if token_status == TokenStatus.INVALID:
+            print(f"Authentication failed (Local token verification) for request to {request.url.path}")
+            return JSONResponse(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                content={"detail": "Authentication failed: Invalid session or token"},
+            )
+        # Expired or signed with an unknown key: let the auth service decide (it may accept the refresh token).
 
-    async with httpx.AsyncClient() as client:
-        try:
-            auth_service_cookies = {}
-            if access_token:
-                 auth_service_cookies[ACCESS_TOKEN_COOKIE_NAME] = access_token
-            if refresh_token:
-                 auth_service_cookies[REFRESH_TOKEN_COOKIE_NAME] = refresh_token
+    cache_key = _auth_cache_key(access_token, refresh_token)
+    if _auth_cache.get(cache_key):
+        return await call_next(request)
 
-            response = await client.get(
-                settings.AUTH_SERVICE_URL,
-                cookies=auth_service_cookies,
-                timeout=10.0
-            )
+    try:
+        status_code, body = await _auth_singleflight.do(
+            cache_key, lambda: _check_remote(access_token, refresh_token)
+        )
 
-            if response.status_code in [200, 204]:
-                print(f"Authentication successful (Status: {response.status_code}) for request to {request.url.path}")
-                return await call_next(request)
-            elif response.status_code in [401, 403]:
-                print(f"Authentication failed (Auth service returned {response.status_code}) for request to {request.url.path}")
-                return JSONResponse(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    content={"detail": "Authentication failed: Invalid session or token"},
-                )
-            else:
-                print(f"Error communicating with auth service (Unexpected Status: {response.status_code}) for request to {request.url.path}")
-                body = await response.text()
-                print(f"Auth service response body (if any): {body}")
-                return JSONResponse(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    content={"detail": "Could not verify authentication due to an internal error"},
-                )
-
-        except httpx.RequestError as exc:
-            print(f"Error calling authentication service at {settings.AUTH_SERVICE_URL}: {exc}")
+        if status_code in [200, 204]:
+            print(f"Authentication successful (Status: {status_code}) for request to {request.url.path}")
+            _auth_cache.set(cache_key, True)
+        elif status_code in [401, 403]:
+            print(f"Authentication failed (Auth service returned {status_code}) for request to {request.url.path}")
             return JSONResponse(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                content={"detail": f"Authentication service unavailable: {exc}"},
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                content={"detail": "Authentication failed: Invalid session or token"},
             )
-        except Exception as exc:
-             print(f"Unexpected Python error during authentication processing: {exc}")
-             import traceback
-             traceback.print_exc()
-             return JSONResponse(
-                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                 content={"detail": f"An unexpected internal error occurred during authentication processing"},
-             )
+        else:
+            print(f"Error communicating with auth service (Unexpected Status: {status_code}) for request to {request.url.path}")
+            print(f"Auth service response body (if any): {body}")
+            return JSONResponse(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                content={"detail": "Could not verify authentication due to an internal error"},
+            )
+
+    except httpx.RequestError as exc:
+        print(f"Error calling authentication service at {settings.AUTH_SERVICE_URL}: {exc}")
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"detail": f"Authentication service unavailable: {exc}"},
+        )
+    except Exception as exc:
+         print(f"Unexpected Python error during authentication processing: {exc}")
+         import traceback
+         traceback.print_exc()
+         return JSONResponse(
+             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+             content={"detail": f"An unexpected internal error occurred during authentication processing"},
+         )
+
+    return await call_next(request)
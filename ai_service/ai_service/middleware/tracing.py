@@ -0,0 +1,49 @@
+import uuid
+from typing import AsyncIterator
+
+from fastapi import Request
+
+from ai_service.config import settings
+from ai_service.services.request_trace import RequestTrace, end_trace, span_log, start_trace
+
+
+async def _emit_after_body(body: AsyncIterator[bytes], trace: RequestTrace) -> AsyncIterator[bytes]:
+    """Passes the body through and writes the span once it has been sent, so streamed responses are complete."""
+    try:
+        async for chunk in body:
+            yield chunk
+    finally:
+        trace.finish(trace.status_code or 200)
+        span_log.emit(trace)
+
+
+async def trace_requests(request: Request, call_next):
+    """
+    Outermost middleware: makes a RequestTrace current for the request, so every tracked stage (auth, user service,
+    LLM queue/calls, parsing, PDF rendering) lands in it. Adds X-Request-ID and Server-Timing to the response.
+    Server-Timing only covers what finished before the headers went out; for streams the span log has the full picture.
+    """
+    trace = RequestTrace(
+        (request.headers.get(settings.REQUEST_ID_HEADER) or "")[:128] or uuid.uuid4().hex,
+        request.method,
+        request.url.path,
+        request.headers.get("traceparent"),
+    )
+    token = start_trace(trace)
+    try:
+        response = await call_next(request)
+    except Exception:
+        trace.finish(500)
+        if span_log.enabled:
+            span_log.emit(trace)
+        raise
+    finally:
+        end_trace(token)
+
+    trace.status_code = response.status_code
+    response.headers[settings.REQUEST_ID_HEADER] = trace.request_id
+    if settings.SERVER_TIMING_ENABLED:
+        response.headers["Server-Timing"] = trace.server_timing()
+    if span_log.enabled:
+        response.body_iterator = _emit_after_body(response.body_iterator, trace)
+    return response
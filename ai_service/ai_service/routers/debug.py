@@ -0,0 +1,45 @@
+import hmac
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+
+from ai_service.config import settings
+from ai_service.services.loop_monitor import loop_monitor
+from ai_service.services.profiler import ProfilerBusy, sampling_profiler
+
+DEBUG_TOKEN_HEADER = "X-Debug-Token"
+
+router = APIRouter(prefix="/debug", tags=["Debug"], include_in_schema=False)
+
+
+def _check_debug_token(token: Optional[str]) -> None:
+    """Debug endpoints answer 404 unless DEBUG_TOKEN is configured and sent, on top of the normal auth check."""
+    if not settings.DEBUG_TOKEN or not token or not hmac.compare_digest(token, settings.DEBUG_TOKEN):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+
+
+@router.get("/profile", response_class=PlainTextResponse)
+async def profile(
+    seconds: float = Query(10.0, gt=0),
+    hz: int = Query(100, ge=1, le=1000),
+    loop_only: bool = Query(False, description="Sample only the event loop thread."),
+    x_debug_token: Optional[str] = Header(None),
+):
+    """
+    Samples the live process for `seconds` and returns collapsed stacks ("thread;frame;...;frame count"),
+    ready for flamegraph.pl / speedscope. One profile at a time.
+    """
+    _check_debug_token(x_debug_token)
+    try:
+        collapsed = await sampling_profiler.profile(min(seconds, settings.PROFILE_MAX_SECONDS), hz, loop_only)
+    except ProfilerBusy:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="A profile is already running.")
+    return PlainTextResponse(collapsed)
+
+
+@router.get("/loop")
+async def loop_stats(x_debug_token: Optional[str] = Header(None)):
+    """Event loop monitor state: worst lag seen and the number of stalls."""
+    _check_debug_token(x_debug_token)
+    return loop_monitor.stats()
@@ -0,0 +1,124 @@
+from typing import Any, Dict, Iterable, Iterator, Tuple
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from ai_service.config import settings
+from ai_service.middleware.auth import auth_stats
+from ai_service.routers.resume_1 import neural_service, pdf_render_stats
+from ai_service.services.llm_cache import llm_response_cache
+from ai_service.services.metrics import Sample, registry
+from ai_service.services.pdf_cache import pdf_result_cache
+from ai_service.services.pdf_jobs import pdf_jobs
+from ai_service.services.pdf_pool import pdf_render_pool
+from ai_service.services.speculation import speculative_extractions
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+router = APIRouter(tags=["Metrics"])
+
+MetricFamily = Tuple[str, str, str, Iterable[Sample]]
+
+
+def _by_key(stats: Dict[str, Any], label: str, keys: Iterable[str]) -> Iterable[Sample]:
+    return [({label: key}, stats[key]) for key in keys if key in stats]
+
+
+def _llm_collector() -> Iterator[MetricFamily]:
+    scheduler = neural_service.scheduler.stats()
+    yield "llm_scheduler_active", "gauge", "LLM requests holding a scheduler slot.", [({}, scheduler["active"])]
+    yield "llm_scheduler_queue_depth", "gauge", "LLM requests waiting for a scheduler slot.", [({}, scheduler["queue_depth"])]
+    yield "llm_scheduler_backoff_seconds", "gauge", "Remaining provider back-off after a 429.", [({}, scheduler["backoff_s"])]
+    yield "llm_scheduler_events_total", "counter", "Scheduler dispatches, queue timeouts, rate limits and extra (hedge/failover) attempts.", _by_key(
+        scheduler, "event", ("dispatched", "queue_timeouts", "rate_limited", "extra_attempts")
+    )
+    yield "llm_scheduler_wait_seconds_total", "counter", "Total time spent waiting for dispatch, by priority.", [
+        ({"priority": priority}, wait["total_s"]) for priority, wait in scheduler["wait"].items()
+    ]
+    yield "llm_scheduler_waits_total", "counter", "Requests dispatched, by priority.", [
+        ({"priority": priority}, wait["count"]) for priority, wait in scheduler["wait"].items()
+    ]
+
+    pool = neural_service.backends.stats()
+    yield "llm_pool_events_total", "counter", "Backend pool failovers and hedged requests.", _by_key(
+        pool, "event", ("failovers", "hedges", "hedge_wins", "hedges_skipped")
+    )
+    backends = pool["backends"]
+    yield "llm_backend_requests_total", "counter", "Requests sent per LLM backend.", [
+        ({"backend": name}, stats["requests"]) for name, stats in backends.items()
+    ]
+    yield "llm_backend_failures_total", "counter", "Failed requests per LLM backend.", [
+        ({"backend": name}, stats["failures"]) for name, stats in backends.items()
+    ]
+    yield "llm_backend_latency_ewma_seconds", "gauge", "Smoothed latency per LLM backend.", [
+        ({"backend": name}, stats["ewma_s"]) for name, stats in backends.items()
+    ]
+    yield "llm_backend_latency_p95_seconds", "gauge", "Recent p95 latency per LLM backend.", [
+        ({"backend": name}, stats["p95_s"]) for name, stats in backends.items()
+    ]
+    yield "llm_backend_cooling_down", "gauge", "1 while a backend is in cooldown after failures.", [
+        ({"backend": name}, stats["cooling_down"]) for name, stats in backends.items()
+    ]
+
+    reasoning = neural_service.reasoning.stats()
+    yield "llm_reasoning_events_total", "counter", "Responses and reasoning tokens from reasoning models.", _by_key(
+        reasoning, "event", ("responses", "responses_with_reasoning", "reasoning_tokens", "reasoning_tokens_estimated")
+    )
+    yield "llm_json_repairs_total", "counter", "LLM JSON outputs repaired locally, or left unrepairable.", _by_key(
+        neural_service.repair_counters, "outcome", ("repaired", "unrepairable")
+    )
+    yield "llm_singleflight_total", "counter", "Identical LLM requests started vs. coalesced onto one in flight.", _by_key(
+        neural_service.singleflight_stats(), "outcome", ("started", "coalesced")
+    )
+
+
+def _cache_collector() -> Iterator[MetricFamily]:
+    llm_cache = llm_response_cache.stats()
+    yield "llm_cache_events_total", "counter", "LLM response cache hits, misses and writes.", _by_key(
+        llm_cache, "event", ("memory_hits", "disk_hits", "misses", "bypassed", "writes", "evictions")
+    )
+    yield "llm_cache_entries", "gauge", "LLM responses held in memory.", [({}, llm_cache["memory_size"])]
+
+    pdf_cache = pdf_result_cache.stats()
+    yield "pdf_cache_events_total", "counter", "Rendered PDF cache hits and misses.", _by_key(pdf_cache, "event", ("hits", "misses"))
+    yield "pdf_cache_bytes", "gauge", "Bytes of rendered PDFs held in memory.", [({}, pdf_cache["bytes"])]
+
+    auth = auth_stats()
+    yield "auth_cache_events_total", "counter", "Auth result cache hits, misses and evictions.", _by_key(
+        auth["cache"], "event", ("hits", "misses", "evictions")
+    )
+    flights = {"auth": auth["singleflight"], "pdf": pdf_render_stats()}
+    yield "singleflight_total", "counter", "Calls started vs. coalesced onto one in flight.", [
+        ({"name": name, "outcome": outcome}, stats[outcome])
+        for outcome in ("started", "coalesced") for name, stats in flights.items()
+    ]
+
+
+def _background_collector() -> Iterator[MetricFamily]:
+    yield "pdf_pool_pending", "gauge", "PDF renders running or queued in the render pool.", [({}, pdf_render_pool.pending)]
+    yield "pdf_pool_restarts_total", "counter", "PDF render pools replaced after a worker died or a render timed out.", [
+        ({}, pdf_render_pool.restarts)
+    ]
+
+    jobs = pdf_jobs.stats()
+    yield "pdf_jobs_events_total", "counter", "Asynchronous PDF job outcomes and uploads.", _by_key(
+        jobs, "event", ("submitted", "done", "failed", "uploads", "upload_skips", "rejected")
+    )
+    yield "pdf_jobs_pending", "gauge", "Asynchronous PDF jobs not finished yet.", [({}, jobs["pending"])]
+
+    speculation = speculative_extractions.stats()
+    yield "speculative_extractions_total", "counter", "Speculative extractions started and how they were used.", _by_key(
+        speculation, "event", ("started", "skipped_busy", "failed", "exact_hits", "superset_hits", "misses", "preempted")
+    )
+    yield "speculative_extractions_inflight", "gauge", "Speculative extractions running.", [({}, speculation["inflight"])]
+
+
+registry.add_collector(_llm_collector)
+registry.add_collector(_cache_collector)
+registry.add_collector(_background_collector)
+
+
+@router.get(settings.METRICS_PATH, response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint (not behind the auth middleware)."""
+    return PlainTextResponse(registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -1,18 +1,35 @@
+import asyncio
+import hashlib
+import json
 import logging
 import datetime
+from urllib.parse import quote
 import traceback
 from fastapi import APIRouter, Body, HTTPException, status, Response, Request
-from typing import List, Dict, Any
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, List, Dict, Any, Optional
 from ai_service.services.neural_1 import NeuralService
-from ai_service.services.pdf_generator import create_resume_pdf
-from pydantic import BaseModel, Field
+from ai_service.services.cache import SingleFlight
+from ai_service.services.llm_cache import LLM_CACHE_BYPASS_HEADER
+from ai_service.services.pdf_cache import pdf_cache_key, pdf_result_cache
+from ai_service.services.llm_scheduler import LLMBusy, Priority
+from ai_service.services.speculation import speculative_extractions
+from ai_service.services.batch import BatchProgress, fan_out
+from ai_service.services.metrics import record_upstream_error, track
+from ai_service.middleware.auth import ACCESS_TOKEN_COOKIE_NAME, REFRESH_TOKEN_COOKIE_NAME
+from ai_service.services.pdf_pool import PDFPoolBusy, PDFRenderTimeout, pdf_render_pool
+from ai_service.services.pdf_jobs import PDFJob, pdf_jobs
+from ai_service.services.http_clients import http_clients
+from pydantic import BaseModel, Field, ValidationError
 import httpx
 
 from ai_service.schemas.resume_1 import (
     UserAnswers,
     UpdateRequest,
     QuestionsResponse,
-    LabelValueItem
+    LabelValueItem,
+    PDFJobResponse,
+    BatchItem
 )
 
 from ai_service.config import settings
@@ -35,25 +52,292 @@ class UpdatedResumeSectionResponse(BaseModel):
 
 
 async def _get_user_info(user_service_url: str, headers: Dict[str, str]) -> Dict[str, Any]:
-    async with httpx.AsyncClient() as client:
-        try:
-            log.debug(f"Requesting user info from: {user_service_url}")
+    client = http_clients.user
+    try:
+        log.debug(f"Requesting user info from: {user_service_url}")
+        with track("user_service"):
             response = await client.get(user_service_url, headers=headers)
-            response.raise_for_status()
-            user_data = response.json()
-            log.debug(f"Successfully retrieved user info: {list(user_data.keys())}")
-            return user_data
-        except httpx.HTTPStatusError as exc:
-            log.error(f"HTTP error occurred while requesting user info: {exc.response.status_code} - {exc.response.text}")
-            if exc.response.status_code == 404:
-                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User info not found.")
-            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=f"User service failed with status {exc.response.status_code}.")
-        except httpx.RequestError as exc:
-            log.error(f"Network error occurred while requesting user info: {exc}")
-            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=f"Could not connect to user service: {exc}")
+        response.raise_for_status()
+        user_data = response.json()
+        log.debug(f"Successfully retrieved user info: {list(user_data.keys())}")
+        return user_data
+    except httpx.HTTPStatusError as exc:
+        log.error(f"HTTP error occurred while requesting user info: {exc.response.status_code} - {exc.response.text}")
+        record_upstream_error("user_service", exc.response.status_code)
+        if exc.response.status_code == 404:
+             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User info not found.")
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=f"User service failed with status {exc.response.status_code}.")
+    except httpx.RequestError as exc:
+        log.error(f"Network error occurred while requesting user info: {exc}")
+        record_upstream_error("user_service", None)
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=f"Could not connect to user service: {exc}")
+    except Exception as e:
+        log.error(f"An unexpected error occurred during user info retrieval: {e}", exc_info=True)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to retrieve user info due to an internal error.")
+
+def _llm_busy_error(busy: LLMBusy) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="The language model is busy, please retry later.",
+        headers={"Retry-After": str(busy.retry_after)}
+    )
+
+def _request_subject(request: Request) -> Optional[str]:
+    """Who the request belongs to (speculative extractions, interview sessions): the verified user id, else a hash of the session cookie."""
+    user_id = getattr(request.state, "user_id", None)
+    if user_id:
+        return f"user:{user_id}"
+    session = request.cookies.get(REFRESH_TOKEN_COOKIE_NAME) or request.cookies.get(ACCESS_TOKEN_COOKIE_NAME)
+    if not session:
+        return None
+    return "session:" + hashlib.sha256(session.encode("utf-8")).hexdigest()
+
+def _start_speculative_extraction(request: Request, answers: Dict[str, str]) -> None:
+    if not _llm_cache_allowed(request):
+        return  # /label/generate only looks speculations up for requests that allow cached results
+    speculative_extractions.start(
+        _request_subject(request), answers,
+        lambda: neural_service.process_answers(answers, priority=Priority.BACKGROUND, coalesce=False),
+    )
+
+async def _speculative_extraction(request: Request, answers: Dict[str, str]) -> Optional[List[Dict[str, Any]]]:
+    """Finishes a speculative extraction of a subset of these answers, or returns None if there is none."""
+    speculative = await speculative_extractions.lookup(_request_subject(request), answers)
+    if speculative is None:
+        return None
+    base_result, extra_answers = speculative
+    return await neural_service.refine_extraction(answers, base_result, extra_answers)
+
+async def _iterate(items: List[Dict[str, Any]]) -> AsyncIterator[Dict[str, Any]]:
+    for item in items:
+        yield item
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against our ETag (RFC 9110, 13.1.2)."""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+
+def _llm_cache_allowed(request: Request) -> bool:
+    """Clients can force a fresh LLM generation with the bypass header or Cache-Control: no-cache."""
+    if request.headers.get(LLM_CACHE_BYPASS_HEADER, "").lower() in ("1", "true", "yes"):
+        return False
+    return "no-cache" not in request.headers.get("Cache-Control", "").lower()
+
+
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def _sse(event: str, data: Any) -> str:
+    """Formats one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def _stream_mode(request: Request) -> Optional[str]:
+    """Picks the streaming flavour from ?stream= or the Accept header; None means a regular JSON response."""
+    requested = request.query_params.get("stream", "").lower()
+    if requested in ("ndjson", "sse"):
+        return requested
+    accept = request.headers.get("Accept", "")
+    if NDJSON_MEDIA_TYPE in accept:
+        return "ndjson"
+    if "text/event-stream" in accept:
+        return "sse"
+    return None
+
+
+def _label_value_stream_response(mode: str, items: AsyncIterator[Dict[str, Any]], endpoint: str) -> StreamingResponse:
+    """
+    Streams validated label/value items as NDJSON lines or SSE `item` events.
+    The stream ends with a `done` record ({"count"}) or an `error` record ({"detail"}).
+    """
+
+    def encode(kind: str, data: Any) -> str:
+        if mode == "sse":
+            return _sse(kind, data)
+        return json.dumps(data if kind == "item" else {kind: data}, ensure_ascii=False) + "\n"
+
+    async def body():
+        count = 0
+        try:
+            async for item in items:
+                try:
+                    item = LabelValueItem(**item).model_dump()
+                except ValidationError as e:
+                    log.warning(f"Skipping streamed item that does not match LabelValueItem: {item} ({e})")
+                    continue
+                yield encode("item", item)
+                count += 1
+            yield encode("done", {"count": count})
         except Exception as e:
-            log.error(f"An unexpected error occurred during user info retrieval: {e}", exc_info=True)
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to retrieve user info due to an internal error.")
+            log.error(f"Error in {endpoint} stream: {e}", exc_info=True)
+            yield encode("error", {"detail": f"Failed to generate structured resume. Error: {str(e)}"})
+
+    media_type = "text/event-stream" if mode == "sse" else NDJSON_MEDIA_TYPE
+    return StreamingResponse(body(), media_type=media_type, headers=SSE_HEADERS)
+
+
+async def _read_batch_body(request: Request) -> bytes:
+    """Reads the upload, refusing it with 413 as soon as it is known to exceed BATCH_MAX_BYTES."""
+    too_large = HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"A batch upload may be at most {settings.BATCH_MAX_BYTES} bytes.",
+    )
+    content_length = request.headers.get("Content-Length")
+    if content_length and content_length.isdigit() and int(content_length) > settings.BATCH_MAX_BYTES:
+        raise too_large
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > settings.BATCH_MAX_BYTES:
+            raise too_large
+    return bytes(body)
+
+
+def _parse_batch(body: bytes, content_type: str) -> List[Any]:
+    """Batch records from an NDJSON upload (one UserAnswers object per line) or a JSON list / {"items": [...]}."""
+    try:
+        text = body.decode("utf-8")
+    except UnicodeDecodeError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"The body is not valid UTF-8: {e.reason}")
+    if NDJSON_MEDIA_TYPE in content_type:
+        records: List[Any] = []
+        for line_number, line in enumerate(text.splitlines(), 1):
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError as e:
+                records.append(ValueError(f"Line {line_number} is not valid JSON: {e.msg}"))
+        return records
+    try:
+        parsed = json.loads(text)
+    except json.JSONDecodeError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid JSON body: {e.msg}")
+    if isinstance(parsed, dict):
+        parsed = parsed.get("items")
+    if not isinstance(parsed, list):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='Expected a JSON list of answers objects, {"items": [...]} or an NDJSON upload.',
+        )
+    return parsed
+
+
+def _batch_item(record: Any) -> BatchItem:
+    if isinstance(record, Exception):
+        raise record
+    item = BatchItem.model_validate(record)
+    if not item.answers:
+        raise ValueError("Answers cannot be empty.")
+    return item
+
+
+_pdf_render_singleflight = SingleFlight()
+
+
+def pdf_render_stats() -> Dict[str, int]:
+    """Renders started vs. coalesced onto an identical render in flight, for the metrics endpoint."""
+    return _pdf_render_singleflight.stats()
+
+
+async def _render_pdf_cached(resume_data: List[Dict[str, Any]], user_info: Dict[str, Any]) -> bytes:
+    """Returns the PDF for this exact payload from the result cache, rendering it (once) on a miss."""
+    key = pdf_cache_key(resume_data, user_info)
+    pdf_bytes = await pdf_result_cache.get(key)
+    if pdf_bytes is not None:
+        return pdf_bytes
+
+    async def render() -> bytes:
+        content = await pdf_render_pool.render(resume_data=resume_data, user_info=user_info)
+        await pdf_result_cache.put(key, content)
+        return content
+
+    return await _pdf_render_singleflight.do(key, render)
+
+async def _pdf_response(request: Request, resume_data: List[Dict[str, Any]]) -> Response:
+    """Renders resume_data for the calling user, answering 304 when the client already has this exact PDF."""
+    headers = {
+        "Cookie": request.headers.get("Cookie")
+    }
+    user_info = await _get_user_info(settings.USER_SERVICE_URL, headers)
+
+    etag = f'"{pdf_cache_key(resume_data, user_info)}"'
+    cache_headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+    if _etag_matches(request.headers.get("If-None-Match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers)
+
+    try:
+        pdf_bytes = await _render_pdf_cached(resume_data, user_info)
+    except PDFPoolBusy as busy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="PDF generation is busy, please retry later.",
+            headers={"Retry-After": str(busy.retry_after)}
+        )
+    except PDFRenderTimeout:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail="PDF generation timed out."
+        )
+
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"resume_{user_info.get('name', 'user')}_{timestamp}.pdf"
+
+    return Response(
+        content=pdf_bytes,
+        media_type="application/pdf",
+        headers={"Content-Disposition": f"attachment; filename*=UTF-8''{quote(filename)}", **cache_headers}
+    )
+
+PDF_JOB_MAX_WAIT = 30.0
+
+
+def _pdf_job_dict(job: PDFJob) -> Dict[str, Any]:
+    return {
+        "job_id": job.job_id,
+        "status": job.status,
+        "url": pdf_jobs.url(job),
+        "error": job.error,
+        "created_at": job.created_at,
+        "updated_at": job.updated_at,
+    }
+
+async def _submit_pdf_job(request: Request, resume_data: List[Dict[str, Any]]) -> Response:
+    """Queues a background render of resume_data and answers 202 with the job and its status URL."""
+    if not pdf_jobs.enabled:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Asynchronous PDF generation is not configured.",
+        )
+    user_info = await _get_user_info(settings.USER_SERVICE_URL, {"Cookie": request.headers.get("Cookie")})
+    try:
+        job = pdf_jobs.submit(_request_subject(request), resume_data, user_info, _render_pdf_cached)
+    except PDFPoolBusy as busy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="PDF generation is busy, please retry later.",
+            headers={"Retry-After": str(busy.retry_after)}
+        )
+    location = f"/api/v001/resume/generate/pdf/jobs/{job.job_id}"
+    return Response(
+        content=json.dumps(_pdf_job_dict(job)),
+        status_code=status.HTTP_202_ACCEPTED,
+        media_type="application/json",
+        headers={"Location": location},
+    )
+
+def _owned_pdf_job(request: Request, job_id: str) -> PDFJob:
+    job = pdf_jobs.get(job_id)
+    if job is None or job.owner != _request_subject(request):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="PDF job not found or expired.")
+    return job
 
 router = APIRouter(tags=["Resume Generation API"])
 
@@ -64,7 +348,7 @@ async def get_base_questions():
     return {"questions": settings.BASE_QUESTIONS}
 
 @router.post("/api/v001/resume/question/get", response_model=QuestionsResponse)
-async def get_next_questions(user_answers: UserAnswers = Body(...)):
+async def get_next_questions(request: Request, user_answers: UserAnswers = Body(...)):
     """
     Generates follow-up questions (Stage 2) based on the user's answers from Stage 1.
     Requires authentication (JWT - implied, handle elsewhere).
@@ -75,9 +359,14 @@ async def get_next_questions(user_answers: UserAnswers = Body(...)):
             detail="Answers cannot be empty when requesting follow-up questions.",
         )
 
+    _start_speculative_extraction(request, user_answers.answers)
     try:
-        follow_up_questions = await neural_service.generate_follow_up_questions(user_answers.answers)
+        follow_up_questions = await neural_service.generate_follow_up_questions(
+            user_answers.answers, use_cache=_llm_cache_allowed(request)
+        )
         return {"questions": follow_up_questions}
+    except LLMBusy as busy:
+        raise _llm_busy_error(busy)
     except Exception as e:
         print(f"Error in /api/v001/resume/question/get endpoint: {e}")
         raise HTTPException(
@@ -85,10 +374,42 @@ async def get_next_questions(user_answers: UserAnswers = Body(...)):
             detail=f"Failed to generate follow-up questions. Error: {str(e)}",
         )
 
+@router.post("/api/v001/resume/question/stream")
+async def stream_next_questions(request: Request, user_answers: UserAnswers = Body(...)):
+    """
+    Streaming variant of /api/v001/resume/question/get (Server-Sent Events).
+    Emits a `question` event ({"index", "question"}) as soon as each question is generated,
+    then a final `done` event ({"count"}), or an `error` event ({"detail"}) if generation fails.
+    """
+    if not user_answers.answers:
+         raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Answers cannot be empty when requesting follow-up questions.",
+        )
+
+    _start_speculative_extraction(request, user_answers.answers)
+
+    async def events():
+        count = 0
+        try:
+            async for question in neural_service.stream_follow_up_questions(
+                user_answers.answers, use_cache=_llm_cache_allowed(request)
+            ):
+                yield _sse("question", {"index": count, "question": question})
+                count += 1
+            yield _sse("done", {"count": count})
+        except Exception as e:
+            log.error(f"Error in /api/v001/resume/question/stream endpoint: {e}", exc_info=True)
+            yield _sse("error", {"detail": f"Failed to generate follow-up questions. Error: {str(e)}"})
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
 @router.post("/api/v001/resume/label/generate", response_model=List[LabelValueItem])
-async def generate_resume_final(user_answers: UserAnswers = Body(...)):
+async def generate_resume_final(request: Request, user_answers: UserAnswers = Body(...)):
     """
     Processes all user answers to generate structured resume data as a list of label/value pairs.
+    Send `Accept: application/x-ndjson` or `Accept: text/event-stream` (or `?stream=ndjson|sse`)
+    to receive each item as soon as the model has produced it.
     """
     if not user_answers.answers:
          raise HTTPException(
@@ -96,9 +417,27 @@ async def generate_resume_final(user_answers: UserAnswers = Body(...)):
             detail="Answers cannot be empty for final resume generation.",
         )
 
+    use_cache = _llm_cache_allowed(request)
+    stream_mode = _stream_mode(request)
+    if stream_mode:
+        async def items() -> AsyncIterator[Dict[str, Any]]:
+            speculative = await _speculative_extraction(request, user_answers.answers) if use_cache else None
+            source = _iterate(speculative) if speculative is not None else neural_service.stream_process_answers(
+                user_answers.answers, use_cache=use_cache
+            )
+            async for item in source:
+                yield item
+
+        return _label_value_stream_response(stream_mode, items(), "/api/v001/resume/label/generate")
+
     try:
-        structured_data = await neural_service.generate_structured_resume(user_answers.answers)
+        # The stage-one answers have usually been extracted in the background while the user answered follow-ups.
+        structured_data = await _speculative_extraction(request, user_answers.answers) if use_cache else None
+        if structured_data is None:
+            structured_data = await neural_service.process_answers(user_answers.answers, use_cache=use_cache)
         return structured_data
+    except LLMBusy as busy:
+        raise _llm_busy_error(busy)
     except Exception as e:
         print(f"Error in /api/v001/resume/label/generate endpoint: {e}")
         traceback.print_exc()
@@ -107,17 +446,93 @@ async def generate_resume_final(user_answers: UserAnswers = Body(...)):
             detail=f"Failed to generate structured resume. Error: {str(e)}",
         )
 
+@router.post("/api/v001/resume/label/generate/batch")
+async def generate_resume_batch(request: Request):
+    """
+    Bulk variant of /api/v001/resume/label/generate for HR imports. The body is a JSON list of
+    {"answers": {...}, "id": "..."} objects (or {"items": [...]}), or the same objects as NDJSON lines
+    (Content-Type: application/x-ndjson).
+
+    Uploads larger than BATCH_MAX_BYTES or with more than BATCH_MAX_ITEMS records are refused with 413.
+    Items are extracted BATCH_CONCURRENCY at a time at background priority and streamed back as NDJSON
+    in completion order: {"index", "id", "status": "ok", "result"} or {"index", "id", "status": "error",
+    "detail"}, each with the running "completed"/"total", and finally {"summary": {...}} with throughput.
+    """
+    records = _parse_batch(await _read_batch_body(request), request.headers.get("Content-Type", ""))
+    if not records:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="The batch is empty.")
+    if len(records) > settings.BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"A batch may contain at most {settings.BATCH_MAX_ITEMS} items.",
+        )
+
+    use_cache = _llm_cache_allowed(request)
+    progress = BatchProgress(len(records))
+    valid: List[Any] = []
+    rejected: List[Dict[str, Any]] = []
+    for index, record in enumerate(records):
+        try:
+            valid.append((index, _batch_item(record)))
+        except (ValidationError, ValueError) as e:
+            ref = record.get("id") if isinstance(record, dict) else None
+            rejected.append({"index": index, "id": ref, "status": "error", "detail": str(e)})
+
+    async def extract(entry: Any) -> List[Dict[str, Any]]:
+        _, item = entry
+        attempt = 0
+        while True:
+            try:
+                return await neural_service.process_answers(item.answers, use_cache=use_cache, priority=Priority.BACKGROUND)
+            except LLMBusy as busy:
+                if attempt >= settings.BATCH_BUSY_RETRIES:
+                    raise
+                attempt += 1
+                await asyncio.sleep(busy.retry_after)
+
+    def line(record: Dict[str, Any]) -> str:
+        progress.record(record["status"] == "ok")
+        record.update(completed=progress.completed, total=progress.total)
+        return json.dumps(record, ensure_ascii=False) + "\n"
+
+    async def body():
+        for record in rejected:
+            yield line(record)
+        async for position, result, error in fan_out(valid, extract, settings.BATCH_CONCURRENCY):
+            index, item = valid[position]
+            if error is None:
+                yield line({"index": index, "id": item.id, "status": "ok", "result": result})
+            else:
+                if not isinstance(error, LLMBusy):
+                    log.error(f"Batch item {index} failed: {error}", exc_info=error)
+                yield line({"index": index, "id": item.id, "status": "error", "detail": f"Failed to generate structured resume. Error: {str(error)}"})
+        summary = progress.summary()
+        log.info(f"Batch extraction finished: {summary}")
+        yield json.dumps({"summary": summary}) + "\n"
+
+    return StreamingResponse(body(), media_type=NDJSON_MEDIA_TYPE, headers=SSE_HEADERS)
+
 @router.post("/api/v001/resume/label/update", response_model=List[LabelValueItem])
-async def update_resume_section(update_request: UpdateRequest = Body(...)):
+async def update_resume_section(request: Request, update_request: UpdateRequest = Body(...)):
     """
     Updates a specific section of the resume based on user's new input.
     """
+    stream_mode = _stream_mode(request)
+    if stream_mode:
+        return _label_value_stream_response(
+            stream_mode,
+            neural_service.stream_update_resume(update_request.current_data, update_request.new_info),
+            "/api/v001/resume/label/update",
+        )
+
     try:
-        updated_data = await neural_service.update_structured_resume(
+        updated_data = await neural_service.update_resume(
             current_data=update_request.current_data,
-            user_input=update_request.user_input
+            new_info=update_request.new_info
         )
         return updated_data
+    except LLMBusy as busy:
+        raise _llm_busy_error(busy)
     except Exception as e:
         log.error(f"Error updating resume section: {e}", exc_info=True)
         raise HTTPException(
@@ -135,24 +550,7 @@ async def generate_resume_pdf(
     Requires authentication.
     """
     try:
-        headers = {
-            "Cookie": request.headers.get("Cookie")
-        }
-        user_info = await _get_user_info(settings.USER_SERVICE_URL, headers)
-
-        pdf_bytes = create_resume_pdf(
-            resume_data=pdf_request.resume_data,
-            user_info=user_info
-        )
-
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"resume_{user_info.get('name', 'user')}_{timestamp}.pdf"
-
-        return Response(
-            content=pdf_bytes,
-            media_type="application/pdf",
-            headers={"Content-Disposition": f"attachment; filename={filename}"}
-        )
+        return await _pdf_response(request, [item.model_dump() for item in pdf_request.resume_data])
     except HTTPException as http_exc:
         raise http_exc
     except Exception as e:
@@ -161,3 +559,39 @@ async def generate_resume_pdf(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"An unexpected error occurred while generating the PDF: {e}"
         )
+
+
+@router.post("/api/v001/resume/generate/pdf/jobs", status_code=status.HTTP_202_ACCEPTED, response_model=PDFJobResponse)
+async def submit_resume_pdf_job(request: Request, pdf_request: ResumeDataPdfRequest = Body(...)):
+    """
+    Asynchronous variant of /api/v001/resume/generate/pdf: returns a job right away (202 + Location).
+    The finished PDF is written to object storage; poll the job (or subscribe to its events) for a presigned URL.
+    """
+    return await _submit_pdf_job(request, [item.model_dump() for item in pdf_request.resume_data])
+
+@router.get("/api/v001/resume/generate/pdf/jobs/{job_id}", response_model=PDFJobResponse)
+async def get_resume_pdf_job(request: Request, job_id: str, wait: float = 0):
+    """
+    Job status. With ?wait=N (seconds, at most 30) the call returns as soon as the status changes,
+    or after N seconds — long polling.
+    """
+    job = _owned_pdf_job(request, job_id)
+    if wait > 0:
+        await job.wait_for_change(min(wait, PDF_JOB_MAX_WAIT))
+    return _pdf_job_dict(job)
+
+@router.get("/api/v001/resume/generate/pdf/jobs/{job_id}/events")
+async def stream_resume_pdf_job(request: Request, job_id: str):
+    """
+    Server-Sent Events for a job: a `status` event on every change, ending after the done or failed one.
+    """
+    job = _owned_pdf_job(request, job_id)
+
+    async def events():
+        while True:
+            yield _sse("status", _pdf_job_dict(job))
+            if job.finished:
+                return
+            await job.wait_for_change(PDF_JOB_MAX_WAIT)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
@@ -0,0 +1,247 @@
+import logging
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, Body, HTTPException, Request, Response, status
+
+from ai_service.routers.resume_1 import (
+    _llm_busy_error,
+    _llm_cache_allowed,
+    _pdf_response,
+    _request_subject,
+    _submit_pdf_job,
+    neural_service,
+)
+from ai_service.schemas.resume_1 import (
+    PDFJobResponse,
+    QuestionsResponse,
+    SessionAnswersRequest,
+    SessionCreateRequest,
+    SessionEditRequest,
+    SessionResponse,
+    SessionUpdateRequest,
+)
+from ai_service.services.llm_scheduler import LLMBusy, Priority
+from ai_service.services.resume_delta import merge_operations
+from ai_service.services.session_store import InterviewSession, session_store
+from ai_service.services.speculation import speculative_extractions
+
+log = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/v001/resume/session", tags=["Resume Interview Sessions"])
+
+
+async def _owned_session(request: Request, session_id: str) -> InterviewSession:
+    """Loads the session; sessions of other users are reported as missing rather than forbidden."""
+    session = await session_store.get(session_id)
+    if session is None or session.owner != _request_subject(request):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found or expired.")
+    return session
+
+
+async def _save(session: InterviewSession) -> Dict[str, Any]:
+    session.touch()
+    await session_store.save(session)
+    return session.to_dict()
+
+
+def _speculation_key(session: InterviewSession) -> str:
+    return f"interview:{session.session_id}"
+
+
+def _start_speculative_extraction(session: InterviewSession) -> None:
+    answers = dict(session.answers)
+    speculative_extractions.start(
+        _speculation_key(session), answers,
+        lambda: neural_service.process_answers(answers, priority=Priority.BACKGROUND, coalesce=False),
+    )
+
+
+def _session_changed() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="The session was changed by another request while the model was running; retry with the current state.",
+    )
+
+
+def _require_resume_data(session: InterviewSession) -> List[Dict[str, Any]]:
+    if not session.resume_data:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="The session has no resume data yet; call label/generate first.",
+        )
+    return session.resume_data
+
+
+@router.post("", response_model=SessionResponse, status_code=status.HTTP_201_CREATED)
+async def create_session(request: Request, create_request: Optional[SessionCreateRequest] = Body(None)):
+    """
+    Starts a server-side interview session. Later calls send only new answers or edits and refer to the
+    collected answers and the generated resume data by session_id.
+    """
+    owner = _request_subject(request)
+    if owner is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication required.")
+    session = await session_store.create(owner, create_request.answers if create_request else None)
+    return session.to_dict()
+
+
+@router.get("/{session_id}", response_model=SessionResponse)
+async def get_session(request: Request, session_id: str):
+    return (await _owned_session(request, session_id)).to_dict()
+
+
+@router.delete("/{session_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_session(request: Request, session_id: str):
+    session = await _owned_session(request, session_id)
+    await session_store.delete(session.session_id)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@router.post("/{session_id}/answers", response_model=SessionResponse)
+async def add_session_answers(request: Request, session_id: str, answers_request: SessionAnswersRequest = Body(...)):
+    """Merges new or changed answers into the session (an answer to an already answered question replaces it)."""
+    async with session_store.lock(session_id):
+        session = await _owned_session(request, session_id)
+        session.answers.update(answers_request.answers)
+        return await _save(session)
+
+
+@router.post("/{session_id}/questions", response_model=QuestionsResponse)
+async def get_session_questions(request: Request, session_id: str):
+    """
+    Follow-up questions for the answers collected so far, stored in the session.
+    Also starts the background extraction of those answers for the later label/generate call.
+    """
+    session = await _owned_session(request, session_id)
+    if not session.answers:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Answers cannot be empty when requesting follow-up questions.",
+        )
+    if _llm_cache_allowed(request):
+        _start_speculative_extraction(session)
+    try:
+        questions = await neural_service.generate_follow_up_questions(
+            session.answers, use_cache=_llm_cache_allowed(request)
+        )
+    except LLMBusy as busy:
+        raise _llm_busy_error(busy)
+    except Exception as e:
+        log.error(f"Error generating follow-up questions for session {session_id}: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to generate follow-up questions. Error: {str(e)}",
+        )
+    async with session_store.lock(session_id):
+        current = await _owned_session(request, session_id)
+        if current.answers == session.answers:  # otherwise the questions answer an outdated state; keep them unsaved
+            current.questions = questions
+            await _save(current)
+    return {"questions": questions}
+
+
+@router.post("/{session_id}/label/generate", response_model=SessionResponse)
+async def generate_session_resume(request: Request, session_id: str, answers_request: Optional[SessionAnswersRequest] = Body(None)):
+    """
+    Extracts the resume data from all session answers (optionally merging a last batch of answers first)
+    and stores it in the session. Answered with 409 if the answers change while the model is running.
+    """
+    async with session_store.lock(session_id):
+        session = await _owned_session(request, session_id)
+        if answers_request is not None:
+            session.answers.update(answers_request.answers)
+            await _save(session)
+    if not session.answers:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Answers cannot be empty for final resume generation.",
+        )
+    use_cache = _llm_cache_allowed(request)
+    try:
+        resume_data = None
+        if use_cache:
+            speculative = await speculative_extractions.lookup(_speculation_key(session), session.answers)
+            if speculative is not None:
+                base_result, extra_answers = speculative
+                resume_data = await neural_service.refine_extraction(session.answers, base_result, extra_answers)
+        if resume_data is None:
+            resume_data = await neural_service.process_answers(session.answers, use_cache=use_cache)
+    except LLMBusy as busy:
+        raise _llm_busy_error(busy)
+    except Exception as e:
+        log.error(f"Error generating resume data for session {session_id}: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to generate structured resume. Error: {str(e)}",
+        )
+    async with session_store.lock(session_id):
+        current = await _owned_session(request, session_id)
+        if current.answers != session.answers:
+            raise _session_changed()
+        current.resume_data = resume_data
+        return await _save(current)
+
+
+@router.post("/{session_id}/label/update", response_model=SessionResponse)
+async def update_session_resume(request: Request, session_id: str, update_request: SessionUpdateRequest = Body(...)):
+    """
+    Applies the user's new information to the stored resume data (the current data is not resent).
+    Answered with 409 if the resume data changes while the model is running.
+    """
+    session = await _owned_session(request, session_id)
+    current_data = _require_resume_data(session)
+    try:
+        resume_data = await neural_service.update_resume(
+            current_data=current_data,
+            new_info=update_request.new_info
+        )
+    except LLMBusy as busy:
+        raise _llm_busy_error(busy)
+    except Exception as e:
+        log.error(f"Error updating resume data for session {session_id}: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to update resume section.",
+        )
+    async with session_store.lock(session_id):
+        current = await _owned_session(request, session_id)
+        if current.resume_data != current_data:
+            raise _session_changed()
+        current.resume_data = resume_data
+        return await _save(current)
+
+
+@router.post("/{session_id}/label/edit", response_model=SessionResponse)
+async def edit_session_resume(request: Request, session_id: str, edit_request: SessionEditRequest = Body(...)):
+    """Applies explicit add/modify/delete edits to the stored resume data without calling the model."""
+    async with session_store.lock(session_id):
+        session = await _owned_session(request, session_id)
+        current_data = _require_resume_data(session)
+        operations = [operation.model_dump(exclude_none=True) for operation in edit_request.operations]
+        session.resume_data, report, _ = merge_operations(current_data, operations)
+        log.info(f"Session {session_id} edited: {'; '.join(report) or 'no changes'}")
+        return await _save(session)
+
+
+@router.post("/{session_id}/generate/pdf", status_code=status.HTTP_200_OK)
+async def generate_session_pdf(request: Request, session_id: str):
+    """Renders the stored resume data as a PDF (same caching and ETag handling as /generate/pdf)."""
+    session = await _owned_session(request, session_id)
+    resume_data = _require_resume_data(session)
+    try:
+        return await _pdf_response(request, resume_data)
+    except HTTPException:
+        raise
+    except Exception as e:
+        log.error(f"Failed to generate PDF for session {session_id}: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An unexpected error occurred while generating the PDF: {e}"
+        )
+
+
+@router.post("/{session_id}/generate/pdf/jobs", status_code=status.HTTP_202_ACCEPTED, response_model=PDFJobResponse)
+async def submit_session_pdf_job(request: Request, session_id: str):
+    """Renders the stored resume data in the background (see /api/v001/resume/generate/pdf/jobs)."""
+    session = await _owned_session(request, session_id)
+    return await _submit_pdf_job(request, _require_resume_data(session))
@@ -27,3 +27,51 @@ class UpdateRequest(BaseModel):
     """Request body for updating resume data."""
     current_data: List[LabelValueItem] = Field(..., description="The current structured data as a list of label-value pairs.")
     new_info: str = Field(..., description="New information or instructions from the user.")
+
+
+class LabelValueOperation(BaseModel):
+    """One edit of the stored resume data: add, modify or delete the item with this label."""
+    op: str = Field(..., description="add, modify or delete.")
+    label: str = Field(..., description="Label of the item to change.")
+    value: Optional[str] = Field(None, description="New value (required for add and modify).")
+
+
+class SessionCreateRequest(BaseModel):
+    answers: Dict[str, str] = Field(default_factory=dict, description="Answers known when the session is created.")
+
+
+class SessionAnswersRequest(BaseModel):
+    answers: Dict[str, str] = Field(..., description="New or changed question-answer pairs; merged into the session's answers.")
+
+
+class SessionUpdateRequest(BaseModel):
+    new_info: str = Field(..., description="New information or instructions from the user, applied to the stored resume data.")
+
+
+class SessionEditRequest(BaseModel):
+    operations: List[LabelValueOperation] = Field(..., description="Edits applied in order to the stored resume data.")
+
+
+class SessionResponse(BaseModel):
+    """Server-side interview state; later calls refer to it by session_id instead of resending it."""
+    session_id: str
+    answers: Dict[str, str]
+    questions: Optional[List[str]] = None
+    resume_data: Optional[List[LabelValueItem]] = None
+    created_at: float
+    updated_at: float
+
+
+class PDFJobResponse(BaseModel):
+    """State of an asynchronous PDF job. `url` (a presigned link, valid for PDF_URL_TTL) is set once status is done."""
+    job_id: str
+    status: str = Field(..., description="queued, rendering, uploading, done or failed.")
+    url: Optional[str] = None
+    error: Optional[str] = None
+    created_at: float
+    updated_at: float
+
+
+class BatchItem(UserAnswers):
+    """One questionnaire of a batch import; `id` is echoed back in its result line."""
+    id: Optional[str] = Field(None, description="Caller's reference for this questionnaire.")
@@ -0,0 +1,83 @@
+# ai_service/services/batch.py
+import asyncio
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+async def fan_out(
+    items: List[T],
+    worker: Callable[[T], Awaitable[R]],
+    concurrency: int,
+) -> AsyncIterator[Tuple[int, Optional[R], Optional[Exception]]]:
+    """
+    Runs worker over items with at most `concurrency` in flight and yields (index, result, error) in completion
+    order. Closing the iterator early (e.g. the client went away) cancels whatever is still running.
+
+    Every item yields exactly once: a worker that is cancelled from inside (rather than by closing the iterator)
+    is reported as that item's error, so the stream cannot wait forever on an index nobody will deliver.
+    """
+    results: "asyncio.Queue[Tuple[int, Optional[R], Optional[Exception]]]" = asyncio.Queue()
+    next_index = 0
+
+    async def run_workers() -> None:
+        nonlocal next_index
+        index: Optional[int] = None
+        try:
+            while next_index < len(items):
+                index = next_index
+                next_index += 1
+                try:
+                    results.put_nowait((index, await worker(items[index]), None))
+                except asyncio.CancelledError:
+                    if asyncio.current_task().cancelling():
+                        raise  # fan_out is shutting down
+                    results.put_nowait((index, None, RuntimeError("The item was cancelled.")))
+                except Exception as e:
+                    results.put_nowait((index, None, e))
+                index = None
+        finally:
+            if index is not None:
+                results.put_nowait((index, None, RuntimeError("The item was cancelled.")))
+
+    runners = [asyncio.create_task(run_workers()) for _ in range(max(1, min(concurrency, len(items))))]
+    try:
+        for _ in range(len(items)):
+            yield await results.get()
+    finally:
+        for runner in runners:
+            runner.cancel()
+        await asyncio.gather(*runners, return_exceptions=True)
+
+
+class BatchProgress:
+    """Running totals for a batch; summary() is the closing record of the stream."""
+
+    def __init__(self, total: int):
+        self.total = total
+        self.succeeded = 0
+        self.failed = 0
+        self.started_at = time.monotonic()
+
+    @property
+    def completed(self) -> int:
+        return self.succeeded + self.failed
+
+    def record(self, ok: bool) -> None:
+        if ok:
+            self.succeeded += 1
+        else:
+            self.failed += 1
+
+    def summary(self) -> Dict[str, Any]:
+        elapsed = time.monotonic() - self.started_at
+        return {
+            "total": self.total,
+            "completed": self.completed,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "elapsed_seconds": round(elapsed, 3),
+            "items_per_second": round(self.completed / elapsed, 3) if elapsed > 0 else None,
+        }
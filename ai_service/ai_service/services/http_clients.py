@@ -0,0 +1,103 @@
+# ai_service/services/http_clients.py
+import logging
+from typing import Dict
+
+import httpx
+
+from ai_service.config import Settings, settings
+
+log = logging.getLogger(__name__)
+
+
+class HTTPClients:
+    """
+    Application-wide registry of long-lived httpx.AsyncClient instances, one per upstream.
+
+    Each client keeps its own keep-alive pool, so TCP/TLS connections to Groq, the auth
+    endpoint and user-service are reused between requests instead of being re-established
+    for every call. Clients are opened in the FastAPI lifespan hook (see main.py) and
+    closed on shutdown; accessing a client before startup creates it lazily.
+    """
+
+    LLM = "llm"
+    AUTH = "auth"
+    USER = "user"
+
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+
+    def _limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.settings.HTTP_POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=self.settings.HTTP_POOL_MAX_KEEPALIVE,
+            keepalive_expiry=self.settings.HTTP_POOL_KEEPALIVE_EXPIRY,
+        )
+
+    def _timeout(self, read_timeout: float) -> httpx.Timeout:
+        return httpx.Timeout(
+            read_timeout,
+            connect=self.settings.HTTP_CONNECT_TIMEOUT,
+            pool=self.settings.HTTP_POOL_TIMEOUT,
+        )
+
+    def _http2_enabled(self) -> bool:
+        if not self.settings.LLM_HTTP2:
+            return False
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            log.warning("LLM_HTTP2 is enabled but the 'h2' package is not installed. Falling back to HTTP/1.1.")
+            return False
+        return True
+
+    def _build(self, name: str) -> httpx.AsyncClient:
+        if name == self.LLM:
+            return httpx.AsyncClient(
+                limits=self._limits(),
+                timeout=self._timeout(self.settings.LLM_TIMEOUT),
+                http2=self._http2_enabled(),
+            )
+        if name == self.AUTH:
+            return httpx.AsyncClient(limits=self._limits(), timeout=self._timeout(self.settings.AUTH_TIMEOUT))
+        if name == self.USER:
+            return httpx.AsyncClient(limits=self._limits(), timeout=self._timeout(self.settings.USER_SERVICE_TIMEOUT))
+        raise KeyError(f"Unknown upstream client: {name}")
+
+    def get(self, name: str) -> httpx.AsyncClient:
+        client = self._clients.get(name)
+        if client is None or client.is_closed:
+            client = self._build(name)
+            self._clients[name] = client
+        return client
+
+    @property
+    def llm(self) -> httpx.AsyncClient:
+        return self.get(self.LLM)
+
+    @property
+    def auth(self) -> httpx.AsyncClient:
+        return self.get(self.AUTH)
+
+    @property
+    def user(self) -> httpx.AsyncClient:
+        return self.get(self.USER)
+
+    async def start(self) -> None:
+        """Opens the pools for all known upstreams."""
+        for name in (self.LLM, self.AUTH, self.USER):
+            self.get(name)
+        log.info(f"HTTP client pools started: {sorted(self._clients)}")
+
+    async def aclose(self) -> None:
+        """Closes every pool, releasing keep-alive connections."""
+        clients, self._clients = self._clients, {}
+        for name, client in clients.items():
+            try:
+                await client.aclose()
+            except Exception as e:
+                log.warning(f"Error while closing HTTP client '{name}': {e}")
+        log.info("HTTP client pools closed.")
+
+
+http_clients = HTTPClients(settings)
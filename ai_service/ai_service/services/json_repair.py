@@ -0,0 +1,261 @@
+# ai_service/services/json_repair.py
+import json
+from typing import Any, Dict, List, Tuple
+
+_WHITESPACE = " \t\r\n"
+_LITERALS = {"true": True, "false": False, "null": None, "True": True, "False": False, "None": None}
+
+
+class _Truncated(Exception):
+    """The input ended inside a value."""
+
+
+class _LenientParser:
+    """
+    Recursive-descent JSON parser that accepts the mistakes LLMs make and records each fix in `repairs`.
+
+    Accepted: single-quoted strings, unquoted keys, Python literals, trailing and missing commas, raw control
+    characters in strings, a stray string after a comma where an object key should be ("value": "FastAPI",
+    "Gin Gonic" is merged into the previous value), and input that ends early. On early end every container is closed, items
+    cut off mid-way are dropped from arrays, and scalar values cut off mid-way are dropped from objects.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.pos = 0
+        self.repairs: List[str] = []
+        self.truncated = False
+
+    # --- Helpers ---
+    def _skip_ws(self) -> None:
+        while self.pos < len(self.text) and self.text[self.pos] in _WHITESPACE:
+            self.pos += 1
+
+    def _peek(self) -> str:
+        self._skip_ws()
+        if self.pos >= len(self.text):
+            self.truncated = True
+            raise _Truncated()
+        return self.text[self.pos]
+
+    def _note(self, repair: str) -> None:
+        if repair not in self.repairs:
+            self.repairs.append(repair)
+
+    # --- Values ---
+    def parse_value(self) -> Any:
+        ch = self._peek()
+        if ch == "{":
+            return self._parse_object()
+        if ch == "[":
+            return self._parse_array()
+        if ch in "\"'":
+            return self._parse_string()
+        if ch == "-" or ch.isdigit():
+            return self._parse_number()
+        return self._parse_literal()
+
+    def _parse_string(self) -> str:
+        quote = self.text[self.pos]
+        if quote == "'":
+            self._note("converted single-quoted strings")
+        start = self.pos + 1
+        i = start
+        while i < len(self.text):
+            ch = self.text[i]
+            if ch == "\\":
+                i += 2
+                continue
+            if ch == quote:
+                self.pos = i + 1
+                return self._decode_string(self.text[start:i], quote)
+            i += 1
+        self.pos = len(self.text)
+        self.truncated = True
+        self._note("closed unterminated string")
+        raise _Truncated()
+
+    def _decode_string(self, raw: str, quote: str) -> str:
+        if quote == "'":
+            raw = raw.replace("\\'", "'").replace('"', '\\"')
+        try:
+            return json.loads(f'"{raw}"', strict=False)
+        except json.JSONDecodeError:
+            self._note("dropped invalid escape sequences")
+            return raw.replace("\\", "")
+
+    def _parse_number(self) -> Any:
+        start = self.pos
+        i = self.pos
+        while i < len(self.text) and self.text[i] in "+-0123456789.eE":
+            i += 1
+        self.pos = i
+        if i >= len(self.text):
+            self.truncated = True  # the number may continue
+            raise _Truncated()
+        raw = self.text[start:i]
+        try:
+            return json.loads(raw)
+        except json.JSONDecodeError:
+            try:
+                self._note("normalized malformed number")
+                return float(raw)
+            except ValueError:
+                raise ValueError(f"Invalid number {raw!r} at position {start}") from None
+
+    def _parse_literal(self) -> Any:
+        start = self.pos
+        i = self.pos
+        while i < len(self.text) and (self.text[i].isalnum() or self.text[i] == "_"):
+            i += 1
+        word = self.text[start:i]
+        self.pos = i
+        if word in _LITERALS:
+            if word not in ("true", "false", "null"):
+                self._note("converted Python literals")
+            return _LITERALS[word]
+        if i >= len(self.text) and any(literal.startswith(word) for literal in _LITERALS):
+            self.truncated = True
+            raise _Truncated()
+        raise ValueError(f"Unexpected token {word or self.text[start:start + 1]!r} at position {start}")
+
+    def _parse_key(self) -> str:
+        ch = self._peek()
+        if ch in "\"'":
+            return self._parse_string()
+        start = self.pos
+        while self.pos < len(self.text) and (self.text[self.pos].isalnum() or self.text[self.pos] in "_-"):
+            self.pos += 1
+        if self.pos == start:
+            raise ValueError(f"Expected an object key at position {start}")
+        if self.pos >= len(self.text):
+            self.truncated = True
+            raise _Truncated()
+        self._note("quoted bare object keys")
+        return self.text[start:self.pos]
+
+    def _parse_array(self) -> List[Any]:
+        self.pos += 1
+        items: List[Any] = []
+        try:
+            while True:
+                ch = self._peek()
+                if ch == "]":
+                    self.pos += 1
+                    return items
+                if ch == ",":
+                    self.pos += 1
+                    if self._peek() == "]":
+                        self._note("removed trailing commas")
+                    elif not items:
+                        self._note("removed stray commas")
+                    continue
+                if items and not self._after_comma():
+                    self._note("inserted missing commas")
+                try:
+                    items.append(self.parse_value())
+                except _Truncated:
+                    self._note(f"dropped item {len(items)} cut off by the end of the output")
+                    raise
+        except _Truncated:
+            self._note("closed unterminated arrays")
+            raise _TruncatedWith(items)
+
+    def _after_comma(self) -> bool:
+        i = self.pos - 1
+        while i >= 0 and self.text[i] in _WHITESPACE:
+            i -= 1
+        return i >= 0 and self.text[i] in ",[{:"
+
+    def _parse_object(self) -> Dict[str, Any]:
+        self.pos += 1
+        obj: Dict[str, Any] = {}
+        last_key = None
+        try:
+            while True:
+                ch = self._peek()
+                if ch == "}":
+                    self.pos += 1
+                    return obj
+                if ch == ",":
+                    self.pos += 1
+                    if self._peek() == "}":
+                        self._note("removed trailing commas")
+                    continue
+                missing_comma = bool(obj) and not self._after_comma()
+                if missing_comma:
+                    self._note("inserted missing commas")
+                key = self._parse_key()
+                if self._peek() != ":":
+                    if last_key is None or missing_comma:
+                        raise ValueError(f"Expected ':' after key {key!r} at position {self.pos}")
+                    # "value": "FastAPI", "Gin Gonic" -> the stray string belongs to the previous value.
+                    previous = obj[last_key]
+                    if isinstance(previous, list):
+                        previous.append(key)
+                    elif isinstance(previous, str):
+                        obj[last_key] = f"{previous}, {key}"
+                    else:
+                        raise ValueError(f"Expected ':' after key {key!r} at position {self.pos}")
+                    self._note(f"merged stray value into '{last_key}'")
+                    continue
+                self.pos += 1
+                try:
+                    obj[key] = self.parse_value()
+                except _TruncatedWith as partial:
+                    obj[key] = partial.value
+                    raise
+                last_key = key
+        except _Truncated:
+            self._note("closed unterminated objects")
+            raise _TruncatedWith(obj)
+
+
+class _TruncatedWith(_Truncated):
+    """Input ended inside a container; carries what was complete so far."""
+
+    def __init__(self, value: Any):
+        super().__init__()
+        self.value = value
+
+
+def _first_json_start(text: str) -> int:
+    """Start of the JSON value, looking past a leftover reasoning block (brackets in it are not the answer)."""
+    offset = text.rfind("</think>")
+    offset = 0 if offset == -1 else offset + len("</think>")
+    starts = [i for i in (text.find("[", offset), text.find("{", offset)) if i != -1]
+    return min(starts) if starts else -1
+
+
+def repair_json(text: str) -> Tuple[Any, List[str]]:
+    """
+    Parses LLM output that json.loads rejects. Returns (value, repairs) where repairs lists every fix applied
+    (empty if the text was valid). Raises ValueError when nothing usable can be recovered, including output cut
+    off before its first complete item (an empty list or object would pass for a valid, empty answer).
+    """
+    try:
+        return json.loads(text), []
+    except json.JSONDecodeError:
+        pass
+
+    start = _first_json_start(text)
+    if start == -1:
+        raise ValueError("No JSON array or object found in the output.")
+    parser = _LenientParser(text)
+    parser.pos = start
+    if text[:start].strip():
+        parser._note("skipped text before the JSON value")
+    try:
+        value = parser.parse_value()
+    except _TruncatedWith as partial:
+        value = partial.value
+        if not value:
+            raise ValueError("The output ended before any complete JSON value.") from None
+    except _Truncated:
+        raise ValueError("The output ended before any complete JSON value.") from None
+
+    if not parser.truncated:
+        parser._skip_ws()
+        if parser.pos < len(text):
+            parser._note("ignored text after the JSON value")
+    return value, parser.repairs
@@ -0,0 +1,130 @@
+# ai_service/services/json_stream.py
+import json
+import logging
+from typing import Any, List, Optional
+
+from ai_service.services.json_repair import repair_json
+
+log = logging.getLogger(__name__)
+
+
+class JSONArrayItemStream:
+    """
+    Incrementally extracts the items of a JSON array from a streamed LLM response.
+
+    Feed it content deltas as they arrive; feed() returns every array item that became complete in
+    that chunk (a string as soon as its closing quote arrives, an object as soon as its closing brace
+    arrives). The array is the top-level value, or, when `key` is given, the value of that key in the
+    top-level object (a bare top-level array is accepted too, like the non-streaming parsers do). Without a
+    key, a list wrapped in an object ({"items": [...]}, as JSON mode makes models do) is unwrapped: the first
+    array-valued key of the top-level object is the target, again like the non-streaming parser.
+    Text outside the top-level value, e.g. markdown fences or a trailing explanation, is ignored.
+    """
+
+    def __init__(self, key: Optional[str] = None):
+        self.key = key
+        self._buf = ""
+        self._pos = 0
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._string_is_item = False
+        self._last_string: Optional[str] = None
+        self._target_depth: Optional[int] = None
+        self._item_start: Optional[int] = None
+        self.done = False
+        self.items_emitted = 0
+
+    @property
+    def text(self) -> str:
+        """Everything fed so far."""
+        return self._buf
+
+    def _is_target_array(self) -> bool:
+        if not self._stack:
+            return True
+        if self._stack != ["{"] or self._last_string is None:
+            return False
+        if self.key is None:
+            return True
+        try:
+            return json.loads(self._last_string) == self.key
+        except json.JSONDecodeError:
+            return False
+
+    def _emit(self, end: int) -> List[Any]:
+        raw = self._buf[self._item_start:end].strip()
+        self._item_start = None
+        if not raw:
+            return []
+        try:
+            item = json.loads(raw)
+        except json.JSONDecodeError as e:
+            try:
+                item, repairs = repair_json(raw)
+            except ValueError:
+                log.warning(f"Skipping malformed streamed JSON item {raw[:100]!r}: {e}")
+                return []
+            log.warning(f"Repaired streamed JSON item {raw[:100]!r}: {'; '.join(repairs)}")
+        self.items_emitted += 1
+        return [item]
+
+    def feed(self, chunk: str) -> List[Any]:
+        self._buf += chunk
+        buf = self._buf
+        items: List[Any] = []
+        i = self._pos
+        while i < len(buf) and not self.done:
+            ch = buf[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._string_is_item:
+                        items += self._emit(i + 1)
+                    else:
+                        self._last_string = buf[self._string_start:i + 1]
+                i += 1
+                continue
+
+            depth = len(self._stack)
+            in_target = self._target_depth is not None and depth == self._target_depth
+            if ch == '"':
+                self._in_string = True
+                self._string_start = i
+                self._string_is_item = in_target and self._item_start is None
+                if self._string_is_item:
+                    self._item_start = i
+            elif ch in "{[":
+                if in_target and self._item_start is None:
+                    self._item_start = i
+                if self._target_depth is None and ch == "[" and self._is_target_array():
+                    self._target_depth = depth + 1
+                self._stack.append(ch)
+            elif ch in "}]":
+                if in_target:
+                    # Closing the target array itself; flush a pending scalar (number/literal).
+                    if self._item_start is not None:
+                        items += self._emit(i)
+                    self.done = True
+                if self._stack:
+                    self._stack.pop()
+                if (
+                    self._target_depth is not None
+                    and len(self._stack) == self._target_depth
+                    and self._item_start is not None
+                ):
+                    items += self._emit(i + 1)
+            elif ch == ",":
+                if in_target and self._item_start is not None:
+                    items += self._emit(i)
+            elif not ch.isspace():
+                if in_target and self._item_start is None:
+                    self._item_start = i
+            i += 1
+        self._pos = i
+        return items
@@ -0,0 +1,155 @@
+# ai_service/services/jwt_verifier.py
+import asyncio
+import base64
+import enum
+import json
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import jwt
+
+from ai_service.config import Settings, settings
+from ai_service.services.http_clients import http_clients
+
+log = logging.getLogger(__name__)
+
+
+class TokenStatus(enum.Enum):
+    VALID = "valid"
+    EXPIRED = "expired"
+    INVALID = "invalid"
+    UNKNOWN_KEY = "unknown_key"
+
+
+class JWTVerifier:
+    """
+    Verifies access tokens in-process against a key set.
+
+    Keys come from static config (JWT_JWKS inline JSON, JWT_JWKS_FILE, JWT_HS256_SECRET for the
+    shared secret user-service signs with) and, optionally, from JWT_JWKS_URL, which is re-fetched
+    every JWT_JWKS_REFRESH_INTERVAL seconds. Tokens that are expired or signed with a key we do not
+    know yet are reported as such so the caller can fall back to the remote auth check.
+    """
+
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        self._static_keys: List[jwt.PyJWK] = []
+        self._remote_keys: List[jwt.PyJWK] = []
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.settings.AUTH_MODE == "local"
+
+    @property
+    def keys(self) -> List[jwt.PyJWK]:
+        return self._remote_keys + self._static_keys
+
+    # --- Key loading ---
+    @staticmethod
+    def _parse_jwks(jwks: Dict[str, Any], source: str) -> List[jwt.PyJWK]:
+        keys = []
+        for index, jwk in enumerate(jwks.get("keys", [])):
+            try:
+                keys.append(jwt.PyJWK.from_dict(jwk))
+            except (jwt.PyJWKError, jwt.InvalidKeyError) as e:
+                log.warning(f"Skipping unusable key #{index} from {source}: {e}")
+        return keys
+
+    def load_static_keys(self) -> None:
+        keys: List[jwt.PyJWK] = []
+        if self.settings.JWT_JWKS:
+            keys += self._parse_jwks(json.loads(self.settings.JWT_JWKS), "JWT_JWKS")
+        if self.settings.JWT_JWKS_FILE:
+            with open(self.settings.JWT_JWKS_FILE, "r", encoding="utf-8") as f:
+                keys += self._parse_jwks(json.load(f), self.settings.JWT_JWKS_FILE)
+        if self.settings.JWT_HS256_SECRET:
+            secret = base64.urlsafe_b64encode(self.settings.JWT_HS256_SECRET.encode("utf-8")).rstrip(b"=").decode("ascii")
+            keys.append(jwt.PyJWK.from_dict({"kty": "oct", "k": secret, "alg": "HS256"}))
+        self._static_keys = keys
+        log.info(f"Loaded {len(keys)} static JWT verification key(s).")
+
+    async def refresh_remote_keys(self) -> None:
+        response = await http_clients.auth.get(self.settings.JWT_JWKS_URL)
+        response.raise_for_status()
+        self._remote_keys = self._parse_jwks(response.json(), self.settings.JWT_JWKS_URL)
+        log.info(f"Fetched {len(self._remote_keys)} JWT verification key(s) from {self.settings.JWT_JWKS_URL}")
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.settings.JWT_JWKS_REFRESH_INTERVAL)
+            try:
+                await self.refresh_remote_keys()
+            except Exception as e:
+                # Keep the previous key set; the remote check still covers unknown keys.
+                log.warning(f"Failed to refresh JWKS from {self.settings.JWT_JWKS_URL}: {e}")
+
+    async def start(self) -> None:
+        if not self.enabled:
+            return
+        self.load_static_keys()
+        if self.settings.JWT_JWKS_URL:
+            try:
+                await self.refresh_remote_keys()
+            except Exception as e:
+                log.warning(f"Initial JWKS fetch from {self.settings.JWT_JWKS_URL} failed: {e}")
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def aclose(self) -> None:
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+
+    # --- Verification ---
+    def _candidate_keys(self, header: Dict[str, Any]) -> List[jwt.PyJWK]:
+        alg = header.get("alg")
+        kid = header.get("kid")
+        return [
+            key for key in self.keys
+            if key.algorithm_name == alg and (kid is None or key.key_id is None or key.key_id == kid)
+        ]
+
+    def verify(self, token: str) -> Tuple[TokenStatus, Optional[Dict[str, Any]]]:
+        """
+        Checks signature and expiry of a token.
+
+        Returns:
+            A (status, claims) tuple; claims are only set for TokenStatus.VALID.
+        """
+        try:
+            header = jwt.get_unverified_header(token)
+        except jwt.InvalidTokenError:
+            return TokenStatus.INVALID, None
+
+        candidates = self._candidate_keys(header)
+        if not candidates:
+            kid = header.get("kid")
+            if kid is not None and any(key.key_id == kid for key in self.keys):
+                # A key we know, used with another algorithm (e.g. HS256 keyed with an RSA public key): forged.
+                return TokenStatus.INVALID, None
+            return TokenStatus.UNKNOWN_KEY, None
+
+        for key in candidates:
+            try:
+                claims = jwt.decode(
+                    token,
+                    key=key.key,
+                    algorithms=[key.algorithm_name],
+                    leeway=self.settings.JWT_LEEWAY,
+                    options={"require": ["exp", "sub"], "verify_aud": False},
+                )
+                return TokenStatus.VALID, claims
+            except jwt.ExpiredSignatureError:
+                return TokenStatus.EXPIRED, None
+            except jwt.InvalidSignatureError:
+                continue
+            except jwt.InvalidTokenError:
+                return TokenStatus.INVALID, None
+        return TokenStatus.INVALID, None
+
+
+jwt_verifier = JWTVerifier(settings)
@@ -0,0 +1,335 @@
+# ai_service/services/llm_backends.py
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import random
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional, Tuple, Union
+
+import httpx
+
+from ai_service.config import Settings
+from ai_service.services.http_clients import http_clients
+from ai_service.services.llm_scheduler import LLMScheduler, estimate_tokens, parse_retry_after
+from ai_service.services.reasoning import apply_reasoning_options
+from ai_service.services.request_trace import trace_count
+
+log = logging.getLogger(__name__)
+
+LATENCY_WINDOW = 50      # samples kept per backend for the p95 hedge delay
+MIN_P95_SAMPLES = 10     # below this the hedge delay falls back to LLM_HEDGE_MIN_DELAY
+
+Outcome = Union[httpx.Response, httpx.RequestError]
+
+
+class LLMBackend:
+    """One OpenAI-compatible chat completions endpoint together with its recent latency and health."""
+
+    def __init__(
+        self,
+        name: str,
+        url: str,
+        model: Optional[str],
+        headers: Dict[str, str],
+        weight: float = 1.0,
+        timeout: Optional[float] = None,
+        task_models: Optional[Dict[str, str]] = None,
+    ):
+        self.name = name
+        self.url = url
+        self.model = model  # None: send the task profile's model unchanged
+        self.task_models = task_models or {}
+        self.headers = headers
+        self.weight = weight if weight > 0 else 1.0
+        self.timeout = timeout
+        self.ewma: Optional[float] = None
+        self.latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self.cooldown_until = 0.0
+        self.requests = 0
+        self.failures = 0
+
+    def model_for(self, task: Optional[str], requested: str) -> str:
+        return self.task_models.get(task or "") or self.model or requested
+
+    def p95(self) -> Optional[float]:
+        if len(self.latencies) < MIN_P95_SAMPLES:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[int(0.95 * (len(ordered) - 1))]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "model": self.model,
+            "task_models": self.task_models,
+            "weight": self.weight,
+            "ewma_s": None if self.ewma is None else round(self.ewma, 3),
+            "p95_s": None if self.p95() is None else round(self.p95(), 3),
+            "requests": self.requests,
+            "failures": self.failures,
+            "cooling_down": self.cooldown_until > time.monotonic(),
+        }
+
+
+def _backends_from_settings(settings: Settings, default_headers: Dict[str, str]) -> List[LLMBackend]:
+    """
+    LLM_BACKENDS is a JSON list of {"name", "url", "model", "models", "api_key" | "api_key_env", "weight", "timeout"}.
+    "models" maps a task (questions/extract/update) to a model name on that backend; without it (or "model") the
+    task profile's model is sent. A missing url falls back to API_URL. When it is empty the single API_URL backend is used.
+    """
+    if not settings.LLM_BACKENDS.strip():
+        return [LLMBackend("default", settings.API_URL, None, default_headers)]
+
+    try:
+        entries = json.loads(settings.LLM_BACKENDS)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"LLM_BACKENDS is not valid JSON: {e}") from e
+    if not isinstance(entries, list) or not entries:
+        raise ValueError("LLM_BACKENDS must be a non-empty JSON list of backend objects.")
+
+    backends = []
+    for index, entry in enumerate(entries):
+        if not isinstance(entry, dict):
+            raise ValueError(f"LLM_BACKENDS[{index}] must be an object.")
+        api_key = entry.get("api_key") or (os.getenv(entry["api_key_env"]) if entry.get("api_key_env") else None)
+        headers = {"Content-Type": "application/json"}
+        if api_key:
+            headers["Authorization"] = f"Bearer {api_key}"
+        backends.append(LLMBackend(
+            name=str(entry.get("name") or f"backend-{index}"),
+            url=entry.get("url") or settings.API_URL,
+            model=entry.get("model") or None,
+            headers=headers,
+            weight=float(entry.get("weight", 1.0)),
+            timeout=float(entry["timeout"]) if entry.get("timeout") else None,
+            task_models=entry.get("models") or None,
+        ))
+    return backends
+
+
+class LLMBackendPool:
+    """
+    Routes chat completion requests across the configured backends.
+
+    Each call goes to the healthy backend with the lowest latency EWMA divided by its weight (backends
+    without samples are tried first, and LLM_BACKEND_EXPLORE_RATE of calls probe a random one so a
+    recovered backend gets noticed). A 5xx, 429, timeout or connection error puts the backend into a
+    cooldown and the call fails over to the next one. With LLM_HEDGE_ENABLED a second backend is raced
+    when the first has not answered within its p95 latency (at least LLM_HEDGE_MIN_DELAY).
+
+    The caller's scheduler slot covers one upstream request. Every further attempt (a hedge or a failover)
+    is charged to the scheduler's buckets as well, and a hedge is only sent while they have headroom, so
+    hedging never pushes the service over the provider's rate limits.
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        backends: List[LLMBackend],
+        scheduler: Optional[LLMScheduler] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.settings = settings
+        self.backends = backends
+        self.scheduler = scheduler
+        self.alpha = settings.LLM_EWMA_ALPHA
+        self.cooldown = settings.LLM_BACKEND_COOLDOWN
+        self.explore_rate = settings.LLM_BACKEND_EXPLORE_RATE
+        self.hedge_enabled = settings.LLM_HEDGE_ENABLED
+        self.hedge_min_delay = settings.LLM_HEDGE_MIN_DELAY
+        self._clock = clock
+        self.counters = {"failovers": 0, "hedges": 0, "hedge_wins": 0, "hedges_skipped": 0}
+
+    @classmethod
+    def from_settings(
+        cls, settings: Settings, default_headers: Dict[str, str], scheduler: Optional[LLMScheduler] = None
+    ) -> "LLMBackendPool":
+        return cls(settings, _backends_from_settings(settings, default_headers), scheduler)
+
+    @property
+    def primary(self) -> LLMBackend:
+        return self.backends[0]
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.counters, "backends": {b.name: b.stats() for b in self.backends}}
+
+    # --- Routing state ---
+    def ranked(self) -> List[LLMBackend]:
+        """Healthy backends best-first, then the cooling-down ones (soonest available first) as a last resort."""
+        now = self._clock()
+        healthy = [b for b in self.backends if b.cooldown_until <= now]
+        cooling = sorted((b for b in self.backends if b.cooldown_until > now), key=lambda b: b.cooldown_until)
+        healthy.sort(key=lambda b: 0.0 if b.ewma is None else b.ewma / b.weight)
+        if len(healthy) > 1 and random.random() < self.explore_rate:
+            healthy.insert(0, healthy.pop(random.randrange(1, len(healthy))))
+        return healthy + cooling
+
+    def record_latency(self, backend: LLMBackend, latency: float) -> None:
+        backend.latencies.append(latency)
+        backend.ewma = latency if backend.ewma is None else self.alpha * latency + (1 - self.alpha) * backend.ewma
+
+    def record_success(self, backend: LLMBackend, latency: Optional[float]) -> None:
+        backend.cooldown_until = 0.0
+        if latency is not None:
+            self.record_latency(backend, latency)
+
+    def record_failure(self, backend: LLMBackend, cooldown: Optional[float] = None) -> None:
+        backend.failures += 1
+        backend.cooldown_until = self._clock() + (self.cooldown if cooldown is None else cooldown)
+
+    def hedge_delay(self, backend: LLMBackend) -> float:
+        return max(backend.p95() or 0.0, self.hedge_min_delay)
+
+    def _estimated_tokens(self, data: Dict[str, Any]) -> int:
+        return estimate_tokens(data, self.settings.LLM_CHARS_PER_TOKEN)
+
+    def _can_hedge(self, data: Dict[str, Any]) -> bool:
+        return self.scheduler is None or self.scheduler.has_headroom(self._estimated_tokens(data))
+
+    def _charge_extra_attempt(self, data: Dict[str, Any]) -> None:
+        if self.scheduler is not None:
+            self.scheduler.charge(self._estimated_tokens(data))
+
+    # --- Sending ---
+    @staticmethod
+    def _retryable(response: httpx.Response) -> bool:
+        return response.status_code >= 500 or response.status_code == httpx.codes.TOO_MANY_REQUESTS
+
+    async def _send_one(
+        self, backend: LLMBackend, data: Dict[str, Any], stream: bool, task: Optional[str], timeout: Optional[float]
+    ) -> httpx.Response:
+        client = http_clients.llm
+        timeouts = [t for t in (backend.timeout, timeout) if t]
+        request = client.build_request(
+            "POST",
+            backend.url,
+            json=apply_reasoning_options({**data, "model": backend.model_for(task, data["model"])}, self.settings),
+            headers=backend.headers,
+            timeout=min(timeouts) if timeouts else httpx.USE_CLIENT_DEFAULT,
+        )
+        backend.requests += 1
+        trace_count("llm_attempts")
+        started = self._clock()
+        try:
+            response = await client.send(request, stream=stream)
+        except httpx.RequestError as e:
+            log.warning(f"LLM backend '{backend.name}' failed: {e!r}")
+            self.record_failure(backend)
+            raise
+
+        if self._retryable(response):
+            log.warning(f"LLM backend '{backend.name}' answered {response.status_code}.")
+            self.record_failure(backend, parse_retry_after(response.headers.get("retry-after")))
+        else:
+            # Streaming responses only measure time to headers, which is not comparable to full completions.
+            self.record_success(backend, None if stream else self._clock() - started)
+        return response
+
+    async def _attempt(self, backend: LLMBackend, data: Dict[str, Any], stream: bool, task: Optional[str], timeout: Optional[float]) -> Outcome:
+        try:
+            return await self._send_one(backend, data, stream, task, timeout)
+        except httpx.RequestError as e:
+            return e
+
+    def _usable(self, outcome: Outcome) -> bool:
+        return isinstance(outcome, httpx.Response) and not self._retryable(outcome)
+
+    async def _send_hedged(
+        self, first: LLMBackend, second: LLMBackend, data: Dict[str, Any], task: Optional[str], timeout: Optional[float]
+    ) -> Tuple[Outcome, LLMBackend, int]:
+        """
+        Sends to `first` and, if it has not answered within its hedge delay, races `second` against it
+        (unless the scheduler's buckets have no room for the extra request).
+        Returns the best outcome, the backend that produced it and how many backends were tried.
+
+        The loser of a race is cancelled before it has a latency of its own. All that is known is that it would have
+        taken at least as long as the winner, so that censored value (or its own elapsed time, if longer) is what
+        gets recorded for it; the near-zero time a just-started hedge ran must not pull its EWMA and p95 down.
+        """
+        primary = asyncio.ensure_future(self._attempt(first, data, False, task, timeout))
+        attempts = {primary: first}
+        started = {primary: self._clock()}
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=self.hedge_delay(first))
+            if done:
+                return primary.result(), first, 1
+            if not self._can_hedge(data):
+                self.counters["hedges_skipped"] += 1
+                return await primary, first, 1
+
+            self._charge_extra_attempt(data)
+            self.counters["hedges"] += 1
+            log.info(f"LLM backend '{first.name}' is slower than {self.hedge_delay(first):.2f}s, hedging to '{second.name}'.")
+            hedge = asyncio.ensure_future(self._attempt(second, data, False, task, timeout))
+            attempts[hedge] = second
+            started[hedge] = self._clock()
+            best: Optional[Tuple[Outcome, LLMBackend, int]] = None
+            pending = set(attempts)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for attempt in done:
+                    outcome = attempt.result()
+                    if self._usable(outcome):
+                        if attempt is hedge:
+                            self.counters["hedge_wins"] += 1
+                        now = self._clock()
+                        for loser in pending:
+                            self.record_latency(attempts[loser], max(now - started[loser], now - started[attempt]))
+                        return outcome, attempts[attempt], 2
+                    if best is None or isinstance(outcome, httpx.Response):
+                        best = (outcome, attempts[attempt], 2)
+            return best
+        finally:
+            for future in attempts:
+                future.cancel()
+
+    async def send(
+        self, data: Dict[str, Any], stream: bool = False, task: Optional[str] = None, timeout: Optional[float] = None
+    ) -> Tuple[httpx.Response, LLMBackend]:
+        """
+        Sends the payload (its "model" is mapped per backend and task) and returns the first usable response.
+        `timeout` (the task's) applies on top of each backend's own timeout; the stricter one wins.
+        If every backend fails, the last retryable (5xx/429) response is returned, or the last connection
+        error raised. Streamed responses must be closed by the caller.
+        """
+        candidates = self.ranked()
+        last_response: Optional[Tuple[httpx.Response, LLMBackend]] = None
+        last_error: Optional[httpx.RequestError] = None
+        index = 0
+        while index < len(candidates):
+            if index > 0:
+                self._charge_extra_attempt(data)
+            if self.hedge_enabled and not stream and index + 1 < len(candidates):
+                outcome, backend, tried = await self._send_hedged(candidates[index], candidates[index + 1], data, task, timeout)
+            else:
+                backend, tried = candidates[index], 1
+                outcome = await self._attempt(backend, data, stream, task, timeout)
+            index += tried
+
+            if isinstance(outcome, httpx.Response):
+                if last_response is not None and stream:
+                    await last_response[0].aclose()
+                if self._usable(outcome):
+                    return outcome, backend
+                last_response = (outcome, backend)
+            else:
+                last_error = outcome
+            if index < len(candidates):
+                self.counters["failovers"] += 1
+                log.warning(f"Failing over to LLM backend '{candidates[index].name}'.")
+
+        if last_response is not None:
+            return last_response
+        raise last_error
+
+    @contextlib.asynccontextmanager
+    async def stream(self, data: Dict[str, Any], task: Optional[str] = None, timeout: Optional[float] = None) -> AsyncIterator[httpx.Response]:
+        """send(stream=True) as a context manager that closes the streamed response."""
+        response, _ = await self.send(data, stream=True, task=task, timeout=timeout)
+        try:
+            yield response
+        finally:
+            await response.aclose()
@@ -0,0 +1,161 @@
+# ai_service/services/llm_cache.py
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from ai_service.config import Settings, settings
+from ai_service.services.cache import TTLCache
+
+log = logging.getLogger(__name__)
+
+LLM_CACHE_BYPASS_HEADER = "X-LLM-Cache-Bypass"
+
+
+def normalize_answers(answers: Dict[str, str]) -> Dict[str, str]:
+    """Collapses whitespace and drops empty answers so cosmetic differences hit the same cache entry."""
+    normalized = {}
+    for question, answer in answers.items():
+        question = " ".join(str(question).split())
+        answer = " ".join(str(answer).split())
+        if question and answer:
+            normalized[question] = answer
+    return dict(sorted(normalized.items()))
+
+
+def llm_cache_key(task: str, model_id: str, prompt_version: str, prompt: str, payload: Any) -> str:
+    """Builds the cache key from the model, the prompt version (explicit + hash of the prompt text) and the normalized input."""
+    prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:16]
+    canonical = json.dumps(
+        {"task": task, "model": model_id, "prompt_version": prompt_version, "prompt": prompt_hash, "payload": payload},
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    Two-tier cache of parsed LLM results.
+
+    A bounded in-memory TTLCache sits in front of an SQLite table (LLM_CACHE_DB_PATH) that survives
+    restarts. SQLite access is blocking and therefore always runs in a worker thread, serialized by a
+    lock. An empty LLM_CACHE_DB_PATH keeps the cache memory-only; LLM_CACHE_TTL=0 disables it.
+    """
+
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        self.ttl = settings.LLM_CACHE_TTL
+        self.memory = TTLCache(maxsize=settings.LLM_CACHE_MAX_ENTRIES, ttl=self.ttl)
+        self.db_path = settings.LLM_CACHE_DB_PATH or None
+        self.db_max_entries = settings.LLM_CACHE_DB_MAX_ENTRIES
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "bypassed": 0, "writes": 0, "evictions": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    # --- SQLite tier (blocking) ---
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS llm_cache_last_access ON llm_cache(last_access)")
+            self._db.commit()
+        return self._db
+
+    def _db_get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._db_lock:
+            db = self._connect()
+            row = db.execute("SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if row[1] <= now:
+                db.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                db.commit()
+                return None
+            db.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+            db.commit()
+            return row[0]
+
+    def _db_set(self, key: str, value: str) -> int:
+        now = time.time()
+        with self._db_lock:
+            db = self._connect()
+            db.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, value, now + self.ttl, now),
+            )
+            db.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (now,))
+            evicted = db.execute(
+                "DELETE FROM llm_cache WHERE key IN ("
+                "SELECT key FROM llm_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.db_max_entries,),
+            ).rowcount
+            db.commit()
+            return evicted
+
+    # --- Public API ---
+    async def get(self, key: str) -> Optional[Any]:
+        if not self.enabled:
+            return None
+        value = self.memory.get(key)
+        if value is not None:
+            self.counters["memory_hits"] += 1
+            return value
+        if self.db_path:
+            try:
+                raw = await asyncio.to_thread(self._db_get, key)
+            except sqlite3.Error as e:
+                log.warning(f"LLM cache read from {self.db_path} failed: {e}")
+                raw = None
+            if raw is not None:
+                value = json.loads(raw)
+                self.memory.set(key, value)
+                self.counters["disk_hits"] += 1
+                return value
+        self.counters["misses"] += 1
+        return None
+
+    async def set(self, key: str, value: Any) -> None:
+        if not self.enabled:
+            return
+        self.memory.set(key, value)
+        self.counters["writes"] += 1
+        if self.db_path:
+            try:
+                self.counters["evictions"] += await asyncio.to_thread(
+                    self._db_set, key, json.dumps(value, ensure_ascii=False)
+                )
+            except sqlite3.Error as e:
+                log.warning(f"LLM cache write to {self.db_path} failed: {e}")
+
+    def record_bypass(self) -> None:
+        self.counters["bypassed"] += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {**self.counters, "memory_size": len(self.memory)}
+
+    def _close(self) -> None:
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    async def aclose(self) -> None:
+        await asyncio.to_thread(self._close)
+
+
+llm_response_cache = LLMResponseCache(settings)
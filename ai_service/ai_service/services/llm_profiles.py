@@ -0,0 +1,56 @@
+# ai_service/services/llm_profiles.py
+import math
+from typing import Dict, Optional
+
+from ai_service.config import Settings
+
+QUESTIONS = "questions"
+EXTRACT = "extract"
+UPDATE = "update"
+TASKS = (QUESTIONS, EXTRACT, UPDATE)
+
+MIN_MAX_TOKENS = 256
+OUTPUT_HEADROOM = 1.3  # safety factor on top of the expected answer size
+
+
+class TaskProfile:
+    """Model, sampling and limits used for one kind of LLM call (LLM_<TASK>_* settings, falling back to the globals)."""
+
+    def __init__(self, task: str, model: str, temperature: float, max_tokens: int, timeout: Optional[float]):
+        self.task = task
+        self.model = model
+        self.temperature = temperature
+        self.max_tokens = max_tokens  # 0 = derive from the expected output size
+        self.timeout = timeout
+
+    def __repr__(self) -> str:
+        return (
+            f"TaskProfile({self.task!r}, model={self.model!r}, temperature={self.temperature}, "
+            f"max_tokens={self.max_tokens or 'auto'}, timeout={self.timeout})"
+        )
+
+
+def task_profiles(settings: Settings) -> Dict[str, TaskProfile]:
+    profiles = {}
+    for task in TASKS:
+        prefix = f"LLM_{task.upper()}_"
+        timeout = getattr(settings, prefix + "TIMEOUT")
+        profiles[task] = TaskProfile(
+            task=task,
+            model=getattr(settings, prefix + "MODEL") or settings.MODEL_ID,
+            temperature=getattr(settings, prefix + "TEMPERATURE"),
+            max_tokens=getattr(settings, prefix + "MAX_TOKENS"),
+            timeout=timeout if timeout > 0 else None,
+        )
+    return profiles
+
+
+def derive_max_tokens(profile: TaskProfile, expected_chars: int, settings: Settings) -> int:
+    """
+    Token cap for one call: the expected answer size in tokens plus headroom, plus LLM_REASONING_TOKENS for
+    models that think before answering, bounded by LLM_MAX_TOKENS_CAP. An explicit per-task max_tokens wins.
+    """
+    if profile.max_tokens > 0:
+        return profile.max_tokens
+    answer_tokens = math.ceil(expected_chars / settings.LLM_CHARS_PER_TOKEN * OUTPUT_HEADROOM)
+    return max(MIN_MAX_TOKENS, min(answer_tokens + settings.LLM_REASONING_TOKENS, settings.LLM_MAX_TOKENS_CAP))
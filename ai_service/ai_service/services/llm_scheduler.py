@@ -0,0 +1,301 @@
+# ai_service/services/llm_scheduler.py
+import asyncio
+import contextlib
+import email.utils
+import heapq
+import itertools
+import logging
+import re
+import time
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from ai_service.config import Settings, settings
+from ai_service.services.metrics import observe_stage
+
+log = logging.getLogger(__name__)
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+
+_dispatch_listener: "ContextVar[Optional[Callable[[], None]]]" = ContextVar("llm_dispatch_listener", default=None)
+
+
+class Priority(IntEnum):
+    """Outbound LLM request classes; lower values are dispatched first."""
+
+    INTERACTIVE = 0  # follow-up questions: a user is waiting on the next screen
+    NORMAL = 1       # extraction / update requested by the user
+    BACKGROUND = 2   # speculative or batch work
+
+
+class LLMBusy(Exception):
+    """Raised when an LLM request could not be sent in time (queue wait exceeded, or still rate limited after retries)."""
+
+    def __init__(self, retry_after: int, reason: str):
+        super().__init__(f"LLM provider is busy ({reason}), retry after {retry_after}s")
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """Parses provider durations such as "7.66s", "2m59.56s", "1ms" or a bare number of seconds."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    scale = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+    return sum(float(number) * scale[unit] for number, unit in parts)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After is either delta-seconds or an HTTP date."""
+    seconds = parse_duration(value)
+    if seconds is not None or not value:
+        return seconds
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(retry_at.timestamp() - time.time(), 0.0)
+
+
+def estimate_tokens(payload: Dict[str, Any], chars_per_token: float) -> int:
+    """
+    Rough upper bound of the tokens a chat completion will be charged: prompt characters / chars_per_token
+    plus max_tokens, which is what providers reserve against the tokens-per-minute limit.
+    """
+    prompt_chars = sum(len(str(message.get("content", ""))) for message in payload.get("messages", []))
+    return int(prompt_chars / chars_per_token) + int(payload.get("max_tokens") or 0)
+
+
+def on_dispatch(callback: Callable[[], None]) -> None:
+    """Calls `callback` whenever an LLM request of the current task (and tasks it starts) gets a scheduler slot."""
+    _dispatch_listener.set(callback)
+
+
+class TokenBucket:
+    """Refills `per_minute` units per minute up to a burst of `per_minute`. per_minute <= 0 means unlimited."""
+
+    def __init__(self, per_minute: float, clock: Callable[[], float] = time.monotonic):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self._clock = clock
+        self._updated = clock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def delay(self, amount: float) -> float:
+        """Seconds until `amount` units are available (requests larger than the burst only wait for a full bucket)."""
+        if not self.enabled:
+            return 0.0
+        self._refill()
+        missing = min(amount, self.capacity) - self.tokens
+        return missing / self.rate if missing > 0 else 0.0
+
+    def take(self, amount: float) -> None:
+        if self.enabled:
+            self._refill()
+            self.tokens -= min(amount, self.capacity)
+
+    def give_back(self, amount: float) -> None:
+        if self.enabled and amount > 0:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+    def sync(self, remaining: float) -> None:
+        """Never assume more headroom than the provider reports."""
+        if self.enabled:
+            self._refill()
+            self.tokens = min(self.tokens, remaining)
+
+
+class LLMScheduler:
+    """
+    Admission control for outbound LLM requests.
+
+    A request is dispatched once a concurrency slot is free (LLM_MAX_CONCURRENCY), both token buckets
+    (LLM_REQUESTS_PER_MINUTE, LLM_TOKENS_PER_MINUTE) have room and no provider back-off
+    (Retry-After / exhausted x-ratelimit-* headers) is in effect. Waiting requests are served strictly by
+    Priority, FIFO within a class. A request that waits longer than LLM_QUEUE_TIMEOUT fails fast with
+    LLMBusy instead of running into the upstream timeout.
+    """
+
+    def __init__(self, settings: Settings, clock: Callable[[], float] = time.monotonic):
+        self.max_concurrency = max(settings.LLM_MAX_CONCURRENCY, 1)
+        self.queue_timeout = settings.LLM_QUEUE_TIMEOUT
+        self.requests = TokenBucket(settings.LLM_REQUESTS_PER_MINUTE, clock)
+        self.tokens = TokenBucket(settings.LLM_TOKENS_PER_MINUTE, clock)
+        self._clock = clock
+        self._queue: List[Tuple[int, int, float, "asyncio.Future[None]"]] = []
+        self._seq = itertools.count()
+        self._active = 0
+        self._waiting = 0
+        self._blocked_until = 0.0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.counters = {"dispatched": 0, "queue_timeouts": 0, "rate_limited": 0, "extra_attempts": 0}
+        self.wait_stats = {p.name.lower(): {"count": 0, "total_s": 0.0, "max_s": 0.0} for p in Priority}
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    @property
+    def queue_depth(self) -> int:
+        return self._waiting
+
+    def backoff_remaining(self) -> float:
+        return max(self._blocked_until - self._clock(), 0.0)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "active": self._active,
+            "queue_depth": self._waiting,
+            "backoff_s": round(self.backoff_remaining(), 3),
+            **self.counters,
+            "wait": self.wait_stats,
+        }
+
+    # --- Dispatch ---
+    def _dispatch(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._queue:
+            _, _, estimated_tokens, future = self._queue[0]
+            if future.done():  # the waiter gave up (cancelled / timed out)
+                heapq.heappop(self._queue)
+                continue
+            if self._active >= self.max_concurrency:
+                return
+            delay = max(self.backoff_remaining(), self.requests.delay(1), self.tokens.delay(estimated_tokens))
+            if delay > 0:
+                self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+                return
+            heapq.heappop(self._queue)
+            self.requests.take(1)
+            self.tokens.take(estimated_tokens)
+            self._active += 1
+            self.counters["dispatched"] += 1
+            future.set_result(None)
+
+    async def acquire(self, priority: Priority = Priority.NORMAL, estimated_tokens: int = 0) -> None:
+        future: "asyncio.Future[None]" = asyncio.get_running_loop().create_future()
+        enqueued_at = self._clock()
+        heapq.heappush(self._queue, (int(priority), next(self._seq), estimated_tokens, future))
+        self._waiting += 1
+        try:
+            self._dispatch()
+            await asyncio.wait_for(future, self.queue_timeout if self.queue_timeout > 0 else None)
+        except asyncio.TimeoutError:
+            self.counters["queue_timeouts"] += 1
+            self._dispatch()
+            retry_after = max(int(self.backoff_remaining() + 0.999), 1)
+            raise LLMBusy(retry_after, f"queued for more than {self.queue_timeout:g}s") from None
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release()  # granted in the same loop iteration the caller was cancelled
+            else:
+                self._dispatch()
+            raise
+        finally:
+            self._waiting -= 1
+
+        listener = _dispatch_listener.get()
+        if listener is not None:
+            listener()
+        waited = self._clock() - enqueued_at
+        stats = self.wait_stats[priority.name.lower()]
+        stats["count"] += 1
+        stats["total_s"] += waited
+        stats["max_s"] = max(stats["max_s"], waited)
+        observe_stage("llm_queue", waited)
+        if waited > 1.0:
+            log.info(f"LLM request ({priority.name.lower()}) waited {waited:.2f}s for dispatch.")
+
+    def has_headroom(self, estimated_tokens: int = 0) -> bool:
+        """True if one more request could be dispatched right now without waiting on a bucket or a back-off."""
+        return (
+            self.backoff_remaining() <= 0
+            and self.requests.delay(1) <= 0
+            and self.tokens.delay(estimated_tokens) <= 0
+        )
+
+    def charge(self, estimated_tokens: int = 0) -> None:
+        """
+        Books an extra upstream request sent under an already granted slot (a hedge or failover attempt) against
+        both token buckets. It is not delayed; the buckets may go into debt, which later dispatches wait out.
+        """
+        self.requests.take(1)
+        self.tokens.take(estimated_tokens)
+        self.counters["extra_attempts"] += 1
+
+    def release(self) -> None:
+        self._active -= 1
+        self._dispatch()
+
+    @contextlib.asynccontextmanager
+    async def slot(self, priority: Priority = Priority.NORMAL, estimated_tokens: int = 0) -> AsyncIterator[None]:
+        await self.acquire(priority, estimated_tokens)
+        try:
+            yield
+        finally:
+            self.release()
+
+    # --- Provider feedback ---
+    def settle(self, estimated_tokens: int, used_tokens: Optional[int]) -> None:
+        """Returns the unused part of the token reservation once the response reports its usage."""
+        if used_tokens is not None and used_tokens < estimated_tokens:
+            self.tokens.give_back(estimated_tokens - used_tokens)
+
+    def _back_off(self, seconds: float) -> None:
+        self._blocked_until = max(self._blocked_until, self._clock() + seconds)
+
+    def observe(self, response: httpx.Response) -> Optional[float]:
+        """
+        Applies the provider's rate-limit headers. Returns the back-off in seconds for a 429 response, else None.
+        """
+        headers = response.headers
+        for bucket, kind in ((self.requests, "requests"), (self.tokens, "tokens")):
+            remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+            if remaining is None:
+                continue
+            try:
+                remaining_value = float(remaining)
+            except ValueError:
+                continue
+            bucket.sync(remaining_value)
+            if remaining_value <= 0:
+                reset = parse_duration(headers.get(f"x-ratelimit-reset-{kind}"))
+                if reset:
+                    self._back_off(reset)
+
+        if response.status_code != httpx.codes.TOO_MANY_REQUESTS:
+            return None
+        self.counters["rate_limited"] += 1
+        retry_after = parse_retry_after(headers.get("retry-after"))
+        if retry_after is None:
+            resets = [parse_duration(headers.get(f"x-ratelimit-reset-{kind}")) for kind in ("requests", "tokens")]
+            retry_after = max((r for r in resets if r), default=1.0)
+        self._back_off(retry_after)
+        log.warning(f"LLM provider returned 429, pausing outbound requests for {retry_after:.2f}s.")
+        return retry_after
+
+
+llm_scheduler = LLMScheduler(settings)
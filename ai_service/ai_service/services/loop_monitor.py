@@ -0,0 +1,99 @@
+# ai_service/services/loop_monitor.py
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from typing import Any, Dict, Optional
+
+from ai_service.config import Settings, settings
+from ai_service.services.metrics import registry
+
+log = logging.getLogger(__name__)
+
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+loop_lag_seconds = registry.histogram(
+    "event_loop_lag_seconds", "How late the event loop ran a timer that should have fired immediately.", buckets=LAG_BUCKETS
+).labels()
+loop_stalls = registry.counter(
+    "event_loop_stalls_total", "Times the event loop was blocked for longer than LOOP_STALL_THRESHOLD."
+).labels()
+
+
+class LoopLagMonitor:
+    """
+    Watches the event loop for blocking work.
+
+    A heartbeat task wakes every LOOP_LAG_INTERVAL and records how late it woke (event_loop_lag_seconds).
+    A watchdog thread checks the heartbeat; once it is older than LOOP_STALL_THRESHOLD the loop is blocked
+    right now, so the watchdog logs the loop thread's current stack, i.e. whatever is holding it. Each stall
+    is reported once, with its total duration logged when the loop comes back.
+    """
+
+    def __init__(self, settings: Settings):
+        self.enabled = settings.LOOP_MONITOR_ENABLED
+        self.interval = settings.LOOP_LAG_INTERVAL
+        self.threshold = settings.LOOP_STALL_THRESHOLD
+        self._heartbeat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional["asyncio.Task[None]"] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._stalled_since: Optional[float] = None
+        self.max_lag = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {"max_lag_s": round(self.max_lag, 4), "stalls": loop_stalls.value, "threshold_s": self.threshold}
+
+    async def start(self) -> None:
+        if not self.enabled or self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._beat())
+        self._thread = threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True)
+        self._thread.start()
+        log.info(f"Event loop monitor started (interval {self.interval}s, stall threshold {self.threshold}s).")
+
+    async def aclose(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._thread is not None:
+            await asyncio.to_thread(self._thread.join, self.threshold + 1)
+            self._thread = None
+
+    async def _beat(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(now - expected, 0.0)
+            self._heartbeat = now
+            loop_lag_seconds.observe(lag)
+            self.max_lag = max(self.max_lag, lag)
+            if self._stalled_since is not None:
+                log.warning(f"Event loop was blocked for {now - self._stalled_since:.3f}s.")
+                self._stalled_since = None
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.threshold / 2):
+            since = self._heartbeat
+            blocked = time.monotonic() - since
+            if blocked < self.threshold + self.interval or self._stalled_since is not None:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame is not None else "<no frame>"
+            if self._heartbeat != since:
+                continue  # the loop came back while the stack was taken
+            self._stalled_since = since
+            loop_stalls.inc()  # only this thread increments it
+            log.warning(f"Event loop blocked for {blocked:.3f}s so far; loop thread stack:\n{stack}")
+
+
+loop_monitor = LoopLagMonitor(settings)
@@ -0,0 +1,269 @@
+# ai_service/services/metrics.py
+import functools
+import math
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from ai_service.services.request_trace import current_trace
+
+# Latency buckets in seconds, from a cached auth check up to a slow LLM generation.
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+Sample = Tuple[Dict[str, str], float]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+
+class _GaugeChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class _HistogramChild:
+    __slots__ = ("upper_bounds", "counts", "sum", "count")
+
+    def __init__(self, upper_bounds: Sequence[float]):
+        self.upper_bounds = upper_bounds
+        self.counts = [0] * (len(upper_bounds) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.upper_bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class _Metric(ABC):
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], Any] = {}
+
+    @abstractmethod
+    def _new_child(self) -> Any:
+        ...
+
+    def labels(self, *values: str) -> Any:
+        """The child for these label values (positional, in labelnames order). Hot paths should keep the child."""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            child = self._children[values] = self._new_child()
+        return child
+
+    def _labels(self, values: Tuple[str, ...]) -> Dict[str, str]:
+        return dict(zip(self.labelnames, values))
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in list(self._children.items()):
+            lines.extend(self._render_child(self._labels(values), child))
+        return lines
+
+    def _render_child(self, labels: Dict[str, str], child: Any) -> List[str]:
+        return [f"{self.name}{_format_labels(labels)} {_format_value(child.value)}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self) -> _GaugeChild:
+        return _GaugeChild()
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.upper_bounds = tuple(sorted(buckets))
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.upper_bounds)
+
+    def _render_child(self, labels: Dict[str, str], child: _HistogramChild) -> List[str]:
+        lines = []
+        cumulative = 0
+        for upper_bound, count in zip((*self.upper_bounds, math.inf), child.counts):
+            cumulative += count
+            lines.append(f"{self.name}_bucket{_format_labels({**labels, 'le': _format_value(float(upper_bound))})} {cumulative}")
+        lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(child.sum)}")
+        lines.append(f"{self.name}_count{_format_labels(labels)} {child.count}")
+        return lines
+
+
+Collector = Callable[[], Iterable[Tuple[str, str, str, Iterable[Sample]]]]
+
+
+class MetricsRegistry:
+    """
+    Metrics in the Prometheus text format (version 0.0.4).
+
+    Recording is plain arithmetic on the event-loop thread: no locks, one dict lookup for the labelled child
+    (none when the caller keeps it) and a bisect for histograms. Work done in other threads or the PDF worker
+    processes is timed there and recorded by the awaiting coroutine. Collectors turn the stats() of existing
+    services into samples when /metrics is scraped, so those services keep their own counters.
+    """
+
+    def __init__(self, prefix: str = "ai_service_"):
+        self.prefix = prefix
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Collector] = []
+
+    def _register(self, metric: _Metric) -> Any:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(self.prefix + name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(self.prefix + name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(self.prefix + name, help, labelnames, buckets))
+
+    def add_collector(self, collector: Collector) -> None:
+        """collector() yields (name, type, help, [(labels, value), ...]); names get the registry prefix."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            for name, kind, help, samples in collector():
+                name = self.prefix + name
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    if value is not None:
+                        lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+stage_seconds = registry.histogram(
+    "stage_duration_seconds", "Time spent per processing stage.", ["stage"]
+)
+stage_inflight = registry.gauge(
+    "stage_inflight", "Operations currently in progress per stage.", ["stage"]
+)
+upstream_errors = registry.counter(
+    "upstream_errors_total", "Failed calls to upstream services by upstream and HTTP status (or connect_error).", ["upstream", "status"]
+)
+llm_tokens = registry.counter(
+    "llm_tokens_total", "Tokens reported by the LLM provider, by task and kind (prompt / completion).", ["task", "kind"]
+)
+
+
+class _StageTimer:
+    __slots__ = ("stage", "histogram", "gauge", "started")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self.histogram = stage_seconds.labels(stage)
+        self.gauge = stage_inflight.labels(stage)
+        self.started = 0.0
+
+    def __enter__(self) -> "_StageTimer":
+        self.gauge.value += 1
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        duration = time.perf_counter() - self.started
+        self.gauge.value -= 1
+        self.histogram.observe(duration)
+        trace = current_trace()
+        if trace is not None:
+            trace.add_span(self.stage, self.started, duration)
+
+
+def track(stage: str) -> _StageTimer:
+    """
+    `with track("llm"):` times the block into stage_duration_seconds, counts it in stage_inflight and adds
+    it to the current request's trace (Server-Timing, span log).
+    """
+    return _StageTimer(stage)
+
+
+def tracked(stage: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Decorator form of track() for synchronous functions."""
+
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with _StageTimer(stage):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+def observe_stage(stage: str, seconds: float) -> None:
+    """Records a duration measured elsewhere (e.g. inside a PDF worker process) that ended just now."""
+    stage_seconds.labels(stage).observe(seconds)
+    trace = current_trace()
+    if trace is not None:
+        trace.add_span(stage, time.perf_counter() - seconds, seconds)
+
+
+def record_upstream_error(upstream: str, status: Optional[int]) -> None:
+    upstream_errors.labels(upstream, str(status) if status is not None else "connect_error").inc()
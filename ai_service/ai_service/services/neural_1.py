@@ -1,16 +1,47 @@
 # services/neural.py
 
+import asyncio
+import hashlib
 import httpx
 import json
 from ai_service.config import Settings # Assuming Settings now has HF_ROUTER_API_KEY etc.
-from typing import Dict, List, Any, Union # Добавили Union
+from ai_service.services.cache import SingleFlight
+from ai_service.services.json_repair import repair_json
+from ai_service.services.json_stream import JSONArrayItemStream
+from ai_service.services.llm_backends import LLMBackendPool
+from ai_service.services.llm_profiles import EXTRACT, QUESTIONS, UPDATE, derive_max_tokens, task_profiles
+from ai_service.services.llm_cache import LLMResponseCache, llm_cache_key, llm_response_cache, normalize_answers
+from ai_service.services.llm_scheduler import LLMBusy, LLMScheduler, Priority, estimate_tokens, llm_scheduler
+from ai_service.services.metrics import llm_tokens, record_upstream_error, track, tracked
+from ai_service.services.request_trace import trace_count
+from ai_service.services.resume_delta import is_operation, merge_operations, parse_operations
+from ai_service.services.reasoning import ReasoningStripper, reasoning_meter, reported_reasoning_tokens, strip_reasoning
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, Union # Добавили Union
+
+# Expected answer sizes (characters of JSON) used to derive max_tokens per call.
+QUESTIONS_OUTPUT_CHARS = 7 * 160 + 40   # {"questions": [...]} with 5-7 questions
+LABEL_VALUE_OVERHEAD_CHARS = 7 * 40     # braces, quotes and keys of 5-7 {"label", "value"} items
+EXTRACT_OUTPUT_MAX_CHARS = 3000         # the extraction condenses the answers, it never outgrows this
+
 
 class NeuralService:
-    def __init__(self, settings: Settings):
+    def __init__(
+        self,
+        settings: Settings,
+        cache: Optional[LLMResponseCache] = None,
+        scheduler: Optional[LLMScheduler] = None,
+        backends: Optional[LLMBackendPool] = None,
+    ):
         self.settings = settings
+        self.cache = cache if cache is not None else llm_response_cache
+        self.scheduler = scheduler if scheduler is not None else llm_scheduler
+        self.reasoning = reasoning_meter
+        self.repair_counters = {"repaired": 0, "unrepairable": 0}
+        self._inflight = SingleFlight()
         self.api_key = self.settings.API_KEY
         self.api_url = self.settings.API_URL
         self.model_id = self.settings.MODEL_ID
+        self.profiles = task_profiles(self.settings)
 
         if not self.api_key or not self.api_key.startswith("hf_"):
              print("Warning: HF_ROUTER_API_KEY not set or doesn't look like a valid Hugging Face token in config.")
@@ -21,14 +52,26 @@ class NeuralService:
                  "Content-Type": "application/json",
              }
 
+        # API_URL/MODEL_ID/API_KEY form the single default backend unless LLM_BACKENDS lists several.
+        self.backends = backends if backends is not None else LLMBackendPool.from_settings(self.settings, self.headers, self.scheduler)
+        if len(self.backends.backends) > 1:
+             print(f"LLM backends: {', '.join(f'{b.name} ({b.model or self.model_id})' for b in self.backends.backends)}")
+
         if not self.api_url: print("Warning: HF_ROUTER_API_URL is not set in config.")
         if not self.model_id: print("Warning: HF_ROUTER_MODEL_ID is not set in config.")
         if not self.settings.AUTH_SERVICE_URL or "localhost" in self.settings.AUTH_SERVICE_URL:
              print(f"Warning: AUTH_SERVICE_URL is not set or using default/localhost value ({self.settings.AUTH_SERVICE_URL}). Ensure it's correct for your environment.")
 
+    def singleflight_stats(self) -> Dict[str, int]:
+        """Identical LLM requests started vs. coalesced onto one already in flight."""
+        return self._inflight.stats()
+
 
-    async def _call_api(self, user_content: str, system_prompt: str, request_json_output: bool = False) -> str:
-        """Sends request to the Hugging Face Router API (OpenAI format) and returns the response content."""
+    def _build_payload(
+        self, user_content: str, system_prompt: str, request_json_output: bool = False, task: str = EXTRACT, expected_chars: int = 0
+    ) -> Dict[str, Any]:
+        """Builds the OpenAI-format chat completion request body from the task's profile (model, temperature, max_tokens)."""
+        profile = self.profiles[task]
         messages = []
         if system_prompt:
             messages.append({"role": "system", "content": system_prompt})
@@ -37,100 +80,304 @@ class NeuralService:
         # print('\n-------\n',self.api_key,'\n-------\n') # Debugging: Avoid printing keys in production logs
 
         data: Dict[str, Any] = {
-            "model": self.model_id,
+            "model": profile.model,
             "messages": messages,
-            "temperature": 0.4,
-            "max_tokens": 4096,
+            "temperature": profile.temperature,
+            "max_tokens": derive_max_tokens(profile, expected_chars, self.settings),
             # "stream": False,
         }
 
         if request_json_output:
              data["response_format"] = {"type": "json_object"}
              # Prompt should also strongly request JSON list format
-
-        async with httpx.AsyncClient() as client:
-            try:
-                # print(f"Sending request to Hugging Face Router API: {self.api_url}") # Debugging
-                response = await client.post(
-                    self.api_url,
-                    json=data,
-                    headers=self.headers,
-                    timeout=90.0
-                )
-                response.raise_for_status()
-                response_data = response.json()
-                # print(f"HF Router Raw Response: {json.dumps(response_data, indent=2)}") # Debugging
-
-                if "choices" in response_data and len(response_data["choices"]) > 0:
-                    choice = response_data["choices"][0]
-                    finish_reason = choice.get("finish_reason")
-                    if finish_reason != "stop" and finish_reason != "eos":
-                         print(f"Warning: HF Router generation finished unexpectedly. Reason: {finish_reason}")
-
-                    if "message" in choice and "content" in choice["message"]:
-                        content = choice["message"]["content"]
-                        if content:
-                             return content.strip()
-                        else:
-                            if finish_reason == "length":
-                                print("Warning: Generation stopped due to length limit, content might be incomplete.")
-                                return content # Return potentially incomplete content
-                            elif finish_reason == "content_filter":
-                                raise Exception("HF Router API Error: Content filtered.")
-                            else:
-                                raise Exception(f"HF Router API Error: Empty 'content'. Finish reason: {finish_reason}")
+        return data
+
+    async def _call_api(
+        self,
+        user_content: str,
+        system_prompt: str,
+        request_json_output: bool = False,
+        priority: Priority = Priority.NORMAL,
+        task: str = EXTRACT,
+        expected_chars: int = 0,
+        coalesce: bool = True,
+    ) -> str:
+        """
+        Sends request to the Hugging Face Router API (OpenAI format) and returns the response content.
+        Concurrent calls with an identical request body (model, messages, response_format, ...) share one upstream request.
+        The request is dispatched through the outbound scheduler with the given priority.
+        With coalesce=False the request is sent on its own instead of as a shielded shared one, so cancelling the
+        caller cancels the request too, including its place in the scheduler queue (speculative work relies on that).
+        """
+        data = self._build_payload(user_content, system_prompt, request_json_output, task, expected_chars)
+        if not coalesce:
+            return await self._post_completion(data, priority, task)
+        request_key = hashlib.sha256(json.dumps(data, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+        if request_key in self._inflight:
+            print("Identical LLM request already in flight, awaiting its result.")
+        return await self._inflight.do(request_key, lambda: self._post_completion(data, priority, task))
+
+    async def _send_scheduled(self, data: Dict[str, Any], priority: Priority, task: str) -> httpx.Response:
+        """
+        Posts the payload to the backend pool once the scheduler admits it. A 429 that survives failover pauses the
+        scheduler for its Retry-After and the request is queued again, up to LLM_RATE_LIMIT_RETRIES times;
+        after that LLMBusy is raised.
+        """
+        estimated = estimate_tokens(data, self.settings.LLM_CHARS_PER_TOKEN)
+        for attempt in range(self.settings.LLM_RATE_LIMIT_RETRIES + 1):
+            async with self.scheduler.slot(priority, estimated):
+                with track("llm"):
+                    try:
+                        response, _ = await self.backends.send(data, task=task, timeout=self.profiles[task].timeout)
+                    except httpx.RequestError:
+                        record_upstream_error("llm", None)
+                        raise
+                retry_after = self.scheduler.observe(response)
+            if response.status_code >= 400:
+                record_upstream_error("llm", response.status_code)
+            if retry_after is None:
+                return response
+            print(f"HF Router API rate limited (429), attempt {attempt + 1}; retrying after {retry_after:.2f}s.")
+        raise LLMBusy(max(int(retry_after + 0.999), 1), "rate limited by the LLM provider")
+
+    async def _post_completion(self, data: Dict[str, Any], priority: Priority = Priority.NORMAL, task: str = EXTRACT) -> str:
+        try:
+            # print(f"Sending request to Hugging Face Router API: {self.api_url}") # Debugging
+            response = await self._send_scheduled(data, priority, task)
+            response.raise_for_status()
+            response_data = response.json()
+            usage = response_data.get("usage") if isinstance(response_data, dict) else None
+            self.scheduler.settle(
+                estimate_tokens(data, self.settings.LLM_CHARS_PER_TOKEN),
+                usage.get("total_tokens") if isinstance(usage, dict) else None,
+            )
+            if isinstance(usage, dict):
+                for kind in ("prompt", "completion"):
+                    if isinstance(usage.get(f"{kind}_tokens"), int):
+                        llm_tokens.labels(task, kind).inc(usage[f"{kind}_tokens"])
+                        trace_count(f"llm_{kind}_tokens", usage[f"{kind}_tokens"])
+            # print(f"HF Router Raw Response: {json.dumps(response_data, indent=2)}") # Debugging
+
+            if "choices" in response_data and len(response_data["choices"]) > 0:
+                choice = response_data["choices"][0]
+                finish_reason = choice.get("finish_reason")
+                if finish_reason != "stop" and finish_reason != "eos":
+                     print(f"Warning: HF Router generation finished unexpectedly. Reason: {finish_reason}")
+
+                if "message" in choice and "content" in choice["message"]:
+                    # Reasoning models put their trace inline (<think>...</think>) or, with reasoning_format=parsed, in "reasoning".
+                    content, reasoning_chars = strip_reasoning(choice["message"]["content"] or "")
+                    reasoning_chars += len(choice["message"].get("reasoning") or "")
+                    self.reasoning.record(reasoning_chars, reported_reasoning_tokens(response_data.get("usage")))
+                    if content:
+                         return content.strip()
                     else:
-                        raise Exception("HF Router API Error: Invalid response - 'message' or 'content' missing.")
-                elif "error" in response_data:
-                    error_info = response_data["error"]
-                    raise Exception(f"HF Router API Error: Type: {error_info.get('type','N/A')}, Code: {error_info.get('code','N/A')}, Message: {error_info.get('message', 'Unknown error')}")
+                        if finish_reason == "length":
+                            print("Warning: Generation stopped due to length limit, content might be incomplete.")
+                            if reasoning_chars:
+                                print(f"Warning: The reasoning trace ({reasoning_chars} chars) used up max_tokens; raise LLM_REASONING_TOKENS.")
+                            return content # Return potentially incomplete content
+                        elif finish_reason == "content_filter":
+                            raise Exception("HF Router API Error: Content filtered.")
+                        else:
+                            raise Exception(f"HF Router API Error: Empty 'content'. Finish reason: {finish_reason}")
                 else:
-                    raise Exception("HF Router API Error: Invalid response - no 'choices' or 'error'.")
-
-            except httpx.RequestError as e:
-                print(f"HF Router API Request Error: {e}")
-                raise Exception(f"Could not connect to HF Router API at {self.api_url}: {e}") from e
-            except httpx.HTTPStatusError as e:
-                 print(f"HF Router API HTTP Error: {e.response.status_code} - {e.response.text}")
-                 error_details = e.response.text # Default to raw text
-                 try:
-                     # Attempt to parse the JSON response body
-                     error_data = e.response.json()
-                     # Check if it's a dictionary and has an 'error' key
-                     if isinstance(error_data, dict) and "error" in error_data:
-                         extracted_error = error_data["error"]
-                         if isinstance(extracted_error, dict) and "message" in extracted_error:
-                             # Handle nested structure like OpenAI { "error": { "message": "...", ... } }
-                             error_details = extracted_error["message"]
-                         elif isinstance(extracted_error, str):
-                             # Handle simple structure like { "error": "Error message string" } (THIS IS OUR CASE)
-                             error_details = extracted_error
-                         else:
-                             # Fallback if the 'error' value is neither dict nor string
-                             error_details = str(extracted_error)
-                 except json.JSONDecodeError:
-                     # If JSON parsing fails, error_details remains the raw text
-                     print("Warning: Could not parse HF Router error response as JSON.")
-                     pass
-                 except Exception as parse_err:
-                     # Catch other potential errors during error parsing
-                     print(f"Warning: Error processing HF Router error response details: {parse_err}")
-                     pass # Keep raw text as error_details
-
-                 # Raise the exception with the best available details
-                 raise Exception(f"HF Router API returned an error: {e.response.status_code}. Details: {error_details}") from e
-            except json.JSONDecodeError as e:
-                 print(f"HF Router API JSON Decode Error: {e}")
-                 raw_text = "Could not retrieve raw text"
-                 if 'response' in locals() and hasattr(response, 'text'): raw_text = response.text
-                 raise Exception(f"Failed to parse HF Router API response as JSON. Raw text: {raw_text}") from e
+                    raise Exception("HF Router API Error: Invalid response - 'message' or 'content' missing.")
+            elif "error" in response_data:
+                error_info = response_data["error"]
+                raise Exception(f"HF Router API Error: Type: {error_info.get('type','N/A')}, Code: {error_info.get('code','N/A')}, Message: {error_info.get('message', 'Unknown error')}")
+            else:
+                raise Exception("HF Router API Error: Invalid response - no 'choices' or 'error'.")
+
+        except httpx.RequestError as e:
+            print(f"HF Router API Request Error: {e}")
+            raise Exception(f"Could not connect to HF Router API at {self.api_url}: {e}") from e
+        except httpx.HTTPStatusError as e:
+             print(f"HF Router API HTTP Error: {e.response.status_code} - {e.response.text}")
+             error_details = e.response.text # Default to raw text
+             try:
+                 # Attempt to parse the JSON response body
+                 error_data = e.response.json()
+                 # Check if it's a dictionary and has an 'error' key
+                 if isinstance(error_data, dict) and "error" in error_data:
+                     extracted_error = error_data["error"]
+                     if isinstance(extracted_error, dict) and "message" in extracted_error:
+                         # Handle nested structure like OpenAI { "error": { "message": "...", ... } }
+                         error_details = extracted_error["message"]
+                     elif isinstance(extracted_error, str):
+                         # Handle simple structure like { "error": "Error message string" } (THIS IS OUR CASE)
+                         error_details = extracted_error
+                     else:
+                         # Fallback if the 'error' value is neither dict nor string
+                         error_details = str(extracted_error)
+             except json.JSONDecodeError:
+                 # If JSON parsing fails, error_details remains the raw text
+                 print("Warning: Could not parse HF Router error response as JSON.")
+                 pass
+             except Exception as parse_err:
+                 # Catch other potential errors during error parsing
+                 print(f"Warning: Error processing HF Router error response details: {parse_err}")
+                 pass # Keep raw text as error_details
+
+             # Raise the exception with the best available details
+             raise Exception(f"HF Router API returned an error: {e.response.status_code}. Details: {error_details}") from e
+        except json.JSONDecodeError as e:
+             print(f"HF Router API JSON Decode Error: {e}")
+             raw_text = "Could not retrieve raw text"
+             if 'response' in locals() and hasattr(response, 'text'): raw_text = response.text
+             raise Exception(f"Failed to parse HF Router API response as JSON. Raw text: {raw_text}") from e
+        except Exception as e:
+             print(f"HF Router API Processing Error: {e}")
+             raise e
+
+    async def _stream_api(
+        self, user_content: str, system_prompt: str, priority: Priority = Priority.NORMAL, task: str = EXTRACT, expected_chars: int = 0
+    ) -> AsyncIterator[str]:
+        """
+        Sends a streaming (stream=True) chat completion request and yields content deltas as they arrive.
+        JSON mode is not requested: OpenAI-compatible providers (Groq included) reject response_format
+        together with streaming, so the prompt alone asks for JSON. Reasoning traces are dropped as they arrive and only counted.
+
+        The upstream is read by a separate task into an unbounded queue (a completion is bounded by max_tokens),
+        so the scheduler slot is released when the provider finishes, not when our client has read everything:
+        a slow or stalled client must not hold an LLM concurrency slot. Closing this iterator cancels the read.
+        """
+        deltas: "asyncio.Queue[Any]" = asyncio.Queue()
+        end = object()
+
+        async def pump() -> None:
+            try:
+                async for content in self._read_stream(user_content, system_prompt, priority, task, expected_chars):
+                    deltas.put_nowait(content)
             except Exception as e:
-                 print(f"HF Router API Processing Error: {e}")
-                 raise e
+                deltas.put_nowait(e)
+            else:
+                deltas.put_nowait(end)
+
+        reader = asyncio.ensure_future(pump())
+        try:
+            while True:
+                content = await deltas.get()
+                if content is end:
+                    return
+                if isinstance(content, Exception):
+                    raise content
+                yield content
+        finally:
+            reader.cancel()
+            await asyncio.gather(reader, return_exceptions=True)
+
+    async def _read_stream(
+        self, user_content: str, system_prompt: str, priority: Priority, task: str, expected_chars: int
+    ) -> AsyncIterator[str]:
+        """The upstream side of _stream_api; the scheduler slot is held until the provider's stream ends."""
+        data = self._build_payload(user_content, system_prompt, task=task, expected_chars=expected_chars)
+        data["stream"] = True
+        stripper = ReasoningStripper()
+        reasoning_chars = 0
+
+        try:
+            async with self.scheduler.slot(priority, estimate_tokens(data, self.settings.LLM_CHARS_PER_TOKEN)):
+                with track("llm_stream"):
+                    async with self.backends.stream(data, task=task, timeout=self.profiles[task].timeout) as response:
+                        if self.scheduler.observe(response) is not None:
+                            raise LLMBusy(max(int(self.scheduler.backoff_remaining() + 0.999), 1), "rate limited by the LLM provider")
+                        if response.status_code >= 400:
+                            record_upstream_error("llm", response.status_code)
+                            await response.aread()
+                            print(f"HF Router API HTTP Error (stream): {response.status_code} - {response.text}")
+                            raise Exception(f"HF Router API returned an error: {response.status_code}. Details: {response.text}")
+
+                        async for line in response.aiter_lines():
+                            if not line.startswith("data:"):
+                                continue
+                            payload = line[5:].strip()
+                            if payload == "[DONE]":
+                                break
+                            try:
+                                event = json.loads(payload)
+                            except json.JSONDecodeError:
+                                # Keep-alive comments or a garbled line must not end an otherwise healthy stream.
+                                print(f"Warning: Skipping malformed HF Router stream line: {payload[:200]!r}")
+                                continue
+                            if not isinstance(event, dict):
+                                continue
+                            if event.get("error"):
+                                raise Exception(f"HF Router API Error (stream): {event['error']}")
+                            choices = event.get("choices") or []
+                            if not choices:
+                                continue
+                            delta = choices[0].get("delta") or {}
+                            reasoning_chars += len(delta.get("reasoning") or "")
+                            content = stripper.feed(delta.get("content") or "")
+                            if content:
+                                yield content
+                            finish_reason = choices[0].get("finish_reason")
+                            if finish_reason and finish_reason not in ("stop", "eos"):
+                                print(f"Warning: HF Router stream finished unexpectedly. Reason: {finish_reason}")
+                        tail = stripper.flush()
+                        if tail:
+                            yield tail
+                        self.reasoning.record(reasoning_chars + stripper.reasoning_chars)
+        except httpx.RequestError as e:
+            record_upstream_error("llm", None)
+            print(f"HF Router API Request Error (stream): {e}")
+            raise Exception(f"Could not connect to HF Router API at {self.api_url}: {e}") from e
+
+    async def _stream_json_items(
+        self,
+        user_content: str,
+        system_prompt: str,
+        array_key: Optional[str],
+        context: str,
+        cache_key: Optional[str] = None,
+        use_cache: bool = True,
+        priority: Priority = Priority.NORMAL,
+        task: str = EXTRACT,
+        expected_chars: int = 0,
+    ) -> AsyncIterator[Any]:
+        """
+        Streams a completion and yields the items of its JSON array as each one closes.
+
+        Items are validated like their non-streaming counterparts (strings for the questions list,
+        {"label", "value"} objects otherwise). With a cache_key, a cached list is replayed at once
+        and a stream that closed its array is written back to the cache.
+        """
+        if cache_key is not None:
+            if use_cache:
+                cached = await self.cache.get(cache_key)
+                if cached is not None:
+                    for item in cached:
+                        yield item
+                    return
+            else:
+                self.cache.record_bypass()
+
+        parser = JSONArrayItemStream(key=array_key)
+        items: List[Any] = []
+        async for delta in self._stream_api(user_content, system_prompt, priority, task, expected_chars):
+            for raw_item in parser.feed(delta):
+                index = parser.items_emitted - 1
+                if array_key == "questions":
+                    item = raw_item if isinstance(raw_item, str) else None
+                    if item is None:
+                        print(f"Warning: Skipping non-string streamed question: {raw_item}")
+                else:
+                    item = self._validate_label_value_item(raw_item, index, context)
+                if item is not None:
+                    items.append(item)
+                    yield item
+        print(f"HF Router Raw streamed JSON String for {context}: {parser.text}")
+
+        if parser.done:
+            if cache_key is not None:
+                await self.cache.set(cache_key, items)
+        elif not items:
+            raise Exception(f"Failed to parse LLM {context} from stream (no complete JSON list).")
 
     def _clean_llm_json_response(self, raw_response: str) -> str:
-        """Cleans potential markdown code blocks from the LLM JSON response string."""
-        cleaned = raw_response.strip()
+        """Cleans reasoning traces and potential markdown code blocks from the LLM JSON response string."""
+        cleaned, _ = strip_reasoning(raw_response or "")
         if cleaned.startswith("```json"):
             cleaned = cleaned[7:]
             if cleaned.endswith("```"):
@@ -141,6 +388,43 @@ class NeuralService:
                   cleaned = cleaned[:-3]
         return cleaned.strip()
 
+    def _validate_label_value_item(self, item: Any, index: int, context: str) -> Optional[Dict[str, Any]]:
+        """Returns the normalized {"label", "value"} dict, or None (with a warning) if the item is invalid."""
+        if isinstance(item, dict) and "label" in item and "value" in item:
+            label = item.get("label")
+            value = item.get("value") # Value can be string, list, etc.
+
+            # Basic type validation for label
+            if not isinstance(label, str) or not label.strip():
+                 print(f"Warning: Skipping item at index {index} in LLM {context} due to invalid or empty label: {label}")
+                 return None
+
+            # You might want to add validation/transformation for 'value' here if needed
+            # For example, ensuring skills/technologies are lists or strings.
+            # For now, we accept Any valid JSON type for flexibility.
+            return {"label": label.strip(), "value": value}
+        print(f"Warning: Skipping invalid item at index {index} in LLM {context} list. Expected {{'label': ..., 'value': ...}}, got: {item}")
+        return None
+
+    def _load_llm_json(self, cleaned_response: str, context: str) -> Any:
+        """
+        json.loads, falling back to the local repair stage (unterminated strings/containers, single quotes,
+        trailing commas, stray values) so a slightly broken or truncated answer does not cost another generation.
+        """
+        try:
+            return json.loads(cleaned_response)
+        except json.JSONDecodeError as e:
+            try:
+                parsed_data, repairs = repair_json(cleaned_response)
+            except ValueError as repair_error:
+                self.repair_counters["unrepairable"] += 1
+                print(f"Error decoding JSON {context}: {e}; repair failed: {repair_error}")
+                raise e
+            self.repair_counters["repaired"] += 1
+            print(f"Warning: Repaired invalid JSON in LLM {context}: {'; '.join(repairs)}")
+            return parsed_data
+
+    @tracked("json_parse")
     def _parse_label_value_list(self, json_string: str, context: str = "response") -> List[Dict[str, Any]]:
         """
         Parses a JSON string expected to contain a list of {"label": ..., "value": ...} dicts.
@@ -163,13 +447,23 @@ class NeuralService:
             return [] # Return empty list for empty input
 
         try:
-            parsed_data = json.loads(cleaned_response)
+            parsed_data = self._load_llm_json(cleaned_response, context)
         except json.JSONDecodeError as e:
             print(f"Error decoding JSON {context}: {e}")
             print(f"LLM Raw response string was:\n{json_string}")
             print(f"Cleaned string attempted for parsing was:\n{cleaned_response}")
             raise ValueError(f"Failed to parse LLM {context} (Invalid JSON).") from e
 
+        # JSON mode forces a top-level object, so the list may arrive wrapped ({"items": [...]}) or as a single item.
+        if isinstance(parsed_data, dict):
+            list_values = [value for value in parsed_data.values() if isinstance(value, list)]
+            if len(list_values) == 1:
+                print(f"Warning: LLM {context} wrapped the list in an object; unwrapping it.")
+                parsed_data = list_values[0]
+            elif "label" in parsed_data and "value" in parsed_data:
+                print(f"Warning: LLM {context} returned a single item instead of a list; wrapping it.")
+                parsed_data = [parsed_data]
+
         # --- NEW Flexible Validation ---
         if not isinstance(parsed_data, list):
             print(f"Error: Expected LLM {context} to be a JSON list, but received type {type(parsed_data)}.")
@@ -180,21 +474,9 @@ class NeuralService:
 
         processed_list: List[Dict[str, Any]] = []
         for index, item in enumerate(parsed_data):
-            if isinstance(item, dict) and "label" in item and "value" in item:
-                label = item.get("label")
-                value = item.get("value") # Value can be string, list, etc.
-
-                # Basic type validation for label
-                if not isinstance(label, str) or not label.strip():
-                     print(f"Warning: Skipping item at index {index} in LLM {context} due to invalid or empty label: {label}")
-                     continue
-
-                # You might want to add validation/transformation for 'value' here if needed
-                # For example, ensuring skills/technologies are lists or strings.
-                # For now, we accept Any valid JSON type for flexibility.
-                processed_list.append({"label": label.strip(), "value": value})
-            else:
-                print(f"Warning: Skipping invalid item at index {index} in LLM {context} list. Expected {{'label': ..., 'value': ...}}, got: {item}")
+            valid_item = self._validate_label_value_item(item, index, context)
+            if valid_item is not None:
+                processed_list.append(valid_item)
 
         if not processed_list and parsed_data: # Original list wasn't empty, but nothing valid was found
              print(f"Warning: LLM {context} was a list, but contained no valid {{'label':..., 'value':...}} items.")
@@ -203,11 +485,58 @@ class NeuralService:
         # --- End NEW Flexible Validation ---
 
 
-    async def process_answers(self, answers: Dict[str, str]) -> List[Dict[str, Any]]:
+    def _cache_key(self, task: str, system_prompt: str, answers: Dict[str, str]) -> str:
+        return llm_cache_key(task, self.profiles[task].model, self.settings.PROMPT_VERSION, system_prompt, normalize_answers(answers))
+
+    async def _cached(self, task: str, system_prompt: str, answers: Dict[str, str], use_cache: bool, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Serves a parsed LLM result from the response cache, or computes and stores it.
+        With use_cache=False the cache is not read, but the fresh result still replaces the stored one.
+        """
+        key = self._cache_key(task, system_prompt, answers)
+        if use_cache:
+            cached = await self.cache.get(key)
+            if cached is not None:
+                print(f"LLM cache hit for task '{task}'.")
+                return cached
+        else:
+            self.cache.record_bypass()
+
+        result = await compute()
+        await self.cache.set(key, result)
+        return result
+
+    async def process_answers(
+        self, answers: Dict[str, str], use_cache: bool = True, priority: Priority = Priority.NORMAL, coalesce: bool = True
+    ) -> List[Dict[str, Any]]:
         """
         Generates structured data as a list of label/value pairs based on answers.
         Returns a list like [{"label": "hard_skills", "value": "..."}, {"label": "experience", "value": "..."}].
+        coalesce=False makes the call cancellable all the way down to the scheduler queue (see _call_api).
         """
+        return await self._cached(
+            EXTRACT, self.settings.SYSTEM_PROMPT, answers, use_cache,
+            lambda: self._process_answers(answers, priority, coalesce),
+        )
+
+    async def refine_extraction(
+        self, answers: Dict[str, str], base_result: List[Dict[str, Any]], extra_answers: Dict[str, str]
+    ) -> List[Dict[str, Any]]:
+        """
+        Completes an extraction made from a subset of `answers` (e.g. the speculative one) by feeding only the
+        answers it has not seen through update_resume. The result is cached like a full extraction of `answers`.
+        """
+        if not extra_answers:
+            return base_result
+        new_info = "Дополнительные ответы кандидата на уточняющие вопросы:\n" + "\n".join(
+            f"Q: {question}\nA: {answer}" for question, answer in extra_answers.items()
+        )
+        result = await self.update_resume(base_result, new_info)
+        await self.cache.set(self._cache_key(EXTRACT, self.settings.SYSTEM_PROMPT, answers), result)
+        return result
+
+    @staticmethod
+    def _extract_user_text(answers: Dict[str, str]) -> str:
         user_text_parts = [f"Q: {k}\nA: {v}" for k, v in answers.items()]
         user_text = "\n".join(user_text_parts)
 
@@ -215,11 +544,34 @@ class NeuralService:
         # Using the SYSTEM_PROMPT which should be updated in config.py
         # Example user instruction part (append to user_text):
         user_text += '\n\n---\nИзвлеки из приведенных выше ответов на вопросы релевантную информацию о кандидате и верни ее СТРОГО в формате JSON-**списка** объектов: `[{"label":"название_поля","value":"значение_поля"}, {"label":"другое_поле","value":"..."}, ...]`. В ответе должен быть ТОЛЬКО этот JSON-список и ничего больше. Сами label и values могут быть ТОЛЬКО строками. Не нужно большое обилие label, 5-7 строк должно быть достаточно, вместо этого они должны покрывать всю основную информацию'
+        return user_text
+
+    @staticmethod
+    def _extract_output_chars(answers: Dict[str, str]) -> int:
+        answer_chars = sum(len(str(k)) + len(str(v)) for k, v in answers.items())
+        return min(answer_chars, EXTRACT_OUTPUT_MAX_CHARS) + LABEL_VALUE_OVERHEAD_CHARS
+
+    async def stream_process_answers(self, answers: Dict[str, str], use_cache: bool = True) -> AsyncIterator[Dict[str, Any]]:
+        """Streaming variant of process_answers: yields each validated {"label", "value"} item as soon as it is closed."""
+        async for item in self._stream_json_items(
+            self._extract_user_text(answers), self.settings.SYSTEM_PROMPT,
+            array_key=None, context="skills response",
+            cache_key=self._cache_key(EXTRACT, self.settings.SYSTEM_PROMPT, answers), use_cache=use_cache,
+            task=EXTRACT, expected_chars=self._extract_output_chars(answers),
+        ):
+            yield item
+
+    async def _process_answers(self, answers: Dict[str, str], priority: Priority = Priority.NORMAL, coalesce: bool = True) -> List[Dict[str, Any]]:
+        user_text = self._extract_user_text(answers)
 
         nn_response_text = await self._call_api(
             user_text,
             self.settings.SYSTEM_PROMPT, # Ensure this prompt requests the [{"label":..."value":...}] list format
-            request_json_output=True
+            request_json_output=True,
+            priority=priority,
+            task=EXTRACT,
+            expected_chars=self._extract_output_chars(answers),
+            coalesce=coalesce,
         )
         print(f"HF Router Raw JSON String for Skills: {nn_response_text}") # Log raw response
 
@@ -237,17 +589,44 @@ class NeuralService:
              raise e
 
 
-    async def generate_follow_up_questions(self, answers: Dict[str, str]) -> List[str]:
+    async def generate_follow_up_questions(self, answers: Dict[str, str], use_cache: bool = True) -> List[str]:
         """Generates follow-up questions based on previous answers using HF Router."""
-        # --- This function's logic remains the same, it expects {"questions": [...]} ---
+        return await self._cached(
+            QUESTIONS, self.settings.FOLLOW_UP_QUESTIONS_PROMPT, answers, use_cache,
+            lambda: self._generate_follow_up_questions(answers),
+        )
+
+    @staticmethod
+    def _follow_up_user_text(answers: Dict[str, str]) -> str:
         user_text = "Предыдущие ответы пользователя:\n" + "\n".join(f"- {k}: {v}" for k, v in answers.items())
         user_text += '\n\n---\nНа основе этих ответов, сгенерируй 5-7 УТОЧНЯЮЩИХ вопросов, чтобы глубже понять опыт и навыки кандидата. Верни результат СТРОГО в формате JSON-объекта: {"questions": ["вопрос1", "вопрос2", ...]}. В ответе должен быть ТОЛЬКО JSON-объект и ничего больше.'
+        return user_text
+
+    async def stream_follow_up_questions(self, answers: Dict[str, str], use_cache: bool = True) -> AsyncIterator[str]:
+        """
+        Streaming variant of generate_follow_up_questions: yields each question as soon as the model
+        has finished writing it. A cached result is replayed at once; a completed stream is cached.
+        """
+        async for question in self._stream_json_items(
+            self._follow_up_user_text(answers), self.settings.FOLLOW_UP_QUESTIONS_PROMPT,
+            array_key="questions", context="questions response",
+            cache_key=self._cache_key(QUESTIONS, self.settings.FOLLOW_UP_QUESTIONS_PROMPT, answers), use_cache=use_cache,
+            priority=Priority.INTERACTIVE, task=QUESTIONS, expected_chars=QUESTIONS_OUTPUT_CHARS,
+        ):
+            yield question
+
+    async def _generate_follow_up_questions(self, answers: Dict[str, str]) -> List[str]:
+        # --- This function's logic remains the same, it expects {"questions": [...]} ---
+        user_text = self._follow_up_user_text(answers)
 
         print("Sending request to HF Router for follow-up questions...")
         raw_response = await self._call_api(
             user_text,
             self.settings.FOLLOW_UP_QUESTIONS_PROMPT, # Use specific prompt if defined
-            request_json_output=True
+            request_json_output=True,
+            priority=Priority.INTERACTIVE,
+            task=QUESTIONS,
+            expected_chars=QUESTIONS_OUTPUT_CHARS,
         )
         print(f"HF Router Raw JSON String for questions: {raw_response}") # Log raw response
 
@@ -256,7 +635,7 @@ class NeuralService:
             if not cleaned_response:
                 raise json.JSONDecodeError("Empty string received from API after cleaning", cleaned_response, 0)
 
-            questions_data = json.loads(cleaned_response)
+            questions_data = self._load_llm_json(cleaned_response, "questions response")
 
             if isinstance(questions_data, dict) and "questions" in questions_data and isinstance(questions_data["questions"], list):
                  questions_list = questions_data["questions"]
@@ -291,38 +670,129 @@ class NeuralService:
              raise e
 
 
-    async def update_resume(self, current_data: List[Any], new_info: str):
-        """
-        Updates the structured data based on existing data and new user info.
-        Receives a list of LabelValueItem objects from the router.
-        Returns a list like [{"label": "...", "value": "..."}, ...].
-        """
+    @staticmethod
+    def _label_value(item: Any) -> Tuple[Any, Any]:
+        """current_data items are LabelValueItem objects from the router, or plain dicts from a previous extraction."""
+        if isinstance(item, dict):
+            return item.get('label', 'N/A'), item.get('value', 'N/A')
+        return getattr(item, 'label', 'N/A'), getattr(item, 'value', 'N/A')
+
+    @classmethod
+    def _update_context_text(cls, current_data: List[Any], new_info: str) -> str:
         # Представляем текущие данные LLM в понятном виде
-        # Correctly access attributes of LabelValueItem objects
         current_context_parts = []
         for item in current_data:
-             # Check if item has the attributes before accessing, good practice
-             label = getattr(item, 'label', 'N/A')
-             value = getattr(item, 'value', 'N/A')
+             label, value = cls._label_value(item)
              current_context_parts.append(f"- {label}: {value}")
 
-        # Or, assuming item will always be LabelValueItem as passed from router:
-        # current_context_parts = [f"- {item.label}: {item.value}" for item in current_data]
-
         current_context_text = "Текущие структурированные данные:\n" + "\n".join(current_context_parts)
 
-        combined_text = f"{current_context_text}\n\nДополнительные инструкции/информация от пользователя для обновления:\n{new_info}"
+        return f"{current_context_text}\n\nДополнительные инструкции/информация от пользователя для обновления:\n{new_info}"
 
+    @classmethod
+    def _update_user_text(cls, current_data: List[Any], new_info: str) -> str:
+        combined_text = cls._update_context_text(current_data, new_info)
 
         # --- Используем промпт, который просит обновить и вернуть В ТОМ ЖЕ ФОРМАТЕ списка ---
         # Используем UPDATE_PROMPT из config.py
         user_prompt_instruction = '\n\n---\nПроанализируй весь приведенный выше текст (текущие данные + инструкции) и верни ОБНОВЛЕННУЮ И ПОЛНУЮ информацию о кандидате СТРОГО в формате JSON-**списка** объектов: `[{"label":"название_поля","value":"обновленное_значение"}, ...]`. Сохраняй релевантные существующие поля, обновляй их или добавляй новые на основе инструкций. В ответе должен быть ТОЛЬКО этот JSON-список. сами label и values могут быть ТОЛЬКО строками. Не нужно большое обилие label, 5-7 строк должно быть достаточно, вместо этого они должны покрывать всю основную информацию'
-        full_user_content = combined_text + user_prompt_instruction
+        return combined_text + user_prompt_instruction
+
+    @classmethod
+    def _update_output_chars(cls, current_data: List[Any], new_info: str) -> int:
+        """The updated list repeats the current one plus whatever the new information adds."""
+        current_chars = sum(len(str(label)) + len(str(value)) for label, value in map(cls._label_value, current_data))
+        return current_chars + len(new_info) + LABEL_VALUE_OVERHEAD_CHARS
+
+    @classmethod
+    def _update_delta_user_text(cls, current_data: List[Any], new_info: str) -> str:
+        combined_text = cls._update_context_text(current_data, new_info)
+        user_prompt_instruction = '\n\n---\nОпредели, какие пары label-value нужно изменить, добавить или удалить согласно инструкциям, и верни ТОЛЬКО эти изменения СТРОГО в формате JSON-объекта: `{"operations": [{"op": "modify|add|delete", "label": "...", "value": "..."}, ...]}`. Не включай в ответ пары, которые не меняются. Для "modify" label пиши точно так же, как в текущих данных, а value - полностью, а не только добавку.'
+        return combined_text + user_prompt_instruction
+
+    @classmethod
+    def _update_delta_output_chars(cls, current_data: List[Any], new_info: str) -> int:
+        """A typical edit rewrites one section: the longest current value plus the new information."""
+        longest_value = max((len(str(cls._label_value(item)[1])) for item in current_data), default=0)
+        return longest_value + len(new_info) + LABEL_VALUE_OVERHEAD_CHARS
+
+    async def _update_resume_delta(self, current_data: List[Any], new_info: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Asks the model only for add/modify/delete operations and merges them into current_data locally
+        (see merge_operations for the conflict rules). Returns None if the answer has no operations list, or if
+        none of its operations could be applied, so the caller falls back to a full update. Models regularly
+        ignore the delta format and answer with the complete label/value list; that list is used as is.
+        """
+        raw_response = await self._call_api(
+            self._update_delta_user_text(current_data, new_info),
+            self.settings.UPDATE_DELTA_PROMPT,
+            request_json_output=True,
+            task=UPDATE,
+            expected_chars=self._update_delta_output_chars(current_data, new_info),
+        )
+        print(f"Raw JSON String for update operations: {raw_response}")
+
+        cleaned_response = self._clean_llm_json_response(raw_response)
+        try:
+            operations = parse_operations(self._load_llm_json(cleaned_response, "update delta response")) if cleaned_response else None
+        except json.JSONDecodeError:
+            operations = None
+        if operations is None:
+            return None
+
+        if operations and not any(is_operation(item) for item in operations):
+            replacement = []
+            for index, item in enumerate(operations):
+                valid_item = self._validate_label_value_item(item, index, "update delta response")
+                if valid_item is not None:
+                    replacement.append(valid_item)
+            if replacement:
+                print(f"Warning: LLM answered the update with {len(replacement)} label/value item(s) instead of operations; using them as the full update.")
+                return replacement
+            return None
+
+        current = [dict(zip(("label", "value"), self._label_value(item))) for item in current_data]
+        merged, report, applied = merge_operations(current, operations)
+        print(f"Applied {applied} of {len(operations)} update operation(s): {'; '.join(report) or 'no changes'}")
+        if operations and not applied:
+            return None
+        return merged
+
+    async def stream_update_resume(self, current_data: List[Any], new_info: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streaming variant of update_resume: yields each validated {"label", "value"} item as soon as it is closed.
+        It always asks for the full updated list, whatever LLM_UPDATE_MODE says: in delta mode the merged list
+        would only be known once every operation is in, and a stream that buffers everything is no stream.
+        """
+        async for item in self._stream_json_items(
+            self._update_user_text(current_data, new_info), self.settings.UPDATE_PROMPT,
+            array_key=None, context="update response",
+            task=UPDATE, expected_chars=self._update_output_chars(current_data, new_info),
+        ):
+            yield item
+
+    async def update_resume(self, current_data: List[Any], new_info: str):
+        """
+        Updates the structured data based on existing data and new user info.
+        Receives a list of LabelValueItem objects from the router.
+        Returns a list like [{"label": "...", "value": "..."}, ...].
+        With LLM_UPDATE_MODE=delta the model only returns the changes (see _update_resume_delta); a full
+        regeneration is the fallback when it does not answer with an operations list.
+        """
+        if self.settings.LLM_UPDATE_MODE == "delta":
+            merged = await self._update_resume_delta(current_data, new_info)
+            if merged is not None:
+                return merged
+            print("Warning: LLM did not return update operations, falling back to a full update.")
+
+        full_user_content = self._update_user_text(current_data, new_info)
 
         nn_response_text = await self._call_api(
             full_user_content,
             self.settings.UPDATE_PROMPT, # Ensure this prompt understands context and asks for List[Dict] format
-            request_json_output=True
+            request_json_output=True,
+            task=UPDATE,
+            expected_chars=self._update_output_chars(current_data, new_info),
         )
         print(f"Raw JSON String for REGENERATED/UPDATED Data: {nn_response_text}")
 
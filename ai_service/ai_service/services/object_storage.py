@@ -0,0 +1,77 @@
+# ai_service/services/object_storage.py
+import asyncio
+import io
+import logging
+from datetime import timedelta
+from typing import Any, Optional
+
+from ai_service.config import Settings, settings
+
+log = logging.getLogger(__name__)
+
+
+class ObjectStorage:
+    """
+    S3-compatible bucket (the MinIO instance resume_storage writes to) for rendered PDFs.
+
+    Uses the `minio` client, imported only when PDF_STORAGE_ENDPOINT is set. Its calls are blocking, so uploads
+    run in a thread; presigning is local computation (the region is configured, so no bucket lookup is made).
+    `client` / `public_client` take anything with minio's put_object / presigned_get_object / bucket_exists /
+    make_bucket methods, e.g. benchmarks.fake_s3.FakeS3.
+    """
+
+    def __init__(self, settings: Settings, client: Any = None, public_client: Any = None):
+        self.settings = settings
+        self.bucket = settings.PDF_STORAGE_BUCKET
+        self._client = client
+        self._public_client = public_client
+
+    @property
+    def enabled(self) -> bool:
+        return self._client is not None
+
+    def _make_client(self, endpoint: str) -> Any:
+        try:
+            from minio import Minio
+        except ImportError as e:
+            raise RuntimeError("PDF_STORAGE_ENDPOINT is set but the 'minio' package is not installed.") from e
+        return Minio(
+            endpoint,
+            access_key=self.settings.PDF_STORAGE_ACCESS_KEY,
+            secret_key=self.settings.PDF_STORAGE_SECRET_KEY,
+            secure=self.settings.PDF_STORAGE_SECURE,
+            region=self.settings.PDF_STORAGE_REGION,
+        )
+
+    async def start(self) -> None:
+        if self._client is None:
+            if not self.settings.PDF_STORAGE_ENDPOINT:
+                log.info("PDF_STORAGE_ENDPOINT is not set, asynchronous PDF jobs are disabled.")
+                return
+            self._client = self._make_client(self.settings.PDF_STORAGE_ENDPOINT)
+            if self.settings.PDF_STORAGE_PUBLIC_ENDPOINT:
+                self._public_client = self._make_client(self.settings.PDF_STORAGE_PUBLIC_ENDPOINT)
+        try:
+            await asyncio.to_thread(self._ensure_bucket)
+        except Exception as e:
+            # The bucket may still appear (resume_storage creates it too); uploads will report the error then.
+            log.warning(f"Could not check PDF bucket '{self.bucket}': {e}")
+        log.info(f"PDF object storage ready (bucket '{self.bucket}').")
+
+    def _ensure_bucket(self) -> None:
+        if not self._client.bucket_exists(self.bucket):
+            self._client.make_bucket(self.bucket)
+
+    async def put(self, key: str, content: bytes, content_type: str = "application/pdf") -> None:
+        await asyncio.to_thread(
+            self._client.put_object, self.bucket, key, io.BytesIO(content), len(content), content_type=content_type
+        )
+
+    def presigned_url(self, key: str, expires: Optional[int] = None) -> str:
+        client = self._public_client or self._client
+        return client.presigned_get_object(
+            self.bucket, key, expires=timedelta(seconds=expires or self.settings.PDF_URL_TTL)
+        )
+
+
+object_storage = ObjectStorage(settings)
@@ -0,0 +1,135 @@
+# ai_service/services/pdf_cache.py
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import fpdf
+
+from ai_service.config import Settings, settings
+
+log = logging.getLogger(__name__)
+
+# Bump whenever a change to pdf_generator (layout, fonts, text handling) changes the bytes it renders, so entries
+# cached in memory or spilled to disk by an older build are not served after a deploy.
+PDF_RENDERER_VERSION = 1
+
+
+def pdf_cache_key(resume_data: List[Dict[str, Any]], user_info: Optional[Dict[str, Any]]) -> str:
+    """Canonical content hash of everything that influences the rendered PDF, renderer version included."""
+    canonical = json.dumps(
+        {
+            "renderer": [PDF_RENDERER_VERSION, fpdf.FPDF_VERSION],
+            "resume_data": resume_data,
+            "user_info": user_info or {},
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class PDFResultCache:
+    """
+    Content-addressed cache of rendered PDFs.
+
+    The in-memory tier is an LRU bounded by total bytes (PDF_CACHE_MAX_BYTES). If PDF_CACHE_SPILL_DIR
+    is set, entries evicted from memory are written there and served from disk until the directory
+    exceeds PDF_CACHE_SPILL_MAX_BYTES, at which point the oldest files are pruned.
+    """
+
+    def __init__(self, settings: Settings):
+        self.max_bytes = settings.PDF_CACHE_MAX_BYTES
+        self.spill_dir = settings.PDF_CACHE_SPILL_DIR or None
+        self.spill_max_bytes = settings.PDF_CACHE_SPILL_MAX_BYTES
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+        if self.spill_dir:
+            os.makedirs(self.spill_dir, exist_ok=True)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._size
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "bytes": self._size, "hits": self.hits, "misses": self.misses}
+
+    # --- Disk tier (blocking, always called through asyncio.to_thread) ---
+    def _spill_path(self, key: str) -> str:
+        return os.path.join(self.spill_dir, f"{key}.pdf")
+
+    def _read_spill(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self._spill_path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _write_spill(self, items: List[Any]) -> None:
+        for key, content in items:
+            tmp_path = self._spill_path(key) + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, self._spill_path(key))
+        self._prune_spill()
+
+    def _prune_spill(self) -> None:
+        files = []
+        for entry in os.scandir(self.spill_dir):
+            if entry.is_file() and entry.name.endswith(".pdf"):
+                stat = entry.stat()
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.spill_max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except FileNotFoundError:
+                pass
+
+    # --- Public API ---
+    async def get(self, key: str) -> Optional[bytes]:
+        content = self._entries.get(key)
+        if content is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return content
+        if self.spill_dir:
+            content = await asyncio.to_thread(self._read_spill, key)
+            if content is not None:
+                self.hits += 1
+                await self.put(key, content)
+                return content
+        self.misses += 1
+        return None
+
+    async def put(self, key: str, content: bytes) -> None:
+        if len(content) > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._size -= len(previous)
+        self._entries[key] = content
+        self._size += len(content)
+
+        evicted = []
+        while self._size > self.max_bytes:
+            old_key, old_content = self._entries.popitem(last=False)
+            self._size -= len(old_content)
+            evicted.append((old_key, old_content))
+        if evicted and self.spill_dir:
+            try:
+                await asyncio.to_thread(self._write_spill, evicted)
+            except OSError as e:
+                log.warning(f"Failed to spill {len(evicted)} PDF(s) to {self.spill_dir}: {e}")
+
+
+pdf_result_cache = PDFResultCache(settings)
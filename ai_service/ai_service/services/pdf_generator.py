@@ -1,7 +1,11 @@
 # ai_service/services/pdf_generator.py
+import copy
+import io
 import os
+from fontTools import ttLib
 from fpdf import FPDF
-from typing import Dict, List, Any, Tuple
+from fpdf.fonts import SubsetMap
+from typing import Dict, List, Any, Optional, Tuple
 import datetime
 import re
 import logging
@@ -36,6 +40,54 @@ logging.basicConfig(level=logging.INFO)
 log = logging.getLogger(__name__)
 
 
+class FontCache:
+    """
+    Parses each TTF font once per process and hands every FPDF document its own lightweight copy.
+
+    FPDF.add_font reads the file and rebuilds the cmap and glyph width tables on every call, which
+    is the largest fixed cost of a resume PDF. Here the parsed TTFFont is kept as a template; the
+    read-only metric tables (cw, cmap, glyph_ids) are shared, while everything fpdf2 mutates while
+    writing a document (subset map, font descriptor, the fontTools TTFont that gets subsetted in
+    place) is fresh per document. Subsetting therefore still happens per document.
+    """
+
+    _templates: Dict[Tuple[str, str], Any] = {}
+    _font_bytes: Dict[str, bytes] = {}
+
+    @classmethod
+    def clear(cls) -> None:
+        cls._templates.clear()
+        cls._font_bytes.clear()
+
+    @classmethod
+    def _template(cls, family: str, style: str, path: str) -> Any:
+        key = (path, style)
+        template = cls._templates.get(key)
+        if template is None:
+            scratch = FPDF()
+            scratch.add_font(family, style, path)
+            template = scratch.fonts[f"{family.lower()}{style}"]
+            with open(path, "rb") as f:
+                cls._font_bytes[path] = f.read()
+            cls._templates[key] = template
+        return template
+
+    @classmethod
+    def add_font(cls, pdf: FPDF, family: str, style: str, path: str) -> None:
+        """Registers a font on pdf, reusing the parsed data from previous documents."""
+        template = cls._template(family, style, path)
+        font = copy.copy(template)
+        font.i = len(pdf.fonts) + 1
+        font.fontkey = f"{family.lower()}{style}"
+        font.ttfont = ttLib.TTFont(io.BytesIO(cls._font_bytes[path]), recalcTimestamp=False, lazy=True)
+        font.desc = copy.copy(template.desc)
+        font.missing_glyphs = []
+        font.biggest_size_pt = 0
+        font._hbfont = None
+        font.subset = SubsetMap(font)
+        pdf.fonts[font.fontkey] = font
+
+
 class PDFResumeGenerator:
 
     def __init__(self):
@@ -48,8 +100,8 @@ class PDFResumeGenerator:
 
         if font_regular_exists and font_bold_exists:
             try:
-                self.pdf.add_font(FONT_FAMILY, '', DEJAVU_FONT_REGULAR, uni=True)
-                self.pdf.add_font(FONT_FAMILY, FONT_STYLE_BOLD, DEJAVU_FONT_BOLD, uni=True)
+                FontCache.add_font(self.pdf, FONT_FAMILY, FONT_STYLE_NORMAL, DEJAVU_FONT_REGULAR)
+                FontCache.add_font(self.pdf, FONT_FAMILY, FONT_STYLE_BOLD, DEJAVU_FONT_BOLD)
                 log.info(f"Successfully loaded DejaVu fonts from {DEJAVU_FONT_PATH_DIR}")
             except RuntimeError as e:
                 log.error(f"Error loading DejaVu font: {e}. Falling back.", exc_info=True)
@@ -66,8 +118,8 @@ class PDFResumeGenerator:
         self.pdf.set_left_margin(15)
         self.pdf.set_right_margin(15)
         self.line_height = FONT_SIZE_VALUE * LINE_HEIGHT_MULTIPLIER # Базовая высота строки по размеру значения
-        log.debug(f"Page width: {self.pdf.w}mm, Left margin: {self.pdf.l_margin}mm, Right margin: {self.pdf.r_margin}mm")
-        log.debug(f"Effective page width (epw): {self.pdf.epw}mm")
+        log.debug("Page width: %smm, Left margin: %smm, Right margin: %smm", self.pdf.w, self.pdf.l_margin, self.pdf.r_margin)
+        log.debug("Effective page width (epw): %smm", self.pdf.epw)
 
     def _set_font_normal(self, size=FONT_SIZE_VALUE):
         self.pdf.set_font(FONT_FAMILY, FONT_STYLE_NORMAL, size)
@@ -77,18 +129,34 @@ class PDFResumeGenerator:
 
     def _add_text_block(self, text: str, size=FONT_SIZE_VALUE, style=FONT_STYLE_NORMAL):
         try:
-            log.debug(f"Adding text block: '{text[:100]}...' at y={self.pdf.get_y()}, x={self.pdf.get_x()}")
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug("Adding text block: '%s...' at y=%s, x=%s", text[:100], self.pdf.get_y(), self.pdf.get_x())
+                log.debug("Available width for multi_cell: %.2fmm", self.pdf.epw)
             self.pdf.set_font(FONT_FAMILY, style, size)
-            available_width = self.pdf.epw
-            log.debug(f"Available width for multi_cell: {available_width:.2f}mm")
             self.pdf.multi_cell(0, size * LINE_HEIGHT_MULTIPLIER, text)
             self.pdf.ln(size * LINE_HEIGHT_MULTIPLIER * 0.3)
         except Exception as e:
             log.error(f"Error adding text block: {e}. Text was: '{text}'", exc_info=True)
             raise
 
-    def _extract_header_data(self, resume_data: List[Dict[str, str]]) -> Tuple[Dict[str, str], List[Dict[str, str]]]:
+    @staticmethod
+    def _header_from_user_info(user_info: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        """Maps a user-service profile (name, surname, email, phone_number) onto header fields."""
+        if not user_info:
+            return {}
+        header = {}
+        full_name = " ".join(part for part in (user_info.get("name"), user_info.get("surname")) if part)
+        if full_name:
+            header["name"] = full_name
+        if user_info.get("email"):
+            header["email"] = user_info["email"]
+        if user_info.get("phone_number"):
+            header["phone"] = user_info["phone_number"]
+        return header
+
+    def _extract_header_data(self, resume_data: List[Dict[str, str]], user_info: Optional[Dict[str, Any]] = None) -> Tuple[Dict[str, str], List[Dict[str, str]]]:
         header_info = {"name": "N/A", "email": "N/A", "phone": "N/A"}
+        header_info.update(self._header_from_user_info(user_info))
         other_data = []
         found_header_labels = set()
 
@@ -103,7 +171,7 @@ class PDFResumeGenerator:
                         header_info[field_key] = value
                         found_header_labels.add(label_lower)
                         found = True
-                        log.debug(f"Found header field '{field_key}' with label '{item.get('label')}'")
+                        log.debug("Found header field '%s' with label '%s'", field_key, item.get('label'))
                         break
 
             if not found:
@@ -113,15 +181,16 @@ class PDFResumeGenerator:
                     log.warning(f"Skipping item due to missing label or value: {item}")
 
 
-        log.info(f"Extracted header: {header_info}")
+        log.info("Extracted header: %s", header_info)
         other_data = [item for item in other_data if item.get("label") and item.get("value")]
-        log.info(f"Remaining data items for main content: {len(other_data)}")
+        log.info("Remaining data items for main content: %d", len(other_data))
         return header_info, other_data
 
 
-    def generate(self, resume_data: List[Dict[str, str]]) -> bytes:
+    def generate(self, resume_data: List[Dict[str, str]], user_info: Optional[Dict[str, Any]] = None) -> bytes:
         """
         Генерирует PDF резюме из списка label-value пар.
+        Данные профиля (user_info) используются для шапки, если в resume_data нет имени/почты/телефона.
         """
         try:
             log.info("Starting PDF generation with structured data...")
@@ -143,13 +212,13 @@ class PDFResumeGenerator:
 
 
             # --- 1. Extract Header Data ---
-            header_info, other_data = self._extract_header_data(resume_data)
+            header_info, other_data = self._extract_header_data(resume_data, user_info)
             name = header_info.get("name", "Имя не указано")
             email = header_info.get("email", "Почта не указана")
             phone = header_info.get("phone", "Телефон не указан")
 
             # --- 2. Render Header ---
-            log.debug(f"Rendering Name: '{name[:50]}...'")
+            log.debug("Rendering Name: '%s...'", name[:50])
             self.pdf.set_font(FONT_FAMILY, FONT_STYLE_BOLD, FONT_SIZE_NAME)
             self.pdf.multi_cell(0, FONT_SIZE_NAME * LINE_HEIGHT_MULTIPLIER * 0.8, name, align='C', new_x="LMARGIN", new_y="NEXT")
             self.pdf.ln(self.line_height * 0.2)
@@ -162,7 +231,7 @@ class PDFResumeGenerator:
             contact_string = HEADER_SEPARATOR.join(contact_parts)
 
             if contact_string:
-                log.debug(f"Rendering Contact: '{contact_string[:100]}...'")
+                log.debug("Rendering Contact: '%s...'", contact_string[:100])
                 self.pdf.set_font(FONT_FAMILY, FONT_STYLE_NORMAL, FONT_SIZE_CONTACT)
                 self.pdf.multi_cell(0, FONT_SIZE_CONTACT * LINE_HEIGHT_MULTIPLIER, contact_string, align='C', new_x="LMARGIN", new_y="NEXT")
                 self.pdf.ln(self.line_height * 1.5)
@@ -171,9 +240,11 @@ class PDFResumeGenerator:
                  self.pdf.ln(self.line_height)
 
             # --- 3. Render Main Content (Label-Value Pairs) ---
-            log.debug(f"Rendering {len(other_data)} label-value items...")
+            log.debug("Rendering %d label-value items...", len(other_data))
             effective_page_width = self.pdf.epw
-            log.debug(f"Using effective page width (epw): {effective_page_width:.2f}mm for content.")
+            # Checked once: the per-item debug lines below would otherwise call get_x()/get_y() on every item.
+            debug = log.isEnabledFor(logging.DEBUG)
+            log.debug("Using effective page width (epw): %.2fmm for content.", effective_page_width)
 
             for i, item in enumerate(other_data):
                 label = item.get("label", "Нет лейбла").strip()
@@ -183,13 +254,15 @@ class PDFResumeGenerator:
                      log.warning(f"Skipping item {i+1} due to empty label or value after stripping: Label='{label}', Value='{value}'")
                      continue
 
-                log.debug(f"Rendering item {i+1}: Label='{label}', Value='{value[:50]}...'")
+                if debug:
+                    log.debug("Rendering item %d: Label='%s', Value='%s...'", i + 1, label, value[:50])
 
                 if i > 0:
                     self.pdf.ln(self.line_height * 0.5)
 
                 current_y_before_label = self.pdf.get_y()
-                log.debug(f"Before Label '{label}': y={current_y_before_label:.2f}")
+                if debug:
+                    log.debug("Before Label '%s': y=%.2f", label, current_y_before_label)
 
                 # Render Label (Bold)
                 self._set_font_bold(size=FONT_SIZE_LABEL)
@@ -203,7 +276,8 @@ class PDFResumeGenerator:
                 self.pdf.multi_cell(effective_page_width, label_height, f"{label}:", new_x="LMARGIN", new_y="NEXT")
 
                 current_y_after_label_text = self.pdf.get_y()
-                log.debug(f"After Label Text '{label}': y={current_y_after_label_text:.2f}")
+                if debug:
+                    log.debug("After Label Text '%s': y=%.2f", label, current_y_after_label_text)
 
                 # --- Add Decorative Line Under Label ---
                 line_y = current_y_after_label_text - label_height * 0.3 + LABEL_LINE_OFFSET_Y
@@ -211,7 +285,8 @@ class PDFResumeGenerator:
                     line_y = current_y_after_label_text - 1.0
                 line_y = max(line_y, self.pdf.t_margin)
 
-                log.debug(f"Drawing decorative line for '{label}' at y={line_y:.2f} (from {self.pdf.l_margin} to {self.pdf.w - self.pdf.r_margin})")
+                if debug:
+                    log.debug("Drawing decorative line for '%s' at y=%.2f (from %s to %s)", label, line_y, self.pdf.l_margin, self.pdf.w - self.pdf.r_margin)
                 self.pdf.set_draw_color(*LABEL_LINE_COLOR)
                 self.pdf.set_line_width(LABEL_LINE_WIDTH)
                 self.pdf.line(self.pdf.l_margin, line_y, self.pdf.w - self.pdf.r_margin, line_y)
@@ -222,15 +297,16 @@ class PDFResumeGenerator:
                 # --- End Decorative Line ---
 
 
-                current_y_before_value = self.pdf.get_y()
-                log.debug(f"After Line & Spacing, Before Value: y={current_y_before_value:.2f}")
+                if debug:
+                    log.debug("After Line & Spacing, Before Value: y=%.2f", self.pdf.get_y())
 
                 # Render Value (Normal)
                 self._set_font_normal(size=FONT_SIZE_VALUE)
                 value_height = FONT_SIZE_VALUE * LINE_HEIGHT_MULTIPLIER
                 self.pdf.set_x(self.pdf.l_margin)
 
-                log.debug(f"Before Value multi_cell: x={self.pdf.get_x():.2f}, y={self.pdf.get_y():.2f}, width={effective_page_width:.2f}, height={value_height:.2f}")
+                if debug:
+                    log.debug("Before Value multi_cell: x=%.2f, y=%.2f, width=%.2f, height=%.2f", self.pdf.get_x(), self.pdf.get_y(), effective_page_width, value_height)
                 if effective_page_width <= 0:
                      log.error(f"EPW is non-positive ({effective_page_width:.2f})! Cannot render value for label '{label}'.")
                      continue
@@ -248,14 +324,14 @@ class PDFResumeGenerator:
 
                 self.pdf.multi_cell(effective_page_width, value_height, value, new_x="LMARGIN", new_y="NEXT")
 
-                current_y_after_value = self.pdf.get_y()
-                log.debug(f"After Value: y={current_y_after_value:.2f}")
+                if debug:
+                    log.debug("After Value: y=%.2f", self.pdf.get_y())
 
             # --- 4. Output ---
             log.info("PDF generation complete, preparing output.")
             pdf_output_raw = self.pdf.output(dest='S')
             # Log the actual type returned for easier debugging in the future
-            log.debug(f"Type returned by self.pdf.output(dest='S'): {type(pdf_output_raw)}")
+            log.debug("Type returned by self.pdf.output(dest='S'): %s", type(pdf_output_raw))
 
             pdf_output_bytes = None # Initialize
             if isinstance(pdf_output_raw, bytes):
@@ -288,7 +364,7 @@ class PDFResumeGenerator:
                  log.error(error_msg)
                  raise TypeError(error_msg)
 
-            log.info(f"PDF generated successfully (type: bytes), size: {len(pdf_output_bytes)} bytes.")
+            log.info("PDF generated successfully (type: bytes), size: %d bytes.", len(pdf_output_bytes))
             return pdf_output_bytes
 
         except Exception as e:
@@ -297,12 +373,13 @@ class PDFResumeGenerator:
 
 
 # --- Function to call from router (обновленная) ---
-def create_resume_pdf(resume_data: List[Dict[str, str]]) -> bytes:
+def create_resume_pdf(resume_data: List[Dict[str, str]], user_info: Optional[Dict[str, Any]] = None) -> bytes:
     """
     Creates a resume PDF from a list of label-value dictionaries.
 
     Args:
         resume_data: List of dictionaries, each with "label" and "value" keys.
+        user_info: Optional user-service profile used to fill the header (name, email, phone).
 
     Returns:
         bytes: The generated PDF content.
@@ -325,7 +402,7 @@ def create_resume_pdf(resume_data: List[Dict[str, str]]) -> bytes:
 
     try:
         generator = PDFResumeGenerator()
-        pdf_content = generator.generate(resume_data)
+        pdf_content = generator.generate(resume_data, user_info)
 
         # The generate function now ensures it returns bytes or raises an error
         # So this check might seem redundant, but it's a good final assertion
@@ -0,0 +1,162 @@
+# ai_service/services/pdf_jobs.py
+import asyncio
+import logging
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from ai_service.config import Settings, settings
+from ai_service.services.cache import TTLCache
+from ai_service.services.object_storage import ObjectStorage, object_storage
+from ai_service.services.pdf_cache import pdf_cache_key
+from ai_service.services.pdf_pool import PDFPoolBusy
+from ai_service.services.request_trace import untraced
+
+log = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RENDERING = "rendering"
+UPLOADING = "uploading"
+DONE = "done"
+FAILED = "failed"
+FINAL_STATES = (DONE, FAILED)
+
+RenderFunc = Callable[[List[Dict[str, Any]], Dict[str, Any]], Awaitable[bytes]]
+
+
+class PDFJob:
+    def __init__(self, job_id: str, owner: str):
+        self.job_id = job_id
+        self.owner = owner
+        self.status = QUEUED
+        self.object_key: Optional[str] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+        self._changed = asyncio.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINAL_STATES
+
+    def set_status(self, status: str, error: Optional[str] = None) -> None:
+        self.status = status
+        self.error = error
+        self.updated_at = time.time()
+        # Wake everyone waiting for this change and start a fresh event for the next one.
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def wait_for_change(self, timeout: float) -> bool:
+        """Waits until the status changes; False on timeout."""
+        if self.finished:
+            return False
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+
+class PDFJobManager:
+    """
+    Renders PDFs in the background and writes them to object storage, so long renders do not hold an HTTP
+    connection and the bytes never pass back through the service.
+
+    At most PDF_JOB_CONCURRENCY jobs render at once (the rest wait in the queue, up to PDF_JOB_MAX_PENDING);
+    a job that hits a full render pool retries after PDF_RETRY_AFTER. Objects are content-addressed, so the
+    same document is uploaded once. Job state is kept in this process: unfinished jobs until they finish (there
+    are at most PDF_JOB_MAX_PENDING of them), finished ones for PDF_JOB_TTL after that.
+    """
+
+    RENDER_ATTEMPTS = 3
+
+    def __init__(self, settings: Settings, storage: ObjectStorage):
+        self.settings = settings
+        self.storage = storage
+        self._jobs = TTLCache(maxsize=settings.PDF_JOB_MAX_ENTRIES, ttl=settings.PDF_JOB_TTL)
+        # Unfinished jobs stay out of the TTL/LRU cache, so a long queue or render cannot evict a job still being polled.
+        self._active: Dict[str, PDFJob] = {}
+        self._uploaded = TTLCache(maxsize=settings.PDF_JOB_MAX_ENTRIES, ttl=settings.PDF_JOB_TTL)
+        self._semaphore = asyncio.Semaphore(max(settings.PDF_JOB_CONCURRENCY, 1))
+        self._tasks: Set["asyncio.Task[None]"] = set()
+        self.counters = {"submitted": 0, "done": 0, "failed": 0, "uploads": 0, "upload_skips": 0, "rejected": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.storage.enabled
+
+    @property
+    def pending(self) -> int:
+        return len(self._tasks)
+
+    def stats(self) -> Dict[str, int]:
+        return {**self.counters, "pending": len(self._tasks), "jobs": len(self._active) + len(self._jobs)}
+
+    def get(self, job_id: str) -> Optional[PDFJob]:
+        job = self._active.get(job_id)
+        return job if job is not None else self._jobs.get(job_id)
+
+    def url(self, job: PDFJob) -> Optional[str]:
+        """A freshly presigned URL for a finished job (valid for PDF_URL_TTL)."""
+        if job.status != DONE or job.object_key is None:
+            return None
+        return self.storage.presigned_url(job.object_key)
+
+    def submit(self, owner: str, resume_data: List[Dict[str, Any]], user_info: Dict[str, Any], render: RenderFunc) -> PDFJob:
+        if len(self._tasks) >= self.settings.PDF_JOB_MAX_PENDING:
+            self.counters["rejected"] += 1
+            raise PDFPoolBusy(self.settings.PDF_RETRY_AFTER)
+        job = PDFJob(uuid.uuid4().hex, owner)
+        self._active[job.job_id] = job
+        task = asyncio.create_task(untraced(self._run(job, resume_data, user_info, render)))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        self.counters["submitted"] += 1
+        return job
+
+    async def _run(self, job: PDFJob, resume_data: List[Dict[str, Any]], user_info: Dict[str, Any], render: RenderFunc) -> None:
+        key = f"{self.settings.PDF_STORAGE_PREFIX}{pdf_cache_key(resume_data, user_info)}.pdf"
+        try:
+            async with self._semaphore:
+                if self._uploaded.get(key):
+                    self.counters["upload_skips"] += 1
+                else:
+                    job.set_status(RENDERING)
+                    content = await self._render(resume_data, user_info, render)
+                    job.set_status(UPLOADING)
+                    await self.storage.put(key, content)
+                    self._uploaded.set(key, True)
+                    self.counters["uploads"] += 1
+            job.object_key = key
+            job.set_status(DONE)
+            self.counters["done"] += 1
+        except asyncio.CancelledError:
+            job.set_status(FAILED, "The service is shutting down.")
+            raise
+        except Exception as e:
+            log.error(f"PDF job {job.job_id} failed: {e}", exc_info=True)
+            job.set_status(FAILED, str(e) or type(e).__name__)
+            self.counters["failed"] += 1
+        finally:
+            self._active.pop(job.job_id, None)
+            self._jobs.set(job.job_id, job)
+
+    async def _render(self, resume_data: List[Dict[str, Any]], user_info: Dict[str, Any], render: RenderFunc) -> bytes:
+        attempt = 1
+        while True:
+            try:
+                return await render(resume_data, user_info)
+            except PDFPoolBusy as busy:
+                if attempt >= self.RENDER_ATTEMPTS:
+                    raise
+                attempt += 1
+                await asyncio.sleep(busy.retry_after)
+
+    async def aclose(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+pdf_jobs = PDFJobManager(settings, object_storage)
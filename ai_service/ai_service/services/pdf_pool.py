@@ -0,0 +1,192 @@
+# ai_service/services/pdf_pool.py
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Tuple
+
+from ai_service.config import Settings, settings
+from ai_service.services.metrics import observe_stage, track
+from ai_service.services.pdf_generator import create_resume_pdf
+
+log = logging.getLogger(__name__)
+
+WARMUP_RESUME = [{"label": "Warmup", "value": "Прогрев шрифтов / font warmup"}]
+
+
+class PDFPoolBusy(Exception):
+    """Raised when the render queue is full. retry_after is a hint in seconds for the client."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"PDF render queue is full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class PDFRenderTimeout(Exception):
+    """Raised when a render job does not finish within PDF_RENDER_TIMEOUT."""
+
+
+def _warm_worker() -> None:
+    """Process initializer: renders a tiny document so fonts and fpdf2 modules are loaded before real jobs arrive."""
+    logging.getLogger("ai_service.services.pdf_generator").setLevel(logging.WARNING)
+    create_resume_pdf(WARMUP_RESUME)
+
+
+def _noop() -> None:
+    return None
+
+
+def _render_timed(resume_data: List[Dict[str, Any]], user_info: Optional[Dict[str, Any]]) -> Tuple[bytes, float]:
+    """Runs in the worker: returns the PDF and the time create_resume_pdf took, so the parent can record it."""
+    started = time.perf_counter()
+    content = create_resume_pdf(resume_data, user_info)
+    return content, time.perf_counter() - started
+
+
+def _terminate_workers(executor: ProcessPoolExecutor) -> None:
+    """Kills the pool's processes and shuts it down; shutdown() alone would wait for a stuck render forever."""
+    terminate = getattr(executor, "terminate_workers", None)  # Python 3.14+
+    if terminate is not None:
+        terminate()
+        return
+    for process in list((executor._processes or {}).values()):
+        process.terminate()
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+class PDFRenderPool:
+    """
+    Runs create_resume_pdf in a pre-forked process pool so fpdf2 layout never blocks the event loop.
+
+    At most PDF_WORKERS jobs render at once and at most PDF_QUEUE_SIZE more may wait; anything beyond
+    that is rejected with PDFPoolBusy so the router can answer 503 + Retry-After. With PDF_WORKERS=0
+    rendering falls back to a thread, which still keeps the loop free but shares the GIL.
+
+    If a worker dies (OOM kill, crash in fontTools) the pool is broken for every later job, and a render
+    that hits PDF_RENDER_TIMEOUT would keep its worker and queue slot forever; in both cases the pool is
+    replaced by a fresh, warmed one. Jobs that were in flight on the old pool are retried once.
+    """
+
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._warming: Optional["asyncio.Future[None]"] = None
+        self._pending = 0
+        self.restarts = 0
+
+    @property
+    def capacity(self) -> int:
+        return max(self.settings.PDF_WORKERS, 1) + self.settings.PDF_QUEUE_SIZE
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    async def start(self) -> None:
+        if self.settings.PDF_WORKERS <= 0:
+            log.info("PDF_WORKERS=0, PDF rendering will run in a thread.")
+            return
+        self._executor = self._new_executor()
+        await self._warm(self._executor)
+        log.info(f"PDF render pool started with {self.settings.PDF_WORKERS} worker(s), queue size {self.settings.PDF_QUEUE_SIZE}.")
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.settings.PDF_WORKERS,
+            mp_context=multiprocessing.get_context(self.settings.PDF_MP_START_METHOD),
+            initializer=_warm_worker,
+        )
+
+    async def _warm(self, executor: ProcessPoolExecutor) -> None:
+        # Submitting one job per worker forks the whole pool up front, so the first user does not pay for it.
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(executor, _noop) for _ in range(self.settings.PDF_WORKERS)))
+
+    def _restart(self, broken: ProcessPoolExecutor, reason: str) -> "asyncio.Future[None]":
+        """Replaces `broken` with a fresh pool, once however many jobs notice; returns the warm-up to wait for."""
+        if self._executor is broken:
+            log.warning(f"Restarting the PDF render pool: {reason}.")
+            self.restarts += 1
+            _terminate_workers(broken)
+            self._executor = self._new_executor()
+            self._warming = asyncio.ensure_future(self._warm(self._executor))
+            self._warming.add_done_callback(self._warmed)
+        return self._warming
+
+    @staticmethod
+    def _warmed(warming: "asyncio.Future[None]") -> None:
+        if not warming.cancelled() and warming.exception() is not None:
+            log.error(f"Warming up the restarted PDF render pool failed: {warming.exception()}")
+
+    async def aclose(self) -> None:
+        if self._executor is not None:
+            _terminate_workers(self._executor)
+            self._executor = None
+
+    def _release(self, future: "asyncio.Future[bytes]") -> None:
+        self._pending -= 1
+        # Retrieve the outcome so failures of abandoned jobs are not reported as "never retrieved".
+        if not future.cancelled():
+            future.exception()
+
+    async def render(self, resume_data: List[Dict[str, Any]], user_info: Optional[Dict[str, Any]] = None) -> bytes:
+        if self._pending >= self.capacity:
+            raise PDFPoolBusy(self.settings.PDF_RETRY_AFTER)
+        # The slot is taken before anything is awaited (a restarted pool may still be warming up), so callers
+        # arriving meanwhile see it and the pool is never booked beyond its capacity.
+        self._pending += 1
+        try:
+            return await self._render_once(resume_data, user_info)
+        except BrokenProcessPool:
+            # Any worker dying fails every job in flight, not only its own, so each job gets one more try.
+            # A document that kills workers itself fails on the second pool too. The retry keeps the caller's place.
+            self._pending += 1
+            return await self._render_once(resume_data, user_info)
+
+    async def _render_once(self, resume_data: List[Dict[str, Any]], user_info: Optional[Dict[str, Any]]) -> bytes:
+        """Renders on a slot the caller reserved: the submitted job frees it, or it is freed here if none is submitted."""
+        loop = asyncio.get_running_loop()
+        submitted = False
+        try:
+            if self._warming is not None and not self._warming.done():
+                # A restarted pool is still spawning its workers; that should not count against PDF_RENDER_TIMEOUT.
+                await asyncio.wait([self._warming])
+            executor = self._executor
+            if executor is not None:
+                try:
+                    future = loop.run_in_executor(executor, _render_timed, resume_data, user_info)
+                except BrokenProcessPool:
+                    await asyncio.shield(self._restart(executor, "a worker process died"))
+                    raise
+            else:
+                future = asyncio.ensure_future(asyncio.to_thread(_render_timed, resume_data, user_info))
+            submitted = True
+        finally:
+            if not submitted:
+                self._pending -= 1
+        # The slot is held until the job really finishes, even if the caller went away; a timed-out job
+        # finishes when its pool is restarted below.
+        future.add_done_callback(self._release)
+
+        try:
+            # pdf_pool covers queueing in the pool plus the render; pdf_render is the render alone, timed in the worker.
+            with track("pdf_pool"):
+                content, render_seconds = await asyncio.wait_for(asyncio.shield(future), timeout=self.settings.PDF_RENDER_TIMEOUT)
+            observe_stage("pdf_render", render_seconds)
+            return content
+        except BrokenProcessPool:
+            if executor is not None:
+                await asyncio.shield(self._restart(executor, "a worker process died"))
+            raise
+        except asyncio.TimeoutError as e:
+            log.error(f"PDF render exceeded {self.settings.PDF_RENDER_TIMEOUT}s timeout.")
+            if executor is not None:
+                # There is no way to stop one job in a ProcessPoolExecutor; restarting the pool frees its worker.
+                # Other jobs running on it are retried on the new pool. The caller does not wait for the warm-up.
+                self._restart(executor, "a render timed out")
+            raise PDFRenderTimeout(f"PDF rendering took longer than {self.settings.PDF_RENDER_TIMEOUT}s") from e
+
+
+pdf_render_pool = PDFRenderPool(settings)
@@ -0,0 +1,74 @@
+# ai_service/services/profiler.py
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from types import FrameType
+from typing import Dict, List, Optional
+
+
+class ProfilerBusy(Exception):
+    """Only one profile runs at a time."""
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    # ';' separates frames in the collapsed format, so it must not appear inside one.
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})".replace(";", ":")
+
+
+def _collapse(frame: Optional[FrameType]) -> List[str]:
+    stack = []
+    while frame is not None:
+        stack.append(_frame_label(frame))
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler for the live process: a thread samples sys._current_frames() at `hz` and counts
+    identical stacks. The result is in the collapsed-stack format ("root;caller;leaf count" per line) that
+    flamegraph.pl, speedscope and inferno read directly. Nothing is instrumented, so the only overhead is
+    the sampling thread itself, and only while a profile runs.
+    """
+
+    def __init__(self):
+        self._lock = asyncio.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    async def profile(self, seconds: float, hz: int = 100, loop_only: bool = False) -> str:
+        if self._lock.locked():
+            raise ProfilerBusy()
+        async with self._lock:
+            only_thread = threading.get_ident() if loop_only else None
+            samples = await asyncio.to_thread(self._sample, seconds, hz, only_thread)
+        return "".join(f"{stack} {count}\n" for stack, count in samples.most_common())
+
+    @staticmethod
+    def _sample(seconds: float, hz: int, only_thread: Optional[int]) -> "Counter[str]":
+        me = threading.get_ident()
+        names: Dict[int, str] = {}
+        samples: "Counter[str]" = Counter()
+        interval = 1.0 / hz
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            started = time.monotonic()
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == me or (only_thread is not None and thread_id != only_thread):
+                    continue
+                if thread_id not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                thread = names.get(thread_id, str(thread_id)).replace(";", ":").replace(" ", "_")
+                samples[";".join([thread, *_collapse(frame)])] += 1
+            time.sleep(max(interval - (time.monotonic() - started), 0))
+        return samples
+
+
+sampling_profiler = SamplingProfiler()
@@ -0,0 +1,139 @@
+# ai_service/services/reasoning.py
+import math
+import re
+from typing import Any, Dict, Optional, Tuple
+
+from ai_service.config import Settings, settings
+
+THINK_OPEN = "<think>"
+THINK_CLOSE = "</think>"
+_THINK_BLOCK = re.compile(r"<think>.*?(?:</think>|\Z)", re.DOTALL)
+REASONING_OPTIONS = ("reasoning_format", "reasoning_effort")
+
+
+def is_reasoning_model(model: str, settings: Settings) -> bool:
+    patterns = [p.strip().lower() for p in settings.LLM_REASONING_MODEL_PATTERNS.split(",") if p.strip()]
+    return any(pattern in (model or "").lower() for pattern in patterns)
+
+
+def apply_reasoning_options(payload: Dict[str, Any], settings: Settings) -> Dict[str, Any]:
+    """
+    Adds LLM_REASONING_FORMAT / LLM_REASONING_EFFORT for models matching LLM_REASONING_MODEL_PATTERNS and removes
+    them for every other model, which would reject them. Mutates and returns the payload.
+    """
+    for option in REASONING_OPTIONS:
+        payload.pop(option, None)
+    if not is_reasoning_model(payload.get("model", ""), settings):
+        return payload
+    reasoning_format = settings.LLM_REASONING_FORMAT
+    if reasoning_format == "raw" and "response_format" in payload:
+        reasoning_format = "parsed"  # JSON mode does not allow the trace inline in the content
+    if reasoning_format:
+        payload["reasoning_format"] = reasoning_format
+    if settings.LLM_REASONING_EFFORT:
+        payload["reasoning_effort"] = settings.LLM_REASONING_EFFORT
+    return payload
+
+
+def strip_reasoning(text: str) -> Tuple[str, int]:
+    """
+    Removes <think>...</think> blocks (an unterminated one runs to the end) and returns (answer, reasoning_chars).
+    A closing tag without an opening one, as some providers send, drops everything before it.
+    """
+    if not text:
+        return text, 0
+    reasoning_chars = 0
+    if THINK_CLOSE in text and THINK_OPEN not in text:
+        head, _, text = text.partition(THINK_CLOSE)
+        reasoning_chars += len(head)
+    answer, count = _THINK_BLOCK.subn("", text)
+    if count:
+        reasoning_chars += len(text) - len(answer)
+    return answer.strip(), reasoning_chars
+
+
+def _partial_tag_suffix(text: str, tag: str) -> int:
+    """Length of the longest suffix of text that is a proper prefix of tag (a tag split across chunks)."""
+    for size in range(min(len(tag) - 1, len(text)), 0, -1):
+        if text.endswith(tag[:size]):
+            return size
+    return 0
+
+
+class ReasoningStripper:
+    """
+    Streaming counterpart of strip_reasoning: feed() returns only answer text. Reasoning is counted and dropped
+    as it arrives; at most len("</think>") - 1 characters are held back to recognize a tag split across chunks.
+    """
+
+    def __init__(self):
+        self._pending = ""
+        self._in_think = False
+        self.reasoning_chars = 0
+
+    def feed(self, chunk: str) -> str:
+        text = self._pending + chunk
+        self._pending = ""
+        answer = []
+        while text:
+            tag = THINK_CLOSE if self._in_think else THINK_OPEN
+            position = text.find(tag)
+            if position == -1:
+                keep = _partial_tag_suffix(text, tag)
+                body, self._pending = text[:len(text) - keep], text[len(text) - keep:]
+                if self._in_think:
+                    self.reasoning_chars += len(body)
+                else:
+                    answer.append(body)
+                break
+            if self._in_think:
+                self.reasoning_chars += position
+            else:
+                answer.append(text[:position])
+            text = text[position + len(tag):]
+            self._in_think = not self._in_think
+        return "".join(answer)
+
+    def flush(self) -> str:
+        pending, self._pending = self._pending, ""
+        if self._in_think:
+            self.reasoning_chars += len(pending)
+            return ""
+        return pending
+
+
+class ReasoningMeter:
+    """Counts how much of the generation went into reasoning traces (reported by the provider, else estimated)."""
+
+    def __init__(self, settings: Settings):
+        self.chars_per_token = settings.LLM_CHARS_PER_TOKEN
+        self.counters = {"responses": 0, "responses_with_reasoning": 0, "reasoning_tokens": 0, "reasoning_tokens_estimated": 0}
+
+    def record(self, reasoning_chars: int = 0, reported_tokens: Optional[int] = None) -> int:
+        """Returns the reasoning tokens attributed to this response."""
+        self.counters["responses"] += 1
+        if reported_tokens is not None:
+            tokens = reported_tokens
+        else:
+            tokens = math.ceil(reasoning_chars / self.chars_per_token)
+            self.counters["reasoning_tokens_estimated"] += tokens
+        if tokens:
+            self.counters["responses_with_reasoning"] += 1
+            self.counters["reasoning_tokens"] += tokens
+        return tokens
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self.counters)
+
+
+def reported_reasoning_tokens(usage: Any) -> Optional[int]:
+    """usage.completion_tokens_details.reasoning_tokens, when the provider reports it."""
+    if not isinstance(usage, dict):
+        return None
+    details = usage.get("completion_tokens_details")
+    if isinstance(details, dict) and isinstance(details.get("reasoning_tokens"), int):
+        return details["reasoning_tokens"]
+    return None
+
+
+reasoning_meter = ReasoningMeter(settings)
@@ -0,0 +1,223 @@
+# ai_service/services/request_trace.py
+import json
+import logging
+import logging.handlers
+import queue
+import re
+import secrets
+import time
+from contextvars import ContextVar
+from typing import Any, Awaitable, Dict, List, Optional, Tuple, TypeVar
+
+from ai_service.config import Settings, settings
+
+log = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+MAX_SPANS = 256
+_TRACEPARENT = re.compile(r"^[0-9a-f]{2}-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+_current_trace: "ContextVar[Optional[RequestTrace]]" = ContextVar("ai_service_request_trace", default=None)
+
+
+class RequestTrace:
+    """
+    Timings and counters of one HTTP request, collected through a context variable.
+
+    Stage timers (services.metrics.track) add a span here besides their histogram observation, so the same
+    instrumentation feeds Server-Timing and the span log. Tasks that outlive the request should run untraced().
+    """
+
+    def __init__(self, request_id: str, method: str, path: str, traceparent: Optional[str] = None):
+        self.request_id = request_id
+        self.method = method
+        self.path = path
+        match = _TRACEPARENT.match(traceparent or "")
+        self.trace_id = match.group(1) if match else secrets.token_hex(16)
+        self.parent_span_id = match.group(2) if match else None
+        self.span_id = secrets.token_hex(8)
+        self.start_ns = time.time_ns()
+        self._started = time.perf_counter()
+        self.spans: List[Tuple[str, float, float]] = []  # (stage, offset from request start, duration), seconds
+        self.counters: Dict[str, float] = {}
+        self.status_code: Optional[int] = None
+        self.duration: Optional[float] = None
+
+    def add_span(self, stage: str, started: float, duration: float) -> None:
+        """started is a time.perf_counter() value."""
+        if len(self.spans) < MAX_SPANS:
+            self.spans.append((stage, started - self._started, duration))
+        else:
+            self.incr("dropped_spans")
+
+    def incr(self, key: str, amount: float = 1) -> None:
+        self.counters[key] = self.counters.get(key, 0) + amount
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._started
+
+    def finish(self, status_code: int) -> None:
+        if self.duration is None:
+            self.status_code = status_code
+            self.duration = self.elapsed()
+
+    def stage_totals(self) -> Dict[str, Tuple[float, int]]:
+        """stage -> (total seconds, count), in order of first appearance."""
+        totals: Dict[str, Tuple[float, int]] = {}
+        for stage, _, duration in self.spans:
+            total, count = totals.get(stage, (0.0, 0))
+            totals[stage] = (total + duration, count + 1)
+        return totals
+
+    def server_timing(self) -> str:
+        entries = []
+        for stage, (total, count) in self.stage_totals().items():
+            entry = f"{stage};dur={total * 1000:.1f}"
+            if count > 1:
+                entry += f';desc="{count}x"'
+            entries.append(entry)
+        entries.append(f"total;dur={self.elapsed() * 1000:.1f}")
+        return ", ".join(entries)
+
+    def to_record(self) -> Dict[str, Any]:
+        """One structured span-log line."""
+        return {
+            "request_id": self.request_id,
+            "trace_id": self.trace_id,
+            "method": self.method,
+            "path": self.path,
+            "status": self.status_code,
+            "duration_ms": round((self.duration if self.duration is not None else self.elapsed()) * 1000, 1),
+            "stages": {
+                stage: {"ms": round(total * 1000, 1), "count": count} for stage, (total, count) in self.stage_totals().items()
+            },
+            **self.counters,
+        }
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """The request as an OTLP/JSON ExportTraceServiceRequest: a server span with one child span per stage."""
+        duration = self.duration if self.duration is not None else self.elapsed()
+        root: Dict[str, Any] = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": f"{self.method} {self.path}",
+            "kind": 2,  # SERVER
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.start_ns + int(duration * 1e9)),
+            "attributes": _otlp_attributes({
+                "http.request.method": self.method,
+                "url.path": self.path,
+                "http.response.status_code": self.status_code,
+                "request.id": self.request_id,
+                **self.counters,
+            }),
+            "status": {"code": 2 if (self.status_code or 0) >= 500 else 0},
+        }
+        if self.parent_span_id:
+            root["parentSpanId"] = self.parent_span_id
+        spans = [root]
+        for stage, offset, stage_duration in self.spans:
+            start_ns = self.start_ns + int(offset * 1e9)
+            spans.append({
+                "traceId": self.trace_id,
+                "spanId": secrets.token_hex(8),
+                "parentSpanId": self.span_id,
+                "name": stage,
+                "kind": 1,  # INTERNAL
+                "startTimeUnixNano": str(start_ns),
+                "endTimeUnixNano": str(start_ns + int(stage_duration * 1e9)),
+            })
+        return {"resourceSpans": [{
+            "resource": {"attributes": _otlp_attributes({"service.name": settings.APP_TITLE})},
+            "scopeSpans": [{"scope": {"name": "ai_service"}, "spans": spans}],
+        }]}
+
+
+def _otlp_attributes(values: Dict[str, Any]) -> List[Dict[str, Any]]:
+    attributes = []
+    for key, value in values.items():
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            encoded = {"boolValue": value}
+        elif isinstance(value, int) or (isinstance(value, float) and value.is_integer()):
+            encoded = {"intValue": str(int(value))}
+        elif isinstance(value, float):
+            encoded = {"doubleValue": value}
+        else:
+            encoded = {"stringValue": str(value)}
+        attributes.append({"key": key, "value": encoded})
+    return attributes
+
+
+def current_trace() -> Optional[RequestTrace]:
+    return _current_trace.get()
+
+
+def start_trace(trace: RequestTrace) -> Any:
+    """Makes trace current; returns the token for end_trace()."""
+    return _current_trace.set(trace)
+
+
+def end_trace(token: Any) -> None:
+    _current_trace.reset(token)
+
+
+def trace_count(key: str, amount: float = 1) -> None:
+    """Adds to a counter of the current request's trace, if there is one."""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.incr(key, amount)
+
+
+async def untraced(awaitable: Awaitable[T]) -> T:
+    """Runs a background task's work outside the request that happened to start it."""
+    _current_trace.set(None)
+    return await awaitable
+
+
+class SpanLog:
+    """
+    Writes one entry per finished request: SPAN_LOG=log logs a JSON line through the "ai_service.spans" logger,
+    SPAN_LOG=otlp appends OTLP/JSON lines to SPAN_LOG_FILE (readable by the OpenTelemetry Collector's otlpjsonfile
+    receiver). File writes go through a queue and a listener thread, never on the event loop.
+    """
+
+    def __init__(self, settings: Settings):
+        self.mode = settings.SPAN_LOG
+        self.path = settings.SPAN_LOG_FILE
+        self._logger = logging.getLogger("ai_service.spans")
+        self._listener: Optional[logging.handlers.QueueListener] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode in ("log", "otlp")
+
+    def start(self) -> None:
+        if self.mode == "otlp" and self._listener is None:
+            file_handler = logging.FileHandler(self.path, encoding="utf-8")
+            file_handler.setFormatter(logging.Formatter("%(message)s"))
+            records: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+            self._listener = logging.handlers.QueueListener(records, file_handler)
+            self._logger.addHandler(logging.handlers.QueueHandler(records))
+            self._logger.setLevel(logging.INFO)
+            self._logger.propagate = False
+            self._listener.start()
+            log.info(f"Writing OTLP spans to {self.path}.")
+        elif self.mode and not self.enabled:
+            log.warning(f"Unknown SPAN_LOG {self.mode!r}; expected 'log' or 'otlp'. Span logging is off.")
+
+    def emit(self, trace: RequestTrace) -> None:
+        if self.mode == "otlp":
+            self._logger.info(json.dumps(trace.to_otlp(), separators=(",", ":")))
+        elif self.mode == "log":
+            self._logger.info(json.dumps(trace.to_record(), ensure_ascii=False))
+
+    def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+
+
+span_log = SpanLog(settings)
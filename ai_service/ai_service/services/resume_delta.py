@@ -0,0 +1,99 @@
+# ai_service/services/resume_delta.py
+from typing import Any, Dict, List, Optional, Tuple
+
+ADD = "add"
+MODIFY = "modify"
+DELETE = "delete"
+_OP_ALIASES = {
+    "add": ADD, "create": ADD, "insert": ADD,
+    "modify": MODIFY, "update": MODIFY, "replace": MODIFY, "edit": MODIFY,
+    "delete": DELETE, "remove": DELETE,
+}
+
+
+def label_key(label: str) -> str:
+    """Labels are matched case-insensitively with whitespace collapsed."""
+    return " ".join(label.split()).casefold()
+
+
+def _as_text(value: Any) -> str:
+    if isinstance(value, list):
+        return ", ".join(str(v) for v in value)
+    return "" if value is None else str(value)
+
+
+def parse_operations(parsed: Any) -> Optional[List[Dict[str, Any]]]:
+    """
+    Extracts the operations list from {"operations": [...]} (or a bare list). Returns None when the answer
+    has no operations structure at all, so the caller can fall back to a full update.
+    """
+    if isinstance(parsed, dict):
+        parsed = parsed.get("operations", parsed.get("ops"))
+    if not isinstance(parsed, list):
+        return None
+    return parsed
+
+
+def is_operation(item: Any) -> bool:
+    """True for an object that names an operation ("op" or "action"), as opposed to a plain label/value item."""
+    return isinstance(item, dict) and ("op" in item or "action" in item)
+
+
+def merge_operations(
+    current: List[Dict[str, Any]], operations: List[Any]
+) -> Tuple[List[Dict[str, Any]], List[str], int]:
+    """
+    Applies add/modify/delete operations to the current label/value list and returns (merged, report, applied),
+    where `applied` counts the operations that changed something (skipped and ignored ones do not count).
+
+    Deterministic conflict rules:
+    - operations are applied in the order given, so the last operation on a label wins;
+    - modify keeps the item's position and original label spelling; a modify of an unknown label is an add;
+    - add of an existing label replaces its value in place (same as modify); new labels are appended;
+    - delete of an unknown label is ignored;
+    - malformed operations are skipped.
+    """
+    merged = [{"label": item["label"], "value": _as_text(item["value"])} for item in current]
+    report: List[str] = []
+    applied = 0
+
+    def find(label: str) -> int:
+        key = label_key(label)
+        for index, item in enumerate(merged):
+            if label_key(item["label"]) == key:
+                return index
+        return -1
+
+    for index, operation in enumerate(operations):
+        if not isinstance(operation, dict):
+            report.append(f"skipped operation {index}: not an object")
+            continue
+        op = _OP_ALIASES.get(str(operation.get("op") or operation.get("action") or "").strip().lower())
+        label = operation.get("label")
+        if op is None or not isinstance(label, str) or not label.strip():
+            report.append(f"skipped operation {index}: invalid op or label ({operation})")
+            continue
+        label = label.strip()
+        position = find(label)
+
+        if op == DELETE:
+            if position == -1:
+                report.append(f"ignored delete of unknown label '{label}'")
+            else:
+                del merged[position]
+                report.append(f"deleted '{label}'")
+                applied += 1
+            continue
+
+        if "value" not in operation:
+            report.append(f"skipped operation {index}: {op} without a value")
+            continue
+        value = _as_text(operation["value"])
+        if position == -1:
+            merged.append({"label": label, "value": value})
+            report.append(f"added '{label}'" if op == ADD else f"added '{label}' (modify of unknown label)")
+        else:
+            merged[position]["value"] = value
+            report.append(f"modified '{merged[position]['label']}'" if op == MODIFY else f"modified '{label}' (add of existing label)")
+        applied += 1
+    return merged, report, applied
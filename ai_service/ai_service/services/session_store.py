@@ -0,0 +1,208 @@
+# ai_service/services/session_store.py
+"""
+Interview session storage: an in-memory store for a single instance and a Tarantool store shared by replicas.
+
+The session lock (SessionStore.lock) is process-local. It serializes read-modify-write cycles of the handlers
+within one process only; replicas sharing a Tarantool space do not see each other's locks, so concurrent
+changes to one session made through different replicas can overwrite each other (the last save wins).
+Route a session to a single replica (sticky sessions) if that matters.
+"""
+import asyncio
+import copy
+import json
+import logging
+import time
+import uuid
+import weakref
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+from ai_service.config import Settings, settings
+from ai_service.services.cache import TTLCache
+
+log = logging.getLogger(__name__)
+
+
+class InterviewSession:
+    """Server-side state of one interview: answers collected so far, the follow-up questions and the last label/value result."""
+
+    def __init__(
+        self,
+        session_id: str,
+        owner: str,
+        answers: Optional[Dict[str, str]] = None,
+        questions: Optional[List[str]] = None,
+        resume_data: Optional[List[Dict[str, Any]]] = None,
+        created_at: Optional[float] = None,
+        updated_at: Optional[float] = None,
+    ):
+        now = time.time()
+        self.session_id = session_id
+        self.owner = owner
+        self.answers = answers or {}
+        self.questions = questions
+        self.resume_data = resume_data
+        self.created_at = created_at or now
+        self.updated_at = updated_at or now
+
+    def touch(self) -> None:
+        self.updated_at = time.time()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "session_id": self.session_id,
+            "owner": self.owner,
+            "answers": self.answers,
+            "questions": self.questions,
+            "resume_data": self.resume_data,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "InterviewSession":
+        return cls(**data)
+
+
+class SessionStore(ABC):
+    """
+    Storage for InterviewSession objects. Sessions expire SESSION_TTL seconds after their last save.
+
+    lock(session_id) serializes read-modify-write cycles on one session within this process only (see the module
+    docstring for what that means with several replicas).
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+    def lock(self, session_id: str) -> asyncio.Lock:
+        lock = self._locks.get(session_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[session_id] = lock
+        return lock
+
+    async def create(self, owner: str, answers: Optional[Dict[str, str]] = None) -> InterviewSession:
+        session = InterviewSession(uuid.uuid4().hex, owner, answers=dict(answers or {}))
+        await self.save(session)
+        return session
+
+    async def start(self) -> None:
+        return None
+
+    async def aclose(self) -> None:
+        return None
+
+    @abstractmethod
+    async def get(self, session_id: str) -> Optional[InterviewSession]:
+        ...
+
+    @abstractmethod
+    async def save(self, session: InterviewSession) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, session_id: str) -> None:
+        ...
+
+
+class MemorySessionStore(SessionStore):
+    """Process-local LRU of sessions (SESSION_MAX_ENTRIES); sessions are lost on restart."""
+
+    def __init__(self, settings: Settings):
+        super().__init__(settings.SESSION_TTL)
+        self._sessions = TTLCache(maxsize=settings.SESSION_MAX_ENTRIES, ttl=settings.SESSION_TTL)
+
+    async def get(self, session_id: str) -> Optional[InterviewSession]:
+        data = self._sessions.get(session_id)
+        # A fresh copy per caller: handlers work on their own copy between locked sections.
+        return InterviewSession.from_dict(copy.deepcopy(data)) if data is not None else None
+
+    async def save(self, session: InterviewSession) -> None:
+        # Stored as a plain dict snapshot so callers never mutate the stored state by accident.
+        self._sessions.set(session.session_id, json.loads(json.dumps(session.to_dict())))
+
+    async def delete(self, session_id: str) -> None:
+        self._sessions.pop(session_id)
+
+
+class TarantoolSessionStore(SessionStore):
+    """
+    Sessions kept in a Tarantool space, so every service instance sees the same sessions.
+
+    Expects a space with a string primary key on field 1, e.g.:
+        box.schema.space.create('ai_sessions', {if_not_exists = true})
+        box.space.ai_sessions:create_index('primary', {parts = {1, 'string'}, if_not_exists = true})
+    Tuples are {session_id, owner, payload_json, expires_at}. Expired tuples are ignored on read; purging
+    them is left to the instance (e.g. the expirationd module on field 4).
+
+    `connection` is anything with asynctnt's select/replace/delete coroutines; by default an asynctnt
+    Connection to SESSION_TARANTOOL_HOST:PORT is opened on start().
+    """
+
+    def __init__(self, settings: Settings, connection: Any = None):
+        super().__init__(settings.SESSION_TTL)
+        self.settings = settings
+        self.space = settings.SESSION_TARANTOOL_SPACE
+        self._connection = connection
+        self._owns_connection = connection is None
+
+    async def start(self) -> None:
+        if self._connection is not None:
+            return
+        try:
+            import asynctnt
+        except ImportError as e:
+            raise RuntimeError("SESSION_STORE=tarantool requires the 'asynctnt' package.") from e
+        self._connection = asynctnt.Connection(
+            host=self.settings.SESSION_TARANTOOL_HOST,
+            port=self.settings.SESSION_TARANTOOL_PORT,
+            username=self.settings.SESSION_TARANTOOL_USER or None,
+            password=self.settings.SESSION_TARANTOOL_PASSWORD or None,
+        )
+        await self._connection.connect()
+        log.info(f"Session store connected to Tarantool at {self.settings.SESSION_TARANTOOL_HOST}:{self.settings.SESSION_TARANTOOL_PORT}.")
+
+    async def aclose(self) -> None:
+        if self._connection is not None and self._owns_connection:
+            await self._connection.disconnect()
+            self._connection = None
+
+    @property
+    def connection(self) -> Any:
+        if self._connection is None:
+            raise RuntimeError("Tarantool session store is not started.")
+        return self._connection
+
+    async def get(self, session_id: str) -> Optional[InterviewSession]:
+        response = await self.connection.select(self.space, [session_id])
+        rows = list(response)
+        if not rows:
+            return None
+        _, _, payload, expires_at = list(rows[0])[:4]
+        if expires_at <= time.time():
+            return None
+        return InterviewSession.from_dict(json.loads(payload))
+
+    async def save(self, session: InterviewSession) -> None:
+        await self.connection.replace(self.space, [
+            session.session_id,
+            session.owner,
+            json.dumps(session.to_dict(), ensure_ascii=False),
+            time.time() + self.ttl,
+        ])
+
+    async def delete(self, session_id: str) -> None:
+        await self.connection.delete(self.space, [session_id])
+
+
+def create_session_store(settings: Settings) -> SessionStore:
+    if settings.SESSION_STORE == "tarantool":
+        return TarantoolSessionStore(settings)
+    if settings.SESSION_STORE != "memory":
+        raise ValueError(f"Unknown SESSION_STORE {settings.SESSION_STORE!r}; expected 'memory' or 'tarantool'.")
+    return MemorySessionStore(settings)
+
+
+session_store = create_session_store(settings)
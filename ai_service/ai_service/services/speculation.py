@@ -0,0 +1,125 @@
+# ai_service/services/speculation.py
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from ai_service.config import Settings, settings
+from ai_service.services.cache import TTLCache
+from ai_service.services.llm_cache import normalize_answers
+from ai_service.services.llm_scheduler import on_dispatch
+from ai_service.services.request_trace import untraced
+
+log = logging.getLogger(__name__)
+
+
+class _Speculation:
+    def __init__(self, answers: Dict[str, str]):
+        self.answers = answers
+        self.task: Optional["asyncio.Future[List[Dict[str, Any]]]"] = None
+        self.started_at = time.monotonic()
+        self.dispatched = False  # its LLM request got a scheduler slot
+
+    def mark_dispatched(self) -> None:
+        self.dispatched = True
+
+
+class SpeculativeExtractions:
+    """
+    Background label/value extractions started from the stage-one answers, keyed by user (or session).
+
+    While the user answers the follow-up questions, the extraction of what is already known runs at
+    BACKGROUND priority. When /label/generate arrives with a superset of those answers, lookup() hands back
+    the precomputed result and the answers added since, so only an incremental refinement is left to do.
+    A speculation whose LLM request is still queued behind foreground work is not waited for: lookup()
+    cancels it and the caller extracts directly at its own priority. `run` must be cancellable down to the
+    scheduler queue (process_answers(coalesce=False)), so a preempted speculation never dispatches. Entries expire after SPECULATIVE_TTL; at most SPECULATIVE_MAX_INFLIGHT extractions run at once.
+    """
+
+    def __init__(self, settings: Settings):
+        self.enabled = settings.SPECULATIVE_EXTRACTION
+        self.max_inflight = settings.SPECULATIVE_MAX_INFLIGHT
+        self._entries = TTLCache(maxsize=settings.SPECULATIVE_MAX_ENTRIES, ttl=settings.SPECULATIVE_TTL)
+        self._tasks: Set["asyncio.Future[Any]"] = set()
+        self.counters = {"started": 0, "skipped_busy": 0, "failed": 0, "exact_hits": 0, "superset_hits": 0, "misses": 0, "preempted": 0}
+
+    @property
+    def inflight(self) -> int:
+        return len(self._tasks)
+
+    def stats(self) -> Dict[str, int]:
+        return {**self.counters, "inflight": len(self._tasks), "entries": len(self._entries)}
+
+    def start(self, subject: str, answers: Dict[str, str], run: Callable[[], Awaitable[List[Dict[str, Any]]]]) -> bool:
+        """Starts `run` in the background for these answers unless the same answers are already speculated."""
+        if not self.enabled or not subject:
+            return False
+        normalized = normalize_answers(answers)
+        if not normalized:
+            return False
+        entry: Optional[_Speculation] = self._entries.get(subject)
+        if entry is not None and entry.answers == normalized:
+            return False
+        if len(self._tasks) >= self.max_inflight:
+            self.counters["skipped_busy"] += 1
+            return False
+
+        entry = _Speculation(normalized)
+        entry.task = task = asyncio.ensure_future(untraced(self._run(entry, run)))
+        self._tasks.add(task)
+        task.add_done_callback(self._finished)
+        self._entries.set(subject, entry)
+        self.counters["started"] += 1
+        return True
+
+    @staticmethod
+    async def _run(entry: _Speculation, run: Callable[[], Awaitable[List[Dict[str, Any]]]]) -> List[Dict[str, Any]]:
+        on_dispatch(entry.mark_dispatched)
+        return await run()
+
+    def _finished(self, task: "asyncio.Future[Any]") -> None:
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            self.counters["failed"] += 1
+            log.warning(f"Speculative extraction failed: {task.exception()}")
+
+    async def lookup(self, subject: str, answers: Dict[str, str]) -> Optional[Tuple[List[Dict[str, Any]], Dict[str, str]]]:
+        """
+        Returns (result, extra_answers) when a speculation for a subset of `answers` exists, waiting for it if it
+        is running already. extra_answers holds the answers the speculation did not see (empty on an exact match).
+        A speculation still waiting for a scheduler slot is cancelled, and None is returned.
+        """
+        entry: Optional[_Speculation] = self._entries.get(subject) if self.enabled and subject else None
+        normalized = normalize_answers(answers)
+        if entry is None or any(normalized.get(question) != answer for question, answer in entry.answers.items()):
+            self.counters["misses"] += 1
+            return None
+        if not entry.task.done() and not entry.dispatched:
+            # Queued at BACKGROUND priority behind foreground work: waiting would be slower than extracting now.
+            entry.task.cancel()
+            self._entries.pop(subject)
+            self.counters["preempted"] += 1
+            return None
+        try:
+            result = await asyncio.shield(entry.task)
+        except asyncio.CancelledError:
+            if entry.task.cancelled():
+                self.counters["misses"] += 1
+                return None
+            raise
+        except Exception:
+            self.counters["misses"] += 1
+            return None
+
+        extra = {question: answer for question, answer in normalized.items() if question not in entry.answers}
+        self.counters["superset_hits" if extra else "exact_hits"] += 1
+        log.info(f"Using speculative extraction started {time.monotonic() - entry.started_at:.1f}s ago ({len(extra)} new answer(s)).")
+        return result, extra
+
+    async def aclose(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        self._entries.clear()
+
+
+speculative_extractions = SpeculativeExtractions(settings)
@@ -0,0 +1,171 @@
+"""
+Local stand-in for an OpenAI-compatible chat completions backend.
+
+Lets the LLM backend pool (routing, failover, hedging) be exercised without a real provider.
+Behaviour is controlled by environment variables:
+    FAKE_LLM_LATENCY         base latency in seconds (default 0.2)
+    FAKE_LLM_JITTER          extra uniform random latency in seconds (default 0.1)
+    FAKE_LLM_ERROR_RATE      share of requests answered with 503 (default 0)
+    FAKE_LLM_SLOW_RATE       share of requests delayed by FAKE_LLM_SLOW_LATENCY (default 0)
+    FAKE_LLM_SLOW_LATENCY    latency of the slow tail in seconds (default 5)
+    FAKE_LLM_TOKEN_RATE      completion tokens generated per second, 0 for instant (default 0)
+    FAKE_LLM_RATE_LIMIT_RATE share of requests answered with 429 (default 0)
+    FAKE_LLM_RETRY_AFTER     Retry-After sent with those 429s, in seconds (default 1)
+    FAKE_LLM_THINK_TOKENS    length of a <think>...</think> preamble, as reasoning models emit (default 0)
+
+Run two of them and point the service at both:
+    uvicorn benchmarks.fake_llm:app --port 9001
+    FAKE_LLM_SLOW_RATE=0.2 uvicorn benchmarks.fake_llm:app --port 9002
+    LLM_BACKENDS='[{"name": "a", "url": "http://127.0.0.1:9001/v1/chat/completions"},
+                   {"name": "b", "url": "http://127.0.0.1:9002/v1/chat/completions"}]' uvicorn main:app
+
+benchmarks/load_test.py builds the same app in-process with create_app(FakeLLMConfig(...)).
+"""
+import asyncio
+import json
+import os
+import random
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+# Roughly what a BPE tokenizer gives for mixed Russian/JSON text; only used to pace output and fill usage.
+CHARS_PER_TOKEN = 4
+STREAM_CHUNK_CHARS = 16
+
+
+@dataclass
+class FakeLLMConfig:
+    latency: float = 0.2
+    jitter: float = 0.1
+    error_rate: float = 0.0
+    slow_rate: float = 0.0
+    slow_latency: float = 5.0
+    token_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    retry_after: float = 1.0
+    think_tokens: int = 0
+
+    @classmethod
+    def from_env(cls) -> "FakeLLMConfig":
+        return cls(
+            latency=float(os.getenv("FAKE_LLM_LATENCY", "0.2")),
+            jitter=float(os.getenv("FAKE_LLM_JITTER", "0.1")),
+            error_rate=float(os.getenv("FAKE_LLM_ERROR_RATE", "0")),
+            slow_rate=float(os.getenv("FAKE_LLM_SLOW_RATE", "0")),
+            slow_latency=float(os.getenv("FAKE_LLM_SLOW_LATENCY", "5")),
+            token_rate=float(os.getenv("FAKE_LLM_TOKEN_RATE", "0")),
+            rate_limit_rate=float(os.getenv("FAKE_LLM_RATE_LIMIT_RATE", "0")),
+            retry_after=float(os.getenv("FAKE_LLM_RETRY_AFTER", "1")),
+            think_tokens=int(os.getenv("FAKE_LLM_THINK_TOKENS", "0")),
+        )
+
+
+_CURRENT_ITEM = re.compile(r"^- (.+?): (.*)$", re.MULTILINE)
+_NEW_INFO = re.compile(r"для обновления:\n(.*?)(?:\n\n---|$)", re.DOTALL)
+
+
+def _update_request(user_text: str) -> Optional[Tuple[List[Dict[str, str]], str]]:
+    """The current label/value pairs and the user's new information of an update prompt, or None."""
+    new_info = _NEW_INFO.search(user_text)
+    if new_info is None:
+        return None
+    current = [{"label": label, "value": value} for label, value in _CURRENT_ITEM.findall(user_text[:new_info.start()])]
+    return current, new_info.group(1).strip()
+
+
+def fake_content(body: Dict[str, Any]) -> str:
+    """
+    Answers in the shape the prompt asks for: a questions object, a label/value list, or, for the delta update
+    prompt, add/modify operations. Update answers really apply the new information (the first item's value gets
+    it appended and an item carrying it is added), so a client can check that the update reached the data.
+    """
+    messages = body.get("messages", [])
+    user_text = str(messages[-1].get("content", "")) if messages else ""
+    update = _update_request(user_text)
+    if update is not None:
+        current, new_info = update
+        changes = [{"label": "Дополнительно", "value": new_info}]
+        if current:
+            changes.insert(0, {"label": current[0]["label"], "value": f"{current[0]['value']}; {new_info}"})
+        if '"operations"' in user_text:
+            operations = [{"op": "modify" if change["label"] != "Дополнительно" else "add", **change} for change in changes]
+            return json.dumps({"operations": operations}, ensure_ascii=False)
+        updated = {item["label"]: item["value"] for item in current}
+        updated.update({change["label"]: change["value"] for change in changes})
+        return json.dumps([{"label": label, "value": value} for label, value in updated.items()], ensure_ascii=False)
+
+    prompt = json.dumps(messages, ensure_ascii=False)
+    if "questions" in prompt:
+        return json.dumps({"questions": [f"Уточняющий вопрос {i}?" for i in range(1, 6)]}, ensure_ascii=False)
+    return json.dumps(
+        [{"label": f"Поле {i}", "value": f"Значение {i}"} for i in range(1, 7)],
+        ensure_ascii=False,
+    )
+
+
+def _think_preamble(tokens: int) -> str:
+    if tokens <= 0:
+        return ""
+    return "<think>" + "Рассуждаю " * (tokens * CHARS_PER_TOKEN // len("Рассуждаю ")) + "</think>\n"
+
+
+def create_app(config: Optional[FakeLLMConfig] = None) -> FastAPI:
+    config = config or FakeLLMConfig.from_env()
+    fake = FastAPI(title="Fake LLM backend")
+    fake.state.config = config
+    fake.state.requests = 0
+
+    async def delay() -> None:
+        latency = config.latency + random.uniform(0, config.jitter)
+        if random.random() < config.slow_rate:
+            latency = config.slow_latency
+        await asyncio.sleep(latency)
+
+    def generation_time(chars: int) -> float:
+        return chars / CHARS_PER_TOKEN / config.token_rate if config.token_rate > 0 else 0.0
+
+    @fake.post("/v1/chat/completions")
+    @fake.post("/openai/v1/chat/completions")  # the default API_URL's path (Groq)
+    async def chat_completions(request: Request):
+        body = await request.json()
+        fake.state.requests += 1
+        if random.random() < config.rate_limit_rate:
+            return JSONResponse(
+                {"error": {"message": "fake rate limit", "type": "rate_limit_exceeded"}},
+                status_code=429,
+                headers={"Retry-After": f"{config.retry_after:g}"},
+            )
+        if random.random() < config.error_rate:
+            return JSONResponse({"error": "fake upstream failure"}, status_code=503)
+        await delay()
+        content = _think_preamble(config.think_tokens) + fake_content(body)
+        usage = {"prompt_tokens": len(json.dumps(body)) // CHARS_PER_TOKEN, "completion_tokens": len(content) // CHARS_PER_TOKEN}
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+
+        if not body.get("stream"):
+            await asyncio.sleep(generation_time(len(content)))
+            return {
+                "model": body.get("model"),
+                "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+                "usage": usage,
+            }
+
+        async def events():
+            pause = generation_time(STREAM_CHUNK_CHARS) or 0.01
+            for start in range(0, len(content), STREAM_CHUNK_CHARS):
+                chunk = {"choices": [{"index": 0, "delta": {"content": content[start:start + STREAM_CHUNK_CHARS]}, "finish_reason": None}]}
+                yield f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
+                await asyncio.sleep(pause)
+            yield f'data: {json.dumps({"choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}], "usage": usage})}\n\n'
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return fake
+
+
+app = create_app()
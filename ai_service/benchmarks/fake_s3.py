@@ -0,0 +1,78 @@
+"""
+In-process stand-in for the S3-compatible (MinIO) bucket used by the asynchronous PDF jobs.
+
+FakeS3 implements the minio client methods ObjectStorage calls. Presigned URLs point at FakeS3.app, a tiny
+ASGI app that serves the stored objects and checks the URL's expiry and signature, so the whole hand-off can
+be exercised with httpx.ASGITransport and no MinIO:
+
+    from benchmarks.fake_s3 import FakeS3
+    s3 = FakeS3()
+    storage = ObjectStorage(settings, client=s3)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=s3.app), base_url=s3.base_url) as c:
+        pdf = (await c.get(url)).content
+"""
+import hashlib
+import hmac
+import threading
+import time
+from datetime import timedelta
+from typing import Any, Dict, Tuple
+from urllib.parse import quote
+
+from fastapi import FastAPI, HTTPException, Request, Response
+
+
+class FakeS3:
+    def __init__(self, base_url: str = "http://fake-s3:9000", secret: bytes = b"fake-s3"):
+        self.base_url = base_url
+        self.secret = secret
+        self.buckets: Dict[str, Dict[str, Tuple[bytes, str]]] = {}
+        self.calls = {"put_object": 0, "presigned_get_object": 0, "get": 0}
+        self._lock = threading.Lock()  # put_object is called from worker threads
+        self.app = self._make_app()
+
+    # --- minio.Minio subset ---
+    def bucket_exists(self, bucket: str) -> bool:
+        return bucket in self.buckets
+
+    def make_bucket(self, bucket: str) -> None:
+        self.buckets.setdefault(bucket, {})
+
+    def put_object(self, bucket: str, key: str, data: Any, length: int, content_type: str = "application/octet-stream") -> None:
+        content = data.read(length)
+        with self._lock:
+            self.calls["put_object"] += 1
+            self.buckets.setdefault(bucket, {})[key] = (content, content_type)
+
+    def presigned_get_object(self, bucket: str, key: str, expires: timedelta = timedelta(days=7)) -> str:
+        self.calls["presigned_get_object"] += 1
+        deadline = int(time.time() + expires.total_seconds())
+        path = f"/{bucket}/{quote(key)}"
+        return f"{self.base_url}{path}?X-Fake-Deadline={deadline}&X-Amz-Signature={self._sign(path, deadline)}"
+
+    # --- Serving presigned URLs ---
+    def _sign(self, path: str, deadline: int) -> str:
+        return hmac.new(self.secret, f"{path}:{deadline}".encode(), hashlib.sha256).hexdigest()
+
+    def _make_app(self) -> FastAPI:
+        app = FastAPI(title="Fake S3")
+
+        # Query parameters are read from the request because "X-Fake-Deadline" is not a valid Python name.
+        @app.get("/{bucket}/{key:path}")
+        async def serve(request: Request, bucket: str, key: str):
+            self.calls["get"] += 1
+            path = f"/{bucket}/{quote(key)}"
+            try:
+                deadline = int(request.query_params.get("X-Fake-Deadline", "0"))
+            except ValueError:
+                deadline = 0
+            signature = request.query_params.get("X-Amz-Signature", "")
+            if not hmac.compare_digest(signature, self._sign(path, deadline)) or deadline < time.time():
+                raise HTTPException(status_code=403, detail="AccessDenied")
+            stored = self.buckets.get(bucket, {}).get(key)
+            if stored is None:
+                raise HTTPException(status_code=404, detail="NoSuchKey")
+            content, content_type = stored
+            return Response(content=content, media_type=content_type)
+
+        return app
@@ -0,0 +1,50 @@
+"""
+In-process stand-in for the Tarantool connection used by TarantoolSessionStore.
+
+Implements the subset of asynctnt.Connection the store calls (select/replace/delete on a space with a
+primary key in field 1), so the Tarantool adapter can be exercised without a running instance:
+
+    from benchmarks.fake_tarantool import FakeTarantool
+    store = TarantoolSessionStore(settings, connection=FakeTarantool())
+"""
+import asyncio
+from typing import Any, Dict, List, Optional
+
+
+class FakeResponse(list):
+    """asynctnt returns a Response that iterates over the matched tuples."""
+
+
+class FakeTarantool:
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.spaces: Dict[str, Dict[Any, List[Any]]] = {}
+        self.calls = {"select": 0, "replace": 0, "delete": 0}
+
+    async def _roundtrip(self, call: str) -> None:
+        self.calls[call] += 1
+        await asyncio.sleep(self.latency)
+
+    async def connect(self) -> None:
+        return None
+
+    async def disconnect(self) -> None:
+        return None
+
+    async def select(self, space: str, key: Optional[List[Any]] = None) -> FakeResponse:
+        await self._roundtrip("select")
+        rows = self.spaces.get(space, {})
+        if not key:
+            return FakeResponse(list(row) for row in rows.values())
+        row = rows.get(key[0])
+        return FakeResponse([list(row)] if row is not None else [])
+
+    async def replace(self, space: str, t: List[Any]) -> FakeResponse:
+        await self._roundtrip("replace")
+        self.spaces.setdefault(space, {})[t[0]] = list(t)
+        return FakeResponse([list(t)])
+
+    async def delete(self, space: str, key: List[Any]) -> FakeResponse:
+        await self._roundtrip("delete")
+        row = self.spaces.get(space, {}).pop(key[0], None)
+        return FakeResponse([row] if row is not None else [])
@@ -0,0 +1,83 @@
+"""
+Local stand-ins for the auth check (AUTH_SERVICE_URL) and user-service (USER_SERVICE_URL) endpoints.
+
+The auth check accepts any session that carries an Authorization cookie, like the real one does for a valid
+token, and answers 401 otherwise. The user-info endpoint derives a stable profile from that cookie, so every
+virtual user of the load test gets their own name in the PDF header. Behaviour is controlled by environment
+variables:
+    FAKE_AUTH_LATENCY       latency of the auth check in seconds (default 0.005)
+    FAKE_AUTH_ERROR_RATE    share of auth checks answered with 503 (default 0)
+    FAKE_USER_LATENCY       latency of the user-info endpoint in seconds (default 0.01)
+    FAKE_USER_ERROR_RATE    share of user-info requests answered with 503 (default 0)
+
+    uvicorn benchmarks.fake_upstreams:app --port 8081
+    AUTH_SERVICE_URL=http://127.0.0.1:8081/api/v001/user/auth/check uvicorn main:app
+"""
+import asyncio
+import hashlib
+import os
+import random
+from dataclasses import dataclass
+from typing import Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+AUTH_CHECK_PATH = "/api/v001/user/auth/check"
+USER_INFO_PATH = "/api/v001/users/info"
+
+
+@dataclass
+class FakeUpstreamsConfig:
+    auth_latency: float = 0.005
+    auth_error_rate: float = 0.0
+    user_latency: float = 0.01
+    user_error_rate: float = 0.0
+
+    @classmethod
+    def from_env(cls) -> "FakeUpstreamsConfig":
+        return cls(
+            auth_latency=float(os.getenv("FAKE_AUTH_LATENCY", "0.005")),
+            auth_error_rate=float(os.getenv("FAKE_AUTH_ERROR_RATE", "0")),
+            user_latency=float(os.getenv("FAKE_USER_LATENCY", "0.01")),
+            user_error_rate=float(os.getenv("FAKE_USER_ERROR_RATE", "0")),
+        )
+
+
+def create_app(config: Optional[FakeUpstreamsConfig] = None) -> FastAPI:
+    config = config or FakeUpstreamsConfig.from_env()
+    fake = FastAPI(title="Fake auth and user services")
+    fake.state.config = config
+    fake.state.requests = {"auth": 0, "user": 0}
+
+    @fake.get(AUTH_CHECK_PATH)
+    async def auth_check(request: Request):
+        fake.state.requests["auth"] += 1
+        await asyncio.sleep(config.auth_latency)
+        if random.random() < config.auth_error_rate:
+            return JSONResponse({"error": "fake auth failure"}, status_code=503)
+        if not request.cookies.get("Authorization"):
+            return JSONResponse({"error": "unauthorized"}, status_code=401)
+        return Response(status_code=200)
+
+    @fake.get(USER_INFO_PATH)
+    async def user_info(request: Request):
+        fake.state.requests["user"] += 1
+        await asyncio.sleep(config.user_latency)
+        if random.random() < config.user_error_rate:
+            return JSONResponse({"error": "fake user-service failure"}, status_code=503)
+        token = request.cookies.get("Authorization")
+        if not token:
+            return JSONResponse({"error": "unauthorized"}, status_code=401)
+        user_id = int(hashlib.sha256(token.encode("utf-8")).hexdigest()[:6], 16)
+        return {
+            "name": "Иван",
+            "surname": f"Тестов-{user_id}",
+            "email": f"user{user_id}@example.com",
+            "phone_number": f"+7 900 {user_id % 1000:03d}-{user_id % 100:02d}-{user_id % 97:02d}",
+        }
+
+    return fake
+
+
+app = create_app()
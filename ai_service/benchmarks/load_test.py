@@ -0,0 +1,538 @@
+"""
+End-to-end load test of the resume endpoints.
+
+By default the service runs in-process, exactly as main.app is deployed (middleware, lifespan, schedulers,
+caches, PDF pool), but its upstream clients talk to local stand-ins over httpx.ASGITransport: the fake
+OpenAI-compatible LLM (benchmarks.fake_llm), the fake auth check and user-info endpoints
+(benchmarks.fake_upstreams) and FakeS3 for asynchronous PDF jobs. No network, no credentials.
+
+Requests are sent open-loop at --rps (fixed or Poisson arrivals), and latency is measured from the moment a
+request was due, not when it was sent, so a service that falls behind shows it in its latency instead of
+quietly lowering the offered load. Every request carries answers unique to it and to the run, so neither the LLM response cache (which persists
+on disk between runs) nor the PDF cache turns the run into a cache benchmark; --reuse-answers measures the
+cached path instead.
+
+The load generator shares the event loop with the service in-process, so absolute numbers include some client
+overhead; compare runs made the same way. --base-url drives a deployed service instead (its upstreams are then
+whatever it is configured with, e.g. the stand-ins run under uvicorn).
+
+Run from the ai_service directory:
+    python -m benchmarks.load_test --rps 20 --duration 30 --out load.json
+    python -m benchmarks.load_test --rps 20 --duration 30 --llm-token-rate 200 --compare load.json
+    python -m benchmarks.load_test --scenarios label_generate=3,pdf=1 --rps 50 --llm-rate-limit-rate 0.05
+"""
+import argparse
+import asyncio
+import contextlib
+import datetime
+import json
+import logging
+import math
+import platform
+import random
+import secrets
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from benchmarks import fake_llm, fake_upstreams
+from benchmarks.fake_s3 import FakeS3
+
+SCHEMA_VERSION = 1
+BATCH_SIZE = 5
+PDF_JOB_WAIT = 30
+
+SAMPLE_ANSWERS = {
+    "Сколько лет вы занимаетесь программированием?": "5 лет",
+    "С какими языками программирования работали?": "Python, Go, TypeScript",
+    "Какие используете фреймворки/библиотеки?": "FastAPI, Django, React",
+    "Приходилось ли взаимодействовать с базами данных? Какими именно?": "PostgreSQL, Redis, Tarantool",
+}
+SAMPLE_RESUME = [
+    {"label": "Опыт программирования", "value": "5 лет коммерческой разработки"},
+    {"label": "Языки программирования", "value": "Python, Go, TypeScript"},
+    {"label": "Фреймворки Backend", "value": "FastAPI, Django"},
+    {"label": "Базы данных", "value": "PostgreSQL, Redis, Tarantool"},
+    {"label": "Опыт работы", "value": "Разработка сервисов для HR-платформы, внедрение CI/CD и мониторинга. " * 3},
+]
+
+
+@dataclass
+class Outcome:
+    """What one scenario call produced. first_byte is a time.perf_counter() value."""
+    status: int
+    error: Optional[str] = None
+    first_byte: Optional[float] = None
+
+
+@dataclass
+class Sample:
+    latency: float
+    ttfb: Optional[float]
+    status: int
+    error: Optional[str]
+
+
+@dataclass
+class Target:
+    """The service under test and where presigned PDF job URLs are downloaded from."""
+    client: httpx.AsyncClient
+    downloads: httpx.AsyncClient
+    reuse_answers: bool = False
+    run_id: str = field(default_factory=lambda: secrets.token_hex(4))
+    stand_ins: Dict[str, Any] = field(default_factory=dict)
+
+
+class VirtualUser:
+    def __init__(self, index: int):
+        self.index = index
+        self.headers = {"Cookie": f"Authorization=load-user-{index}; Refresh-Token=load-refresh-{index}"}
+
+
+# --- Scenarios: one per endpoint of routers/resume_1.py ---
+
+async def _fetch(
+    target: Target,
+    user: VirtualUser,
+    method: str,
+    path: str,
+    check: Optional[Callable[[bytes], Optional[str]]] = None,
+    **kwargs: Any,
+) -> Outcome:
+    """Reads the whole body; check() reports errors a 200 stream carries in-band."""
+    first_byte = None
+    chunks = []
+    async with target.client.stream(method, path, headers={**user.headers, **kwargs.pop("headers", {})}, **kwargs) as response:
+        async for chunk in response.aiter_bytes():
+            if first_byte is None:
+                first_byte = time.perf_counter()
+            chunks.append(chunk)
+    if response.status_code >= 400:
+        return Outcome(response.status_code, f"http_{response.status_code}", first_byte)
+    error = check(b"".join(chunks)) if check else None
+    return Outcome(response.status_code, error, first_byte)
+
+
+def _answers(target: Target, n: int) -> Dict[str, str]:
+    if target.reuse_answers:
+        return dict(SAMPLE_ANSWERS)
+    return {question: f"{answer} (#{target.run_id}-{n})" for question, answer in SAMPLE_ANSWERS.items()}
+
+
+def _sse_error(body: bytes) -> Optional[str]:
+    return "stream_error" if b"event: error" in body else None
+
+
+def _ndjson_error(body: bytes) -> Optional[str]:
+    last = body.strip().rsplit(b"\n", 1)[-1]
+    return "stream_error" if last.startswith(b'{"error"') else None
+
+
+def _batch_error(body: bytes) -> Optional[str]:
+    try:
+        summary = json.loads(body.strip().rsplit(b"\n", 1)[-1])["summary"]
+    except (ValueError, KeyError):
+        return "stream_error"
+    return "batch_item_error" if summary.get("failed") else None
+
+
+def _pdf_error(body: bytes) -> Optional[str]:
+    return None if body.startswith(b"%PDF") else "not_a_pdf"
+
+
+async def basic_questions(target: Target, user: VirtualUser, n: int) -> Outcome:
+    return await _fetch(target, user, "GET", "/api/v001/resume/basic/question")
+
+
+async def question_get(target: Target, user: VirtualUser, n: int) -> Outcome:
+    return await _fetch(target, user, "POST", "/api/v001/resume/question/get", json={"answers": _answers(target, n)})
+
+
+async def question_stream(target: Target, user: VirtualUser, n: int) -> Outcome:
+    return await _fetch(
+        target, user, "POST", "/api/v001/resume/question/stream", _sse_error, json={"answers": _answers(target, n)}
+    )
+
+
+async def label_generate(target: Target, user: VirtualUser, n: int) -> Outcome:
+    return await _fetch(target, user, "POST", "/api/v001/resume/label/generate", json={"answers": _answers(target, n)})
+
+
+async def label_generate_stream(target: Target, user: VirtualUser, n: int) -> Outcome:
+    return await _fetch(
+        target, user, "POST", "/api/v001/resume/label/generate", _ndjson_error,
+        params={"stream": "ndjson"}, json={"answers": _answers(target, n)},
+    )
+
+
+async def label_generate_batch(target: Target, user: VirtualUser, n: int) -> Outcome:
+    items = [{"id": f"{n}-{i}", "answers": _answers(target, n * BATCH_SIZE + i)} for i in range(BATCH_SIZE)]
+    return await _fetch(target, user, "POST", "/api/v001/resume/label/generate/batch", _batch_error, json=items)
+
+
+def _update_applied(new_info: str) -> Callable[[bytes], Optional[str]]:
+    """A 200 that hands back the unchanged data is a failed update, not a success."""
+    def check(body: bytes) -> Optional[str]:
+        try:
+            items = json.loads(body)
+        except ValueError:
+            return "invalid_json"
+        if not isinstance(items, list) or items == SAMPLE_RESUME:
+            return "update_not_applied"
+        if not any(new_info in str(item.get("value", "")) for item in items if isinstance(item, dict)):
+            return "update_not_applied"
+        return None
+    return check
+
+
+async def label_update(target: Target, user: VirtualUser, n: int) -> Outcome:
+    new_info = "Добавь опыт с Kubernetes" if target.reuse_answers else f"Добавь опыт с Kubernetes (#{target.run_id}-{n})"
+    return await _fetch(
+        target, user, "POST", "/api/v001/resume/label/update", _update_applied(new_info),
+        json={"current_data": SAMPLE_RESUME, "new_info": new_info},
+    )
+
+
+def _resume(target: Target, n: int) -> List[Dict[str, str]]:
+    if target.reuse_answers:
+        return SAMPLE_RESUME
+    return SAMPLE_RESUME + [{"label": "Номер заявки", "value": f"{target.run_id}-{n}"}]
+
+
+async def pdf(target: Target, user: VirtualUser, n: int) -> Outcome:
+    return await _fetch(target, user, "POST", "/api/v001/resume/generate/pdf", _pdf_error, json={"resume_data": _resume(target, n)})
+
+
+async def pdf_job(target: Target, user: VirtualUser, n: int) -> Outcome:
+    """Submit, long-poll until the job finishes, then download the PDF from the presigned URL."""
+    response = await target.client.post(
+        "/api/v001/resume/generate/pdf/jobs", headers=user.headers, json={"resume_data": _resume(target, n)}
+    )
+    if response.status_code != 202:
+        return Outcome(response.status_code, f"http_{response.status_code}")
+    location = response.headers["Location"]
+    job = response.json()
+    deadline = time.perf_counter() + PDF_JOB_WAIT
+    while job["status"] not in ("done", "failed") and time.perf_counter() < deadline:
+        response = await target.client.get(location, headers=user.headers, params={"wait": PDF_JOB_WAIT})
+        if response.status_code != 200:
+            return Outcome(response.status_code, f"http_{response.status_code}")
+        job = response.json()
+    if job["status"] != "done":
+        return Outcome(200, "job_failed" if job["status"] == "failed" else "job_timeout")
+    download = await target.downloads.get(job["url"])
+    first_byte = time.perf_counter()
+    if download.status_code != 200:
+        return Outcome(download.status_code, f"download_http_{download.status_code}")
+    return Outcome(200, _pdf_error(download.content), first_byte)
+
+
+Scenario = Callable[[Target, VirtualUser, int], Awaitable[Outcome]]
+
+SCENARIOS: Dict[str, Scenario] = {
+    "basic_questions": basic_questions,
+    "question_get": question_get,
+    "question_stream": question_stream,
+    "label_generate": label_generate,
+    "label_generate_stream": label_generate_stream,
+    "label_generate_batch": label_generate_batch,
+    "label_update": label_update,
+    "pdf": pdf,
+    "pdf_job": pdf_job,
+}
+STREAMING = {"question_stream", "label_generate_stream", "label_generate_batch"}
+
+
+# --- Driving load ---
+
+async def _one(scenario: Scenario, target: Target, user: VirtualUser, n: int, due: float) -> Sample:
+    try:
+        outcome = await scenario(target, user, n)
+    except Exception as e:  # transport errors, timeouts, unexpected responses
+        outcome = Outcome(0, type(e).__name__)
+    finished = time.perf_counter()
+    ttfb = outcome.first_byte - due if outcome.first_byte is not None else None
+    return Sample(finished - due, ttfb, outcome.status, outcome.error)
+
+
+async def drive(
+    target: Target,
+    mix: List[Tuple[str, float]],
+    rps: float,
+    duration: float,
+    users: int,
+    max_inflight: int,
+    arrival: str,
+    rng: random.Random,
+) -> Tuple[Dict[str, List[Sample]], Dict[str, int], float]:
+    """Sends requests open-loop for `duration` seconds. Returns samples and dropped counts per scenario, and wall time."""
+    names = [name for name, _ in mix]
+    weights = [weight for _, weight in mix]
+    virtual_users = [VirtualUser(i) for i in range(users)]
+    samples: Dict[str, List[Sample]] = {name: [] for name in names}
+    dropped: Dict[str, int] = {name: 0 for name in names}
+    inflight: "set[asyncio.Task[Sample]]" = set()
+
+    def collect(name: str) -> Callable[["asyncio.Task[Sample]"], None]:
+        def done(task: "asyncio.Task[Sample]") -> None:
+            inflight.discard(task)
+            if not task.cancelled():
+                samples[name].append(task.result())
+        return done
+
+    started = time.perf_counter()
+    due = started
+    n = 0
+    while due < started + duration:
+        delay = due - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        name = rng.choices(names, weights)[0]
+        if len(inflight) >= max_inflight:
+            dropped[name] += 1
+        else:
+            task = asyncio.create_task(_one(SCENARIOS[name], target, rng.choice(virtual_users), n, due))
+            task.add_done_callback(collect(name))
+            inflight.add(task)
+        n += 1
+        due += rng.expovariate(rps) if arrival == "poisson" else 1 / rps
+    if inflight:
+        await asyncio.wait(list(inflight))
+    return samples, dropped, time.perf_counter() - started
+
+
+# --- Reporting ---
+
+def _percentile(ordered: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile of an ascending list."""
+    if not ordered:
+        return None
+    return ordered[max(math.ceil(q / 100 * len(ordered)), 1) - 1]
+
+
+def _distribution_ms(values: List[float]) -> Optional[Dict[str, float]]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return {
+        "mean": round(sum(ordered) / len(ordered) * 1000, 2),
+        "p50": round(_percentile(ordered, 50) * 1000, 2),
+        "p95": round(_percentile(ordered, 95) * 1000, 2),
+        "p99": round(_percentile(ordered, 99) * 1000, 2),
+        "max": round(ordered[-1] * 1000, 2),
+    }
+
+
+def summarize(samples: List[Sample], dropped: int, wall: float, streaming: bool) -> Dict[str, Any]:
+    errors: Dict[str, int] = {}
+    for sample in samples:
+        if sample.error:
+            errors[sample.error] = errors.get(sample.error, 0) + 1
+    ok = len(samples) - sum(errors.values())
+    attempted = len(samples) + dropped
+    summary: Dict[str, Any] = {
+        "requests": len(samples),
+        "ok": ok,
+        "dropped": dropped,
+        "errors": dict(sorted(errors.items())),
+        "error_rate": round((attempted - ok) / attempted, 4) if attempted else 0.0,
+        "throughput_rps": round(ok / wall, 2) if wall else 0.0,
+        "latency_ms": _distribution_ms([s.latency for s in samples if not s.error]),
+    }
+    if streaming:
+        summary["ttfb_ms"] = _distribution_ms([s.ttfb for s in samples if not s.error and s.ttfb is not None])
+    return summary
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True, timeout=5
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(
+        f"offered {report['offered_rps']} rps for {report['duration_s']} s, last response after {report['wall_s']} s, "
+        f"{report['totals']['throughput_rps']} ok responses/s"
+    )
+    print(f"{'scenario':24s} {'reqs':>6s} {'ok rps':>8s} {'err %':>7s} {'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s}  errors")
+    for name, summary in [*report["scenarios"].items(), ("TOTAL", report["totals"])]:
+        latency = summary["latency_ms"] or {}
+        print(
+            f"{name:24s} {summary['requests'] + summary['dropped']:6d} {summary['throughput_rps']:8.2f} "
+            f"{summary['error_rate'] * 100:7.2f} {latency.get('p50', float('nan')):9.1f} "
+            f"{latency.get('p95', float('nan')):9.1f} {latency.get('p99', float('nan')):9.1f}  "
+            f"{summary['errors'] or ''}"
+        )
+
+
+def print_comparison(report: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+    def change(new: Optional[float], old: Optional[float]) -> str:
+        if new is None or old is None:
+            return "n/a"
+        if not old:
+            return f"{old:g} -> {new:g}"
+        return f"{old:g} -> {new:g} ({(new - old) / old * 100:+.1f}%)"
+
+    print(f"\ncompared with {baseline.get('git_commit') or 'baseline'} ({baseline.get('started_at')}):")
+    rows = [*report["scenarios"].items(), ("TOTAL", report["totals"])]
+    for name, summary in rows:
+        old = baseline["totals"] if name == "TOTAL" else baseline.get("scenarios", {}).get(name)
+        if not old:
+            continue
+        p95 = (summary["latency_ms"] or {}).get("p95")
+        old_p95 = (old.get("latency_ms") or {}).get("p95")
+        print(
+            f"  {name:24s} p95 ms {change(p95, old_p95):32s} ok rps {change(summary['throughput_rps'], old['throughput_rps']):28s} "
+            f"err % {old['error_rate'] * 100:.2f} -> {summary['error_rate'] * 100:.2f}"
+        )
+
+
+# --- Service under test ---
+
+@contextlib.asynccontextmanager
+async def in_process_target(args: argparse.Namespace) -> AsyncIterator[Target]:
+    """main.app with its upstream clients pointed at the stand-in apps."""
+    import main
+    from ai_service.services.http_clients import http_clients
+    from ai_service.services.object_storage import object_storage
+
+    llm = fake_llm.create_app(fake_llm.FakeLLMConfig(
+        latency=args.llm_latency,
+        jitter=args.llm_jitter,
+        error_rate=args.llm_error_rate,
+        token_rate=args.llm_token_rate,
+        rate_limit_rate=args.llm_rate_limit_rate,
+        retry_after=args.llm_retry_after,
+        think_tokens=args.llm_think_tokens,
+    ))
+    upstreams = fake_upstreams.create_app(fake_upstreams.FakeUpstreamsConfig(
+        auth_latency=args.auth_latency, user_latency=args.user_latency
+    ))
+    s3 = FakeS3()
+
+    # The transports route by path only, so the configured upstream hosts do not matter. The clients are
+    # installed before the lifespan runs; http_clients.start() keeps them and aclose() closes them.
+    http_clients._clients.update({
+        http_clients.LLM: httpx.AsyncClient(transport=httpx.ASGITransport(app=llm), timeout=None),
+        http_clients.AUTH: httpx.AsyncClient(transport=httpx.ASGITransport(app=upstreams), timeout=None),
+        http_clients.USER: httpx.AsyncClient(transport=httpx.ASGITransport(app=upstreams), timeout=None),
+    })
+    object_storage._client = s3
+
+    async with main.lifespan(main.app):
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=main.app), base_url="http://ai-service", timeout=args.timeout
+        ) as client, httpx.AsyncClient(transport=httpx.ASGITransport(app=s3.app), timeout=args.timeout) as downloads:
+            yield Target(client, downloads, args.reuse_answers, stand_ins={"llm": llm, "upstreams": upstreams, "s3": s3})
+
+
+@contextlib.asynccontextmanager
+async def remote_target(args: argparse.Namespace) -> AsyncIterator[Target]:
+    limits = httpx.Limits(max_connections=args.max_inflight, max_keepalive_connections=args.max_inflight)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        yield Target(client, client, args.reuse_answers)
+
+
+def _parse_mix(spec: str) -> List[Tuple[str, float]]:
+    if spec == "all":
+        return [(name, 1.0) for name in SCENARIOS]
+    mix = []
+    for part in spec.split(","):
+        name, _, weight = part.strip().partition("=")
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f"unknown scenario {name!r}; known: {', '.join(SCENARIOS)}")
+        mix.append((name, float(weight or 1)))
+    return mix
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    rng = random.Random(args.seed)
+    mix = _parse_mix(args.scenarios)
+    make_target = remote_target if args.base_url else in_process_target
+    async with make_target(args) as target:
+        if args.warmup > 0:
+            await drive(target, mix, args.rps, args.warmup, args.users, args.max_inflight, args.arrival, rng)
+        samples, dropped, wall = await drive(target, mix, args.rps, args.duration, args.users, args.max_inflight, args.arrival, rng)
+        upstream_requests = None
+        if target.stand_ins:
+            upstream_requests = {
+                "llm": target.stand_ins["llm"].state.requests,
+                **target.stand_ins["upstreams"].state.requests,
+                "s3_put_object": target.stand_ins["s3"].calls["put_object"],
+            }
+
+    all_samples = [sample for per_scenario in samples.values() for sample in per_scenario]
+    return {
+        "schema": SCHEMA_VERSION,
+        "git_commit": _git_commit(),
+        "started_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "target": args.base_url or "in-process",
+        "config": {key: value for key, value in vars(args).items() if key not in ("out", "compare")},
+        "offered_rps": args.rps,
+        "duration_s": args.duration,
+        "wall_s": round(wall, 2),
+        "totals": summarize(all_samples, sum(dropped.values()), wall, streaming=False),
+        "scenarios": {
+            name: summarize(samples[name], dropped[name], wall, name in STREAMING) for name, _ in mix
+        },
+        "upstream_requests": upstream_requests,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rps", type=float, default=10.0, help="offered load, requests per second")
+    parser.add_argument("--duration", type=float, default=30.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=3.0, help="seconds of load before measuring, discarded")
+    parser.add_argument("--scenarios", default="all", help=f"'all' or name[=weight],... of: {', '.join(SCENARIOS)}")
+    parser.add_argument("--arrival", choices=("fixed", "poisson"), default="poisson")
+    parser.add_argument("--users", type=int, default=50, help="virtual users (distinct sessions)")
+    parser.add_argument("--max-inflight", type=int, default=1000, help="requests beyond this are counted as dropped")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--reuse-answers", action="store_true", help="send identical payloads (measures the cached path)")
+    parser.add_argument("--base-url", help="drive a running service instead of the in-process one")
+    parser.add_argument("--out", help="write the JSON report here")
+    parser.add_argument("--compare", help="a previous JSON report to compare with")
+    stand_ins = parser.add_argument_group("in-process stand-ins")
+    stand_ins.add_argument("--llm-latency", type=float, default=0.2)
+    stand_ins.add_argument("--llm-jitter", type=float, default=0.1)
+    stand_ins.add_argument("--llm-token-rate", type=float, default=0.0, help="completion tokens/s, 0 for instant")
+    stand_ins.add_argument("--llm-error-rate", type=float, default=0.0, help="share of 503 answers")
+    stand_ins.add_argument("--llm-rate-limit-rate", type=float, default=0.0, help="share of 429 answers")
+    stand_ins.add_argument("--llm-retry-after", type=float, default=1.0)
+    stand_ins.add_argument("--llm-think-tokens", type=int, default=0, help="length of a <think> preamble")
+    stand_ins.add_argument("--auth-latency", type=float, default=0.005)
+    stand_ins.add_argument("--user-latency", type=float, default=0.01)
+    args = parser.parse_args()
+    if args.rps <= 0:
+        parser.error("--rps must be positive")
+    try:
+        _parse_mix(args.scenarios)
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+    logging.basicConfig(level=logging.WARNING)
+
+    report = asyncio.run(run(args))
+    print_report(report)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            print_comparison(report, json.load(f))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\nreport written to {args.out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
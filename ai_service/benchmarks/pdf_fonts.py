@@ -0,0 +1,66 @@
+"""
+Before/after benchmark for the parsed-font cache in PDFResumeGenerator.
+
+"cold" clears FontCache before every document, which is what add_font used to cost on each PDF;
+"warm" reuses the fonts parsed by the first document.
+
+Run from the ai_service directory:
+    python -m benchmarks.pdf_fonts --iterations 50
+"""
+import argparse
+import logging
+import statistics
+import time
+import tracemalloc
+
+from ai_service.services.pdf_generator import FontCache, PDFResumeGenerator
+
+TYPICAL_RESUME = [
+    {"label": "ФИО", "value": "Иван Петров"},
+    {"label": "Почта", "value": "ivan@example.com"},
+    {"label": "Языки программирования", "value": "Python, Go, TypeScript"},
+    {"label": "Фреймворки Backend", "value": "FastAPI, Django, Gin"},
+    {"label": "Базы данных", "value": "PostgreSQL, Redis, Tarantool"},
+    {"label": "Опыт работы", "value": "5 лет коммерческой разработки, включая 2 года на позиции Team Lead. " * 4},
+]
+
+
+def _render(cold: bool) -> None:
+    if cold:
+        FontCache.clear()
+    PDFResumeGenerator().generate(TYPICAL_RESUME)
+
+
+def _run(iterations: int, cold: bool) -> dict:
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        _render(cold)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    # tracemalloc slows rendering down several times, so allocations are measured in a separate pass.
+    tracemalloc.start()
+    _render(cold)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "mean_ms": statistics.mean(timings),
+        "p50_ms": statistics.median(timings),
+        "peak_alloc_kib": peak / 1024,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=30)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    PDFResumeGenerator().generate(TYPICAL_RESUME)  # import/JIT warmup outside the measurement
+    for mode, cold in (("cold (parse fonts per PDF)", True), ("warm (FontCache)", False)):
+        result = _run(args.iterations, cold)
+        print(f"{mode:28s} mean={result['mean_ms']:7.2f} ms  p50={result['p50_ms']:7.2f} ms  peak alloc={result['peak_alloc_kib']:8.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
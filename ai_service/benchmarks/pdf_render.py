@@ -0,0 +1,305 @@
+"""
+PDF rendering micro-benchmark and regression gate for PDFResumeGenerator.generate and create_resume_pdf.
+
+Each (case, target) pair runs in a fresh spawned process, so peak RSS belongs to that case alone. The child
+warms up first (imports, FontCache, one small document) and then measures:
+    p50_ms / mean_ms / min_ms  wall time over --iterations renders
+    alloc_peak_kib             tracemalloc peak during one render (separate pass, tracemalloc is slow)
+    alloc_retained_kib         memory still allocated after that render and a gc, i.e. leaks and cache growth
+    rss_delta_mib              peak RSS growth over the warmed-up process
+    size_bytes / pages         the produced PDF
+
+Results are compared with a stored baseline; a metric regresses when it exceeds the baseline by more than its
+tolerance (plus a small absolute slack for tiny values), and the exit status is 1. Wall time and RSS are only
+comparable on the same machine and versions, which the baseline records; allocations and output size are
+largely machine-independent.
+
+Run from the ai_service directory:
+    python -m benchmarks.pdf_render                           # compare with benchmarks/pdf_render_baseline.json
+    python -m benchmarks.pdf_render --update-baseline         # record a new baseline
+    python -m benchmarks.pdf_render --cases typical,ten_pages --time-tolerance 0.5 --out run.json
+"""
+import argparse
+import datetime
+import gc
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import re
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+SCHEMA_VERSION = 1
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pdf_render_baseline.json")
+
+UserInfo = Optional[Dict[str, Any]]
+Case = Tuple[List[Dict[str, str]], UserInfo]
+
+USER_INFO = {"name": "Иван", "surname": "Петров", "email": "ivan.petrov@example.com", "phone_number": "+7 900 123-45-67"}
+
+
+# --- Corpus ---
+
+def _short() -> Case:
+    return [
+        {"label": "Языки программирования", "value": "Python"},
+        {"label": "Опыт программирования", "value": "1 год"},
+    ], USER_INFO
+
+
+def _typical() -> Case:
+    return [
+        {"label": "Опыт программирования", "value": "5 лет коммерческой разработки"},
+        {"label": "Языки программирования", "value": "Python, Go, TypeScript"},
+        {"label": "Фреймворки Backend", "value": "FastAPI, Django, Gin"},
+        {"label": "Фреймворки Frontend", "value": "React, Vue"},
+        {"label": "Базы данных", "value": "PostgreSQL, Redis, Tarantool, ClickHouse"},
+        {"label": "DevOps", "value": "Docker, Kubernetes, GitLab CI, Terraform"},
+        {"label": "Архитектура", "value": "Микросервисы, событийная архитектура, gRPC, Kafka"},
+        {"label": "Опыт работы", "value": "Разработка сервисов для HR-платформы: поиск кандидатов, генерация резюме, "
+                                          "интеграция с внешними job-бордами. Руководил командой из четырёх человек. " * 2},
+    ], USER_INFO
+
+
+def _ten_pages() -> Case:
+    items = []
+    for i in range(1, 61):
+        items.append({
+            "label": f"Проект {i}",
+            "value": f"Проект {i}: разработка и сопровождение сервиса, проектирование API, оптимизация запросов к базе "
+                     f"данных, настройка мониторинга и алертинга, ревью кода и наставничество младших разработчиков. " * 2,
+        })
+    return items, USER_INFO
+
+
+def _long_value() -> Case:
+    # A single value spanning pages, and one unbreakable token that multi_cell has to split by characters.
+    return [
+        {"label": "О себе", "value": "Занимаюсь бэкенд-разработкой и люблю сложные задачи. " * 400},
+        {"label": "Ссылки", "value": "https://example.com/" + "a" * 5000},
+    ], USER_INFO
+
+
+def _cyrillic_heavy() -> Case:
+    text = ("Съешь же ещё этих мягких французских булок, да выпей чаю. Ёжик в тумане, щука и эхо — "
+            "ЩЁЛКНУВ ЗАМКОМ, ЮННАТ ПОДЪЕХАЛ К ЦЕХУ. ") * 6
+    return [{"label": f"Раздел {i} — «{text[:20]}»", "value": text} for i in range(1, 16)], USER_INFO
+
+
+def _unsupported_glyphs() -> Case:
+    # DejaVu has no emoji, CJK or mathematical alphanumerics: fpdf2 has to look each one up and drop it.
+    text = "Команда 🚀 релиз ✅ 日本語のテキスト 한국어 𝔘𝔫𝔦𝔠𝔬𝔡𝔢 ∑∫√ ⚠️ 👩‍💻 " * 20
+    return [{"label": f"Достижения {i} 🏆", "value": text} for i in range(1, 11)], {**USER_INFO, "name": "Иван 😀"}
+
+
+CASES: Dict[str, Callable[[], Case]] = {
+    "short": _short,
+    "typical": _typical,
+    "ten_pages": _ten_pages,
+    "long_value": _long_value,
+    "cyrillic_heavy": _cyrillic_heavy,
+    "unsupported_glyphs": _unsupported_glyphs,
+}
+TARGETS = ("generate", "create_resume_pdf")
+
+# metric -> (tolerance option, absolute slack below which differences are noise)
+GATED_METRICS = {
+    "p50_ms": ("time_tolerance", 1.0),
+    "alloc_peak_kib": ("alloc_tolerance", 64.0),
+    "rss_delta_mib": ("rss_tolerance", 2.0),
+    "size_bytes": ("size_tolerance", 256.0),
+}
+
+
+# --- Measurement (runs in the child process) ---
+
+def _render_function(target: str) -> Callable[[List[Dict[str, str]], UserInfo], bytes]:
+    from ai_service.services.pdf_generator import PDFResumeGenerator, create_resume_pdf
+
+    if target == "generate":
+        return lambda resume_data, user_info: PDFResumeGenerator().generate(resume_data, user_info)
+    return create_resume_pdf
+
+
+def _rss_mib() -> float:
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss / (1024 * 1024) if sys.platform == "darwin" else maxrss / 1024  # bytes on macOS, KiB on Linux
+
+
+def _measure(case: str, target: str, iterations: int) -> Dict[str, Any]:
+    logging.disable(logging.WARNING)  # missing-glyph warnings would dominate the unsupported_glyphs case
+    render = _render_function(target)
+    resume_data, user_info = CASES[case]()
+
+    short_data, short_info = _short()
+    render(short_data, short_info)
+    gc.collect()
+    rss_before = _rss_mib()
+
+    timings = []
+    output = b""
+    for _ in range(iterations):
+        started = time.perf_counter()
+        output = render(resume_data, user_info)
+        timings.append((time.perf_counter() - started) * 1000)
+    rss_after = _rss_mib()
+
+    gc.collect()
+    tracemalloc.start()
+    render(resume_data, user_info)
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "p50_ms": round(statistics.median(timings), 2),
+        "mean_ms": round(statistics.mean(timings), 2),
+        "min_ms": round(min(timings), 2),
+        "alloc_peak_kib": round(peak / 1024, 1),
+        "alloc_retained_kib": round(retained / 1024, 1),
+        "rss_delta_mib": round(rss_after - rss_before, 2),
+        "peak_rss_mib": round(rss_after, 2),
+        "size_bytes": len(output),
+        "pages": len(re.findall(rb"/Type\s*/Page\b", output)),
+    }
+
+
+def _measure_in_child(args: Tuple[str, str, int]) -> Dict[str, Any]:
+    return _measure(*args)
+
+
+def measure(case: str, target: str, iterations: int) -> Dict[str, Any]:
+    """Runs _measure in a fresh spawned interpreter so RSS and caches start from the same state every time."""
+    with multiprocessing.get_context("spawn").Pool(1) as pool:
+        return pool.apply(_measure_in_child, ((case, target, iterations),))
+
+
+# --- Baseline comparison ---
+
+def _versions() -> Dict[str, Optional[str]]:
+    try:
+        import fpdf
+        fpdf_version = fpdf.__version__
+    except ImportError:
+        fpdf_version = None
+    return {"python": platform.python_version(), "fpdf2": fpdf_version, "machine": f"{platform.platform()} {platform.machine()}"}
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True, timeout=5
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Any], tolerances: Dict[str, float]) -> List[str]:
+    """Regression messages for every gated metric above baseline * (1 + tolerance) + slack."""
+    regressions = []
+    for key, metrics in results.items():
+        old = baseline.get("results", {}).get(key)
+        if old is None:
+            continue
+        for metric, (option, slack) in GATED_METRICS.items():
+            if metric not in old:
+                continue
+            limit = old[metric] * (1 + tolerances[option]) + slack
+            if metrics[metric] > limit:
+                regressions.append(
+                    f"{key}: {metric} {metrics[metric]:g} > {limit:g} (baseline {old[metric]:g}, tolerance {tolerances[option]:.0%})"
+                )
+    return regressions
+
+
+def _change(new: float, old: Optional[float]) -> str:
+    if old is None:
+        return ""
+    if not old:
+        return f"(was {old:g})"
+    return f"({(new - old) / old * 100:+.1f}%)"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--cases", default="all", help=f"'all' or a comma-separated subset of: {', '.join(CASES)}")
+    parser.add_argument("--targets", default="all", help=f"'all' or a comma-separated subset of: {', '.join(TARGETS)}")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--update-baseline", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--out", help="also write the results to this JSON file")
+    parser.add_argument("--time-tolerance", type=float, default=0.25)
+    parser.add_argument("--alloc-tolerance", type=float, default=0.10)
+    parser.add_argument("--rss-tolerance", type=float, default=0.25)
+    parser.add_argument("--size-tolerance", type=float, default=0.02)
+    args = parser.parse_args()
+
+    cases = list(CASES) if args.cases == "all" else [c.strip() for c in args.cases.split(",")]
+    targets = list(TARGETS) if args.targets == "all" else [t.strip() for t in args.targets.split(",")]
+    unknown = [c for c in cases if c not in CASES] + [t for t in targets if t not in TARGETS]
+    if unknown:
+        parser.error(f"unknown case or target: {', '.join(unknown)}")
+
+    baseline: Dict[str, Any] = {}
+    if not args.update_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    results: Dict[str, Dict[str, Any]] = {}
+    print(f"{'case/target':38s} {'p50 ms':>9s} {'alloc KiB':>10s} {'RSS +MiB':>9s} {'bytes':>8s} {'pages':>5s}")
+    for case in cases:
+        for target in targets:
+            key = f"{case}/{target}"
+            metrics = results[key] = measure(case, target, args.iterations)
+            old = baseline.get("results", {}).get(key, {})
+            print(
+                f"{key:38s} {metrics['p50_ms']:9.2f} {metrics['alloc_peak_kib']:10.0f} {metrics['rss_delta_mib']:9.2f} "
+                f"{metrics['size_bytes']:8d} {metrics['pages']:5d}  {_change(metrics['p50_ms'], old.get('p50_ms'))}"
+            )
+
+    report = {
+        "schema": SCHEMA_VERSION,
+        "git_commit": _git_commit(),
+        "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "iterations": args.iterations,
+        **_versions(),
+        "results": results,
+    }
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    if args.update_baseline:
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding="utf-8") as f:
+                report["results"] = {**json.load(f).get("results", {}), **results}  # keep cases not run this time
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        print(f"\nbaseline written to {args.baseline}")
+        return
+    if not baseline:
+        print(f"\nno baseline at {args.baseline}; run with --update-baseline to record one")
+        return
+
+    mismatched = [name for name, value in _versions().items() if baseline.get(name) != value]
+    if mismatched:
+        print(f"\nnote: baseline differs in {', '.join(mismatched)}; wall time and RSS may not be comparable")
+    tolerances = {option: getattr(args, option) for option, _ in GATED_METRICS.values()}
+    regressions = compare(results, baseline, tolerances)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) against the baseline from {baseline.get('git_commit')}:")
+        for message in regressions:
+            print(f"  {message}")
+        sys.exit(1)
+    print(f"\nno regressions against the baseline from {baseline.get('git_commit')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,44 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from ai_service.config import settings
-from ai_service.routers import resume_1
+from ai_service.routers import debug, metrics, resume_1, sessions
 from ai_service.middleware.auth import verify_tokens_via_cookies
+from ai_service.middleware.tracing import trace_requests
+from ai_service.services.http_clients import http_clients
+from ai_service.services.jwt_verifier import jwt_verifier
+from ai_service.services.llm_cache import llm_response_cache
+from ai_service.services.loop_monitor import loop_monitor
+from ai_service.services.object_storage import object_storage
+from ai_service.services.pdf_jobs import pdf_jobs
+from ai_service.services.pdf_pool import pdf_render_pool
+from ai_service.services.request_trace import span_log
+from ai_service.services.session_store import session_store
+from ai_service.services.speculation import speculative_extractions
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    span_log.start()
+    await http_clients.start()
+    await jwt_verifier.start()
+    await pdf_render_pool.start()
+    await session_store.start()
+    await object_storage.start()
+    await loop_monitor.start()
+    try:
+        yield
+    finally:
+        await loop_monitor.aclose()
+        await speculative_extractions.aclose()
+        await session_store.aclose()
+        await pdf_jobs.aclose()
+        await pdf_render_pool.aclose()
+        await llm_response_cache.aclose()
+        await jwt_verifier.aclose()
+        await http_clients.aclose()
+        span_log.stop()
+
 
 app = FastAPI(
     title=settings.APP_TITLE,
@@ -9,14 +46,20 @@ app = FastAPI(
     version=settings.APP_VERSION,
     docs_url="/docs",
     redoc_url="/redoc",
-    openapi_url="/openapi.json"
+    openapi_url="/openapi.json",
+    lifespan=lifespan,
 )
 
 app.middleware("http")(verify_tokens_via_cookies)
+# Registered last so it wraps the auth middleware and sees the auth check.
+app.middleware("http")(trace_requests)
 
 app.include_router(resume_1.router)
+app.include_router(sessions.router)
+if settings.METRICS_ENABLED:
+    app.include_router(metrics.router)
+app.include_router(debug.router)
 
 @app.get("/")
 async def read_root():
     return {"message": f"Welcome to {settings.APP_TITLE}"}
-
@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+
+from ai_service.services.batch import BatchProgress, fan_out
+
+
+async def _collect(stream):
+    return [record async for record in stream]
+
+
+@pytest.mark.anyio
+async def test_results_stream_in_completion_order():
+    delays = {"slow": 0.05, "medium": 0.02, "fast": 0.0}
+
+    async def worker(item):
+        await asyncio.sleep(delays[item])
+        return item.upper()
+
+    records = await _collect(fan_out(["slow", "medium", "fast"], worker, concurrency=3))
+
+    assert records == [(2, "FAST", None), (1, "MEDIUM", None), (0, "SLOW", None)]
+
+
+@pytest.mark.anyio
+async def test_concurrency_is_bounded():
+    running = 0
+    peak = 0
+
+    async def worker(item):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return item
+
+    records = await _collect(fan_out(list(range(10)), worker, concurrency=3))
+
+    assert peak == 3
+    assert sorted(index for index, _, _ in records) == list(range(10))
+
+
+@pytest.mark.anyio
+async def test_each_failing_item_yields_its_own_error():
+    async def worker(item):
+        if item % 2:
+            raise ValueError(f"bad item {item}")
+        return item * 10
+
+    records = sorted(await _collect(fan_out([0, 1, 2, 3], worker, concurrency=2)), key=lambda record: record[0])
+
+    assert [(index, result) for index, result, _ in records] == [(0, 0), (1, None), (2, 20), (3, None)]
+    assert [str(error) if error else None for _, _, error in records] == [None, "bad item 1", None, "bad item 3"]
+
+
+@pytest.mark.anyio
+async def test_worker_cancelled_from_inside_is_reported_as_an_error():
+    async def worker(item):
+        if item == "cancelled":
+            raise asyncio.CancelledError()
+        return item
+
+    records = dict((index, error) for index, _, error in await _collect(fan_out(["ok", "cancelled"], worker, 2)))
+
+    assert records[0] is None
+    assert isinstance(records[1], RuntimeError)
+
+
+@pytest.mark.anyio
+async def test_closing_the_stream_cancels_the_remaining_workers():
+    started = []
+    cancelled = []
+
+    async def worker(item):
+        started.append(item)
+        if item == 0:
+            return item
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(item)
+            raise
+        return item
+
+    stream = fan_out(list(range(5)), worker, concurrency=3)
+    assert await stream.__anext__() == (0, 0, None)
+    await stream.aclose()
+
+    assert sorted(cancelled) == sorted(started[1:])
+    assert len(started) == 4  # 0 finished, its runner took item 3; items 4+ never started
+
+
+@pytest.mark.anyio
+async def test_empty_batch_yields_nothing():
+    async def worker(item):
+        raise AssertionError("no items, no calls")
+
+    assert await _collect(fan_out([], worker, concurrency=4)) == []
+
+
+def test_batch_progress_summary():
+    progress = BatchProgress(total=3)
+    progress.record(True)
+    progress.record(False)
+
+    summary = progress.summary()
+
+    assert (summary["total"], summary["completed"], summary["succeeded"], summary["failed"]) == (3, 2, 1, 1)
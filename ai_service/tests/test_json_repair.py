@@ -0,0 +1,65 @@
+import pytest
+
+from ai_service.services.json_repair import repair_json
+
+LABEL_VALUE = [{"label": "Навыки", "value": "Python"}]
+
+
+@pytest.mark.parametrize("text, expected, repair", [
+    # valid JSON passes through untouched
+    ('[{"label": "Навыки", "value": "Python"}]', LABEL_VALUE, None),
+    # quoting
+    ("[{'label': 'Навыки', 'value': 'Python'}]", LABEL_VALUE, "converted single-quoted strings"),
+    ("[{'label': 'Навыки', 'value': 'it\\'s \"ok\"'}]", [{"label": "Навыки", "value": "it's \"ok\""}], "converted single-quoted strings"),
+    ('[{label: "Навыки", value: "Python"}]', LABEL_VALUE, "quoted bare object keys"),
+    ('{"ok": True, "missing": None}', {"ok": True, "missing": None}, "converted Python literals"),
+    # commas
+    ('[{"label": "Навыки", "value": "Python",},]', LABEL_VALUE, "removed trailing commas"),
+    ('[{"label": "a", "value": "1"} {"label": "b", "value": "2"}]',
+     [{"label": "a", "value": "1"}, {"label": "b", "value": "2"}], "inserted missing commas"),
+    # truncation: containers are closed, cut-off items dropped
+    ('[{"label": "Навыки", "value": "Python"}, {"label": "Опыт", "value": "5 л', LABEL_VALUE, "closed unterminated string"),
+    ('[{"label": "Навыки", "value": "Python"}, {"label": "Оп', LABEL_VALUE, "dropped item 1 cut off by the end of the output"),
+    ('{"questions": ["Перв', {"questions": []}, "dropped item 0 cut off by the end of the output"),
+    ('{"label": "Навыки", "value": "Python", "extra": "обор', {"label": "Навыки", "value": "Python"}, "closed unterminated objects"),
+    ('[{"label": "Навыки", "value": "Python"}', LABEL_VALUE, "closed unterminated arrays"),
+    ('{"questions": ["Первый?", "Втор', {"questions": ["Первый?"]}, "dropped item 1 cut off by the end of the output"),
+    ('{"questions": ["Первый?"], "count": 1', {"questions": ["Первый?"]}, "closed unterminated objects"),
+    ('[1, 2, 3', [1, 2], "closed unterminated arrays"),
+    # "value": "A", "B" run-ons are merged into the previous value
+    ('[{"label": "Фреймворки", "value": "FastAPI", "Gin Gonic"}]',
+     [{"label": "Фреймворки", "value": "FastAPI, Gin Gonic"}], "merged stray value into 'value'"),
+    ('[{"label": "Фреймворки", "value": ["FastAPI"], "Gin Gonic"}]',
+     [{"label": "Фреймворки", "value": ["FastAPI", "Gin Gonic"]}], "merged stray value into 'value'"),
+    # strings
+    ('[{"label": "Опыт", "value": "строка\nс переводом"}]', [{"label": "Опыт", "value": "строка\nс переводом"}], None),
+    # surrounding text and reasoning leftovers
+    ('Вот ответ:\n[{"label": "Навыки", "value": "Python"}]', LABEL_VALUE, "skipped text before the JSON value"),
+    ('[{"label": "Навыки", "value": "Python"}]\nНадеюсь, помог!', LABEL_VALUE, "ignored text after the JSON value"),
+    ('</think>\n[{"label": "Навыки", "value": "Python"},]', LABEL_VALUE, "skipped text before the JSON value"),
+    ('Думаю: нужен список [label, value] пар.</think>\n[{"label": "Навыки", "value": "Python"},]', LABEL_VALUE,
+     "skipped text before the JSON value"),
+])
+def test_repairs(text, expected, repair):
+    value, repairs = repair_json(text)
+
+    assert value == expected
+    if repair is None:
+        assert repairs == []
+    else:
+        assert repair in repairs
+
+
+@pytest.mark.parametrize("text", [
+    "",
+    "Извините, я не могу ответить.",
+    "<think>ещё думаю",
+    '{"label": "Навыки" "value" "Python"}',
+    "[",
+    '{"done": tr',
+    'Думаю про [список]</think>\nИзвините, не могу.',
+    '[{"label": @}]',
+])
+def test_unrepairable_output_raises(text):
+    with pytest.raises(ValueError):
+        repair_json(text)
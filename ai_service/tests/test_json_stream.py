@@ -0,0 +1,88 @@
+import json
+import random
+
+import pytest
+
+from ai_service.services.json_stream import JSONArrayItemStream
+
+ITEMS = [
+    {"label": "Имя", "value": "Иван \"Ваня\" Иванов"},
+    {"label": "Навыки", "value": ["Python", "SQL, Redis", "C:\\path\\to"]},
+    {"label": "Заметки", "value": "строка с ] и } и , внутри\nи переводом строки \u00e9"},
+]
+
+
+def _feed(parser: JSONArrayItemStream, chunks):
+    items = []
+    for chunk in chunks:
+        items += parser.feed(chunk)
+    return items
+
+
+def _split(text: str, rng: random.Random):
+    cuts = sorted(rng.sample(range(1, len(text)), k=min(12, len(text) - 1)))
+    return [text[a:b] for a, b in zip([0] + cuts, cuts + [len(text)])]
+
+
+def test_items_survive_every_single_character_boundary():
+    text = json.dumps(ITEMS, ensure_ascii=False)
+    parser = JSONArrayItemStream()
+
+    assert _feed(parser, list(text)) == ITEMS
+    assert parser.done
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_items_survive_random_boundaries_inside_strings_and_escapes(seed):
+    text = json.dumps(ITEMS, ensure_ascii=False)
+    parser = JSONArrayItemStream()
+
+    assert _feed(parser, _split(text, random.Random(seed))) == ITEMS
+
+
+def test_each_item_is_emitted_as_soon_as_it_closes():
+    text = json.dumps(ITEMS, ensure_ascii=False)
+    first_end = text.index("}") + 1
+    parser = JSONArrayItemStream()
+
+    assert parser.feed(text[:first_end - 1]) == []
+    assert parser.feed(text[first_end - 1:first_end]) == [ITEMS[0]]
+
+
+@pytest.mark.parametrize("wrapped", [
+    {"items": ITEMS},
+    {"note": "ключ [в строке]", "result": ITEMS, "other": [1, 2]},
+])
+def test_wrapped_list_is_unwrapped_without_a_key(wrapped):
+    parser = JSONArrayItemStream()
+
+    assert _feed(parser, _split(json.dumps(wrapped, ensure_ascii=False), random.Random(1))) == ITEMS
+    assert parser.done
+
+
+def test_key_selects_its_array_and_accepts_a_bare_array():
+    wrapped = json.dumps({"reasoning": ["не это"], "questions": ["Вопрос 1?", "Вопрос \"2\"?"]}, ensure_ascii=False)
+    assert _feed(JSONArrayItemStream(key="questions"), list(wrapped)) == ["Вопрос 1?", "Вопрос \"2\"?"]
+    assert _feed(JSONArrayItemStream(key="questions"), list('["a", "b"]')) == ["a", "b"]
+
+
+def test_text_around_the_array_is_ignored():
+    text = "```json\n" + json.dumps(ITEMS, ensure_ascii=False) + "\n```\nГотово: [не список]"
+    parser = JSONArrayItemStream()
+
+    assert _feed(parser, _split(text, random.Random(2))) == ITEMS
+
+
+def test_truncated_stream_keeps_the_complete_items_and_is_not_done():
+    text = json.dumps(ITEMS, ensure_ascii=False)
+    cut = text.index('"Заметки"') + 5
+    parser = JSONArrayItemStream()
+
+    assert _feed(parser, [text[:cut]]) == ITEMS[:2]
+    assert not parser.done
+
+
+def test_scalar_items_are_flushed_at_the_closing_bracket():
+    parser = JSONArrayItemStream()
+
+    assert _feed(parser, ["[1, tr", "ue, null, 2.5", "]"]) == [1, True, None, 2.5]
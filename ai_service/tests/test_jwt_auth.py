@@ -0,0 +1,126 @@
+import json
+import time
+
+import httpx
+import jwt
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+from fastapi import FastAPI, Request
+
+from ai_service.config import settings
+from ai_service.middleware import auth
+from ai_service.middleware.auth import ACCESS_TOKEN_COOKIE_NAME, REFRESH_TOKEN_COOKIE_NAME, verify_tokens_via_cookies
+from ai_service.services.http_clients import http_clients
+from ai_service.services.jwt_verifier import TokenStatus, jwt_verifier
+
+RSA_KEY = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+EC_KEY = ec.generate_private_key(ec.SECP256R1())
+OTHER_RSA_KEY = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+
+def _public_jwk(private_key, kid: str, alg: str) -> dict:
+    jwk = json.loads(jwt.algorithms.get_default_algorithms()[alg].to_jwk(private_key.public_key()))
+    return {**jwk, "kid": kid, "alg": alg, "use": "sig"}
+
+
+def _token(private_key, kid: str, alg: str = "RS256", expires_in: float = 300, sub: str = "42") -> str:
+    now = int(time.time())
+    claims = {"sub": sub, "iat": now, "exp": now + int(expires_in)}
+    return jwt.encode(claims, private_key, algorithm=alg, headers={"kid": kid})
+
+
+@pytest.fixture
+def remote_auth(monkeypatch):
+    """Local verification against the generated keys; the remote auth check is a mock that records its calls."""
+    jwks = {"keys": [_public_jwk(RSA_KEY, "rsa-1", "RS256"), _public_jwk(EC_KEY, "ec-1", "ES256")]}
+    monkeypatch.setattr(settings, "AUTH_MODE", "local")
+    monkeypatch.setattr(settings, "JWT_JWKS", json.dumps(jwks))
+    monkeypatch.setattr(settings, "JWT_JWKS_FILE", "")
+    monkeypatch.setattr(settings, "JWT_HS256_SECRET", "")
+    monkeypatch.setattr(settings, "JWT_LEEWAY", 0.0)
+    jwt_verifier.load_static_keys()
+    auth._auth_cache.clear()
+
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(200)
+
+    monkeypatch.setitem(http_clients._clients, "auth", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    yield calls
+    jwt_verifier.load_static_keys()
+
+
+@pytest.fixture
+def app():
+    app = FastAPI()
+    app.middleware("http")(verify_tokens_via_cookies)
+
+    @app.get("/whoami")
+    async def whoami(request: Request):
+        return {"user_id": getattr(request.state, "user_id", None)}
+
+    return app
+
+
+async def _whoami(app: FastAPI, access_token: str) -> httpx.Response:
+    cookies = {ACCESS_TOKEN_COOKIE_NAME: access_token, REFRESH_TOKEN_COOKIE_NAME: "refresh"}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app), base_url="http://test", cookies=cookies) as client:
+        return await client.get("/whoami")
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("private_key, kid, alg", [(RSA_KEY, "rsa-1", "RS256"), (EC_KEY, "ec-1", "ES256")])
+async def test_valid_token_is_accepted_locally(app, remote_auth, private_key, kid, alg):
+    response = await _whoami(app, _token(private_key, kid, alg))
+
+    assert response.status_code == 200
+    assert response.json() == {"user_id": "42"}
+    assert remote_auth == []
+
+
+@pytest.mark.anyio
+async def test_expired_token_falls_back_to_remote_check(app, remote_auth):
+    token = _token(RSA_KEY, "rsa-1", expires_in=-60)
+    assert jwt_verifier.verify(token)[0] == TokenStatus.EXPIRED
+
+    response = await _whoami(app, token)
+
+    assert response.status_code == 200
+    assert response.json() == {"user_id": None}
+    assert len(remote_auth) == 1
+
+
+@pytest.mark.anyio
+async def test_unknown_kid_falls_back_to_remote_check(app, remote_auth):
+    token = _token(OTHER_RSA_KEY, "rsa-rotated")
+    assert jwt_verifier.verify(token)[0] == TokenStatus.UNKNOWN_KEY
+
+    response = await _whoami(app, token)
+
+    assert response.status_code == 200
+    assert len(remote_auth) == 1
+
+
+@pytest.mark.anyio
+async def test_algorithm_mismatch_is_rejected(app, remote_auth):
+    # HS256 keyed with the RSA public key, under the RSA key's kid: the classic algorithm confusion forgery.
+    public_pem = RSA_KEY.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    now = int(time.time())
+    header = {"alg": "HS256", "kid": "rsa-1", "typ": "JWT"}
+    signing_input = b".".join(
+        jwt.utils.base64url_encode(json.dumps(part, separators=(",", ":")).encode("utf-8"))
+        for part in (header, {"sub": "42", "exp": now + 300})
+    )
+    signature = jwt.algorithms.HMACAlgorithm(jwt.algorithms.HMACAlgorithm.SHA256).sign(signing_input, public_pem)
+    token = (signing_input + b"." + jwt.utils.base64url_encode(signature)).decode("ascii")
+    assert jwt_verifier.verify(token)[0] == TokenStatus.INVALID
+
+    response = await _whoami(app, token)
+
+    assert response.status_code == 401
+    assert remote_auth == []
@@ -0,0 +1,128 @@
+import httpx
+import pytest
+
+from ai_service.config import settings
+from ai_service.services.http_clients import http_clients
+from ai_service.services.llm_backends import LLMBackend, LLMBackendPool
+from benchmarks.fake_llm import FakeLLMConfig, create_app
+
+PAYLOAD = {"model": "fake-model", "messages": [{"role": "user", "content": "Опыт работы: 5 лет"}]}
+
+
+class _HostTransport(httpx.AsyncBaseTransport):
+    """Routes each request to the fake LLM app serving its host, the way separate providers would."""
+
+    def __init__(self, apps):
+        self.transports = {host: httpx.ASGITransport(app) for host, app in apps.items()}
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self.transports[request.url.host].handle_async_request(request)
+
+
+@pytest.fixture
+def fake_backends(monkeypatch):
+    """Builds a pool over fake LLM backends: fake_backends(name=FakeLLMConfig(...), ...)."""
+
+    def build(**configs: FakeLLMConfig) -> LLMBackendPool:
+        apps = {name: create_app(config) for name, config in configs.items()}
+        monkeypatch.setitem(http_clients._clients, "llm", httpx.AsyncClient(transport=_HostTransport(apps)))
+        backends = [LLMBackend(name, f"http://{name}/v1/chat/completions", None, {}) for name in configs]
+        pool = LLMBackendPool(settings, backends)
+        pool.explore_rate = 0.0
+        pool.hedge_enabled = False
+        pool.cooldown = 60.0
+        pool.apps = apps
+        return pool
+
+    return build
+
+
+def _fast(latency: float = 0.0, **kwargs) -> FakeLLMConfig:
+    return FakeLLMConfig(latency=latency, jitter=0.0, **kwargs)
+
+
+@pytest.mark.anyio
+async def test_failover_to_the_next_backend_on_5xx(fake_backends):
+    pool = fake_backends(down=_fast(error_rate=1.0), up=_fast())
+    down, up = pool.backends
+
+    response, backend = await pool.send(PAYLOAD)
+
+    assert response.status_code == 200
+    assert backend is up
+    assert pool.counters["failovers"] == 1
+    assert down.failures == 1 and up.failures == 0
+
+
+@pytest.mark.anyio
+async def test_backend_in_cooldown_is_tried_last(fake_backends):
+    pool = fake_backends(down=_fast(error_rate=1.0), up=_fast())
+    down, up = pool.backends
+    await pool.send(PAYLOAD)
+
+    assert pool.ranked() == [up, down]
+    response, backend = await pool.send(PAYLOAD)
+
+    assert backend is up
+    assert pool.apps["down"].state.requests == 1
+
+
+@pytest.mark.anyio
+async def test_rate_limited_backend_cools_down_for_its_retry_after(fake_backends):
+    pool = fake_backends(limited=_fast(rate_limit_rate=1.0, retry_after=30), up=_fast())
+    limited, up = pool.backends
+
+    _, backend = await pool.send(PAYLOAD)
+
+    assert backend is up
+    assert 25 < limited.cooldown_until - pool._clock() <= 30
+
+
+@pytest.mark.anyio
+async def test_all_backends_failing_returns_the_last_retryable_response(fake_backends):
+    pool = fake_backends(a=_fast(error_rate=1.0), b=_fast(error_rate=1.0))
+
+    response, backend = await pool.send(PAYLOAD)
+
+    assert response.status_code == 503
+    assert backend is pool.backends[1]
+
+
+@pytest.mark.anyio
+async def test_lower_latency_backend_is_ranked_first(fake_backends):
+    pool = fake_backends(slow=_fast(latency=0.05), fast=_fast())
+    slow, fast = pool.backends
+    await pool.send(PAYLOAD)  # unsampled backends go first: slow, then fast
+    await pool.send(PAYLOAD)
+
+    assert slow.ewma > fast.ewma
+    assert pool.ranked()[0] is fast
+
+
+@pytest.mark.anyio
+async def test_hedge_wins_against_a_stalled_backend(fake_backends):
+    pool = fake_backends(stalled=_fast(latency=2.0), fast=_fast())
+    pool.hedge_enabled = True
+    pool.hedge_min_delay = 0.05
+    stalled, fast = pool.backends
+
+    _, backend = await pool.send(PAYLOAD)
+
+    assert backend is fast
+    assert pool.counters["hedges"] == 1 and pool.counters["hedge_wins"] == 1
+    assert stalled.ewma >= 0.05  # the stalled backend ran at least its hedge delay before it was cancelled
+
+
+@pytest.mark.anyio
+async def test_cancelled_hedge_is_not_recorded_faster_than_the_winner(fake_backends):
+    pool = fake_backends(primary=_fast(latency=0.15), hedge=_fast(latency=2.0))
+    pool.hedge_enabled = True
+    pool.hedge_min_delay = 0.05
+    primary, hedge = pool.backends
+
+    _, backend = await pool.send(PAYLOAD)
+
+    assert backend is primary
+    assert pool.counters["hedges"] == 1 and pool.counters["hedge_wins"] == 0
+    # The hedge ran ~0.1s before it was cancelled; it must be recorded as no faster than the winner.
+    assert hedge.ewma >= primary.ewma
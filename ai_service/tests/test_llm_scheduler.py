@@ -0,0 +1,167 @@
+import asyncio
+
+import httpx
+import pytest
+
+from ai_service.config import settings
+from ai_service.services.llm_scheduler import LLMBusy, LLMScheduler, Priority, parse_duration, parse_retry_after
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def make_scheduler(monkeypatch):
+    def make(concurrency=1, queue_timeout=5.0, rpm=0, tpm=0, clock=None) -> LLMScheduler:
+        monkeypatch.setattr(settings, "LLM_MAX_CONCURRENCY", concurrency)
+        monkeypatch.setattr(settings, "LLM_QUEUE_TIMEOUT", queue_timeout)
+        monkeypatch.setattr(settings, "LLM_REQUESTS_PER_MINUTE", rpm)
+        monkeypatch.setattr(settings, "LLM_TOKENS_PER_MINUTE", tpm)
+        return LLMScheduler(settings, clock) if clock else LLMScheduler(settings)
+
+    return make
+
+
+async def _settle() -> None:
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.anyio
+async def test_waiters_are_served_by_priority_then_fifo(make_scheduler):
+    scheduler = make_scheduler(concurrency=1)
+    await scheduler.acquire(Priority.NORMAL)  # occupies the only slot
+    order = []
+
+    async def waiter(name, priority):
+        await scheduler.acquire(priority)
+        order.append(name)
+        scheduler.release()
+
+    tasks = []
+    for name, priority in [
+        ("background-1", Priority.BACKGROUND), ("normal-1", Priority.NORMAL), ("interactive-1", Priority.INTERACTIVE),
+        ("normal-2", Priority.NORMAL), ("background-2", Priority.BACKGROUND), ("interactive-2", Priority.INTERACTIVE),
+    ]:
+        tasks.append(asyncio.ensure_future(waiter(name, priority)))
+        await _settle()
+    assert scheduler.queue_depth == 6
+
+    scheduler.release()
+    await asyncio.gather(*tasks)
+
+    assert order == ["interactive-1", "interactive-2", "normal-1", "normal-2", "background-1", "background-2"]
+    assert scheduler.active == 0
+
+
+@pytest.mark.anyio
+async def test_queue_timeout_raises_llm_busy(make_scheduler):
+    scheduler = make_scheduler(concurrency=1, queue_timeout=0.05)
+    await scheduler.acquire()
+
+    with pytest.raises(LLMBusy) as excinfo:
+        await scheduler.acquire(Priority.BACKGROUND)
+
+    assert excinfo.value.retry_after >= 1
+    assert scheduler.counters["queue_timeouts"] == 1
+    assert scheduler.queue_depth == 0
+    scheduler.release()
+    async with scheduler.slot():  # the timed-out waiter left no stale entry behind
+        assert scheduler.active == 1
+
+
+@pytest.mark.anyio
+async def test_cancelled_waiter_does_not_leak_a_slot(make_scheduler):
+    scheduler = make_scheduler(concurrency=1)
+    await scheduler.acquire()
+    waiter = asyncio.ensure_future(scheduler.acquire())
+    await _settle()
+
+    waiter.cancel()
+    await asyncio.gather(waiter, return_exceptions=True)
+    scheduler.release()
+
+    assert scheduler.active == 0 and scheduler.queue_depth == 0
+
+
+@pytest.mark.anyio
+async def test_request_bucket_delays_dispatch(make_scheduler):
+    clock = FakeClock()
+    scheduler = make_scheduler(concurrency=10, rpm=2, clock=clock)
+    async with scheduler.slot():
+        pass
+    async with scheduler.slot():
+        pass
+    third = asyncio.ensure_future(scheduler.acquire())
+    await _settle()
+    assert not third.done()
+
+    clock.now += 30.0  # one request refills at 2 per minute
+    scheduler._dispatch()
+    await asyncio.wait_for(third, 1)
+    assert scheduler.active == 1
+
+
+def _response(status_code: int, headers: dict) -> httpx.Response:
+    return httpx.Response(status_code, headers=headers, request=httpx.Request("POST", "http://llm/v1/chat/completions"))
+
+
+@pytest.mark.parametrize("headers, expected", [
+    ({"retry-after": "7"}, 7.0),
+    ({"retry-after": "1.5"}, 1.5),
+    ({"x-ratelimit-reset-requests": "2m0.5s", "x-ratelimit-reset-tokens": "6s"}, 120.5),
+    ({}, 1.0),
+])
+def test_429_backs_off_by_retry_after_or_reset_headers(make_scheduler, headers, expected):
+    clock = FakeClock()
+    scheduler = make_scheduler(clock=clock)
+
+    assert scheduler.observe(_response(429, headers)) == pytest.approx(expected)
+    assert scheduler.backoff_remaining() == pytest.approx(expected)
+    assert scheduler.counters["rate_limited"] == 1
+
+
+def test_exhausted_ratelimit_headers_back_off_without_a_429(make_scheduler):
+    clock = FakeClock()
+    scheduler = make_scheduler(rpm=30, tpm=6000, clock=clock)
+
+    result = scheduler.observe(_response(200, {
+        "x-ratelimit-remaining-requests": "0",
+        "x-ratelimit-reset-requests": "2.5s",
+        "x-ratelimit-remaining-tokens": "1200",
+    }))
+
+    assert result is None
+    assert scheduler.backoff_remaining() == pytest.approx(2.5)
+    assert scheduler.requests.tokens == 0
+    assert scheduler.tokens.tokens == 1200
+
+
+@pytest.mark.anyio
+async def test_back_off_holds_dispatch_until_it_expires(make_scheduler):
+    clock = FakeClock()
+    scheduler = make_scheduler(clock=clock)
+    scheduler.observe(_response(429, {"retry-after": "10"}))
+    waiter = asyncio.ensure_future(scheduler.acquire())
+    await _settle()
+    assert not waiter.done()
+
+    clock.now += 10.0
+    scheduler._dispatch()
+    await asyncio.wait_for(waiter, 1)
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("7.66s", 7.66), ("2m59.56s", 179.56), ("1ms", 0.001), ("1h", 3600.0), ("3", 3.0), ("", None), ("soon", None),
+])
+def test_parse_duration(value, expected):
+    assert parse_duration(value) == (pytest.approx(expected) if expected is not None else None)
+
+
+def test_parse_retry_after_accepts_http_dates():
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
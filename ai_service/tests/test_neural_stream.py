@@ -0,0 +1,119 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from ai_service.config import settings
+from ai_service.services.http_clients import http_clients
+from ai_service.services.llm_scheduler import LLMScheduler
+from ai_service.services.neural_1 import NeuralService
+
+ITEMS = [{"label": "Имя", "value": "Иван"}, {"label": "Опыт работы", "value": "5 лет"}]
+
+
+def _sse(*lines: str) -> bytes:
+    return "".join(f"{line}\n\n" for line in lines).encode("utf-8")
+
+
+def _delta(content: str) -> str:
+    return "data: " + json.dumps({"choices": [{"index": 0, "delta": {"content": content}, "finish_reason": None}]}, ensure_ascii=False)
+
+
+@pytest.fixture
+def llm_stream(monkeypatch):
+    """Serves the given SSE body for every LLM request and records the request payloads."""
+    requests = []
+
+    def serve(body: bytes) -> NeuralService:
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(json.loads(request.content))
+            return httpx.Response(200, content=body, headers={"Content-Type": "text/event-stream"})
+
+        monkeypatch.setitem(http_clients._clients, "llm", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+        service = NeuralService(settings, scheduler=LLMScheduler(settings))
+        service.requests = requests
+        return service
+
+    return serve
+
+
+async def _collect(stream):
+    return [item async for item in stream]
+
+
+@pytest.mark.anyio
+async def test_malformed_and_keep_alive_lines_are_skipped(llm_stream):
+    text = json.dumps(ITEMS, ensure_ascii=False)
+    service = llm_stream(_sse(
+        ": keep-alive",
+        "data: {not json",
+        "data: ",
+        _delta(text[:20]),
+        'data: "a bare string"',
+        _delta(text[20:]),
+        "data: [DONE]",
+    ))
+
+    chunks = await _collect(service._stream_api("answers", "prompt"))
+
+    assert "".join(chunks) == text
+
+
+@pytest.mark.anyio
+async def test_error_event_fails_the_stream(llm_stream):
+    service = llm_stream(_sse(_delta("[{"), 'data: {"error": {"message": "overloaded"}}'))
+
+    with pytest.raises(Exception, match="overloaded"):
+        await _collect(service._stream_api("answers", "prompt"))
+
+
+@pytest.mark.anyio
+async def test_wrapped_list_streams_like_the_non_streaming_parser(llm_stream):
+    text = json.dumps({"items": ITEMS}, ensure_ascii=False)
+    service = llm_stream(_sse(*(_delta(text[i:i + 7]) for i in range(0, len(text), 7)), "data: [DONE]"))
+
+    items = await _collect(service._stream_json_items("answers", "prompt", array_key=None, context="test"))
+
+    assert items == ITEMS
+
+
+@pytest.mark.anyio
+async def test_streamed_update_asks_for_the_full_list_in_delta_mode(llm_stream, monkeypatch):
+    monkeypatch.setattr(settings, "LLM_UPDATE_MODE", "delta")
+    text = json.dumps(ITEMS, ensure_ascii=False)
+    service = llm_stream(_sse(_delta(text), "data: [DONE]"))
+
+    items = await _collect(service.stream_update_resume([{"label": "Имя", "value": "Иван"}], "Опыт 5 лет"))
+
+    assert items == ITEMS
+    assert len(service.requests) == 1 and service.requests[0]["stream"] is True
+    assert '"operations"' not in service.requests[0]["messages"][-1]["content"]
+
+
+@pytest.mark.anyio
+async def test_slot_is_released_when_the_upstream_ends_not_when_the_client_has_read(llm_stream):
+    text = json.dumps(ITEMS, ensure_ascii=False)
+    service = llm_stream(_sse(*(_delta(ch) for ch in text), "data: [DONE]"))
+    stream = service._stream_api("answers", "prompt")
+
+    first = await stream.__anext__()  # the client reads one delta, then stalls
+    for _ in range(100):
+        if service.scheduler.active == 0:
+            break
+        await asyncio.sleep(0.01)
+
+    assert service.scheduler.active == 0
+    rest = [chunk async for chunk in stream]
+    assert first + "".join(rest) == text
+
+
+@pytest.mark.anyio
+async def test_closing_the_stream_early_cancels_the_upstream_read(llm_stream):
+    service = llm_stream(_sse(_delta("[1,"), _delta("2]"), "data: [DONE]"))
+    stream = service._stream_api("answers", "prompt")
+
+    await stream.__anext__()
+    await stream.aclose()
+
+    assert service.scheduler.active == 0
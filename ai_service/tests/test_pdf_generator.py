@@ -0,0 +1,44 @@
+import datetime
+import os
+
+import pytest
+
+from ai_service.services import pdf_generator
+from ai_service.services.pdf_generator import FontCache, PDFResumeGenerator
+
+pytestmark = pytest.mark.skipif(
+    not (os.path.exists(pdf_generator.DEJAVU_FONT_REGULAR) and os.path.exists(pdf_generator.DEJAVU_FONT_BOLD)),
+    reason="DejaVu fonts are not installed",
+)
+
+CREATION_DATE = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+RESUME = [
+    {"label": "ФИО", "value": "Иванов Иван Иванович"},
+    {"label": "Email", "value": "ivan@example.com"},
+    {"label": "Телефон", "value": "+7 900 000-00-00"},
+    {"label": "Опыт работы", "value": "Backend-разработчик, 5 лет: Python, FastAPI, PostgreSQL. " * 20},
+    {"label": "Skills", "value": "Ünïcödé — «кавычки», emoji 🙂 and CJK 漢字 fall back to missing glyphs."},
+]
+USER_INFO = {"name": "Иван", "surname": "Иванов", "email": "ivan@example.com", "phone_number": "+7 900 000-00-00"}
+
+
+def _render() -> bytes:
+    generator = PDFResumeGenerator()
+    generator.pdf.set_creation_date(CREATION_DATE)
+    return generator.generate(RESUME, USER_INFO)
+
+
+def _plain_add_font(pdf, family, style, path):
+    pdf.add_font(family, style, path)
+
+
+def test_font_cache_renders_the_same_bytes_as_add_font(monkeypatch):
+    FontCache.clear()
+    cached_first = _render()
+    cached_again = _render()  # served from the parsed templates
+
+    monkeypatch.setattr(FontCache, "add_font", staticmethod(_plain_add_font))
+    plain = _render()
+
+    assert cached_first == plain
+    assert cached_again == plain
@@ -0,0 +1,161 @@
+import asyncio
+
+import httpx
+import pytest
+
+from ai_service.config import settings
+from ai_service.services.object_storage import ObjectStorage
+from ai_service.services.pdf_jobs import DONE, FAILED, PDFJobManager
+from ai_service.services.pdf_pool import PDFPoolBusy
+from benchmarks.fake_s3 import FakeS3
+
+RESUME_DATA = [{"label": "Навыки", "value": "Python"}]
+USER_INFO = {"name": "Иван"}
+PDF = b"%PDF-1.4 fake"
+
+
+@pytest.fixture
+def s3():
+    return FakeS3()
+
+
+@pytest.fixture
+def make_manager(s3, monkeypatch):
+    def make(**overrides):
+        for name, value in overrides.items():
+            monkeypatch.setattr(settings, name, value)
+        return PDFJobManager(settings, ObjectStorage(settings, client=s3))
+    return make
+
+
+async def _render(resume_data, user_info):
+    return PDF
+
+
+async def _finished(job):
+    while not job.finished:
+        await job.wait_for_change(1.0)
+    return job
+
+
+@pytest.mark.anyio
+async def test_job_renders_uploads_and_serves_a_presigned_url(make_manager, s3):
+    manager = make_manager(PDF_URL_TTL=60)
+    job = manager.submit("user-1", RESUME_DATA, USER_INFO, _render)
+
+    await _finished(job)
+
+    assert job.status == DONE and job.error is None
+    assert job.object_key.startswith(settings.PDF_STORAGE_PREFIX) and job.object_key.endswith(".pdf")
+    assert s3.buckets[settings.PDF_STORAGE_BUCKET][job.object_key] == (PDF, "application/pdf")
+    url = manager.url(job)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=s3.app), base_url=s3.base_url) as client:
+        response = await client.get(url)
+        tampered = await client.get(url.replace("X-Amz-Signature=", "X-Amz-Signature=0"))
+    assert response.status_code == 200 and response.content == PDF
+    assert tampered.status_code == 403
+
+
+@pytest.mark.anyio
+async def test_failed_render_fails_the_job(make_manager, s3):
+    manager = make_manager()
+
+    async def broken(resume_data, user_info):
+        raise RuntimeError("font missing")
+
+    job = await _finished(manager.submit("user-1", RESUME_DATA, USER_INFO, broken))
+
+    assert job.status == FAILED and job.error == "font missing"
+    assert manager.url(job) is None
+    assert s3.calls["put_object"] == 0
+    assert manager.counters["failed"] == 1
+
+
+@pytest.mark.anyio
+async def test_busy_render_pool_is_retried(make_manager):
+    manager = make_manager()
+    attempts = []
+
+    async def busy_once(resume_data, user_info):
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise PDFPoolBusy(0)
+        return PDF
+
+    job = await _finished(manager.submit("user-1", RESUME_DATA, USER_INFO, busy_once))
+
+    assert job.status == DONE and len(attempts) == 2
+
+
+@pytest.mark.anyio
+async def test_already_stored_document_is_not_rendered_or_uploaded_again(make_manager, s3):
+    manager = make_manager()
+    renders = []
+
+    async def counting(resume_data, user_info):
+        renders.append(1)
+        return PDF
+
+    first = await _finished(manager.submit("user-1", RESUME_DATA, USER_INFO, counting))
+    second = await _finished(manager.submit("user-2", RESUME_DATA, USER_INFO, counting))
+
+    assert second.status == DONE and second.object_key == first.object_key
+    assert len(renders) == 1 and s3.calls["put_object"] == 1
+    assert manager.counters["upload_skips"] == 1
+
+
+@pytest.mark.anyio
+async def test_full_queue_rejects_new_jobs(make_manager):
+    manager = make_manager(PDF_JOB_MAX_PENDING=1)
+    release = asyncio.Event()
+
+    async def slow(resume_data, user_info):
+        await release.wait()
+        return PDF
+
+    job = manager.submit("user-1", RESUME_DATA, USER_INFO, slow)
+    with pytest.raises(PDFPoolBusy):
+        manager.submit("user-1", RESUME_DATA, USER_INFO, slow)
+
+    release.set()
+    await _finished(job)
+    assert manager.counters["rejected"] == 1
+
+
+@pytest.mark.anyio
+async def test_running_jobs_outlive_the_job_table_ttl_and_size(make_manager):
+    manager = make_manager(PDF_JOB_TTL=0.05, PDF_JOB_MAX_ENTRIES=1)
+    release = asyncio.Event()
+
+    async def slow(resume_data, user_info):
+        await release.wait()
+        return PDF
+
+    jobs = [manager.submit("user-1", [{"label": "Номер", "value": str(i)}], USER_INFO, slow) for i in range(2)]
+    await asyncio.sleep(0.1)
+
+    assert [manager.get(job.job_id) for job in jobs] == jobs
+
+    release.set()
+    for job in jobs:
+        await _finished(job)
+    assert manager.get(jobs[1].job_id).status == DONE
+    await asyncio.sleep(0.1)
+    assert manager.get(jobs[1].job_id) is None
+
+
+@pytest.mark.anyio
+async def test_aclose_cancels_pending_jobs(make_manager):
+    manager = make_manager()
+    never = asyncio.Event()
+
+    async def stuck(resume_data, user_info):
+        await never.wait()
+        return PDF
+
+    job = manager.submit("user-1", RESUME_DATA, USER_INFO, stuck)
+    await asyncio.sleep(0)
+    await manager.aclose()
+
+    assert job.status == FAILED and manager.pending == 0
+    assert manager.get(job.job_id) is job
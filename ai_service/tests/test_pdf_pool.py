@@ -0,0 +1,81 @@
+import asyncio
+import threading
+
+import pytest
+
+from ai_service.config import settings
+from ai_service.services import pdf_pool
+from ai_service.services.pdf_pool import PDFPoolBusy, PDFRenderPool
+
+RESUME_DATA = [{"label": "Навыки", "value": "Python"}]
+
+
+@pytest.fixture
+def release():
+    event = threading.Event()
+    yield event
+    event.set()
+
+
+@pytest.fixture
+def pool(monkeypatch, release):
+    """A thread-backed pool (PDF_WORKERS=0) with capacity 2 whose renders block until `release` is set."""
+    monkeypatch.setattr(settings, "PDF_WORKERS", 0)
+    monkeypatch.setattr(settings, "PDF_QUEUE_SIZE", 1)
+
+    def render_timed(resume_data, user_info):
+        release.wait(5)
+        return b"%PDF", 0.0
+
+    monkeypatch.setattr(pdf_pool, "_render_timed", render_timed)
+    return PDFRenderPool(settings)
+
+
+async def _settle() -> None:
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.anyio
+async def test_render_beyond_capacity_is_rejected(pool, release):
+    renders = [asyncio.ensure_future(pool.render(RESUME_DATA)) for _ in range(pool.capacity)]
+    await _settle()
+
+    with pytest.raises(PDFPoolBusy):
+        await pool.render(RESUME_DATA)
+
+    release.set()
+    assert await asyncio.gather(*renders) == [b"%PDF"] * pool.capacity
+    await _settle()
+    assert pool.pending == 0
+
+
+@pytest.mark.anyio
+async def test_renders_waiting_for_a_warm_up_count_against_capacity(pool, release):
+    pool._warming = asyncio.get_running_loop().create_future()
+    renders = [asyncio.ensure_future(pool.render(RESUME_DATA)) for _ in range(pool.capacity)]
+    await _settle()
+
+    assert pool.pending == pool.capacity
+    with pytest.raises(PDFPoolBusy):
+        await pool.render(RESUME_DATA)
+
+    pool._warming.set_result(None)
+    release.set()
+    assert await asyncio.gather(*renders) == [b"%PDF"] * pool.capacity
+    await _settle()
+    assert pool.pending == 0
+
+
+@pytest.mark.anyio
+async def test_render_cancelled_during_warm_up_frees_its_slot(pool, release):
+    pool._warming = asyncio.get_running_loop().create_future()
+    render = asyncio.ensure_future(pool.render(RESUME_DATA))
+    await _settle()
+    assert pool.pending == 1
+
+    render.cancel()
+    await _settle()
+
+    assert pool.pending == 0
+    pool._warming.set_result(None)
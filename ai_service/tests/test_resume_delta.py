@@ -0,0 +1,146 @@
+import json
+
+import pytest
+
+from ai_service.config import settings
+from ai_service.services.neural_1 import NeuralService
+from ai_service.services.resume_delta import merge_operations, parse_operations
+
+CURRENT = [
+    {"label": "Имя", "value": "Иван"},
+    {"label": "Опыт работы", "value": "3 года"},
+    {"label": "Навыки", "value": ["Python", "SQL"]},
+]
+
+
+@pytest.mark.parametrize("parsed, expected", [
+    ({"operations": [{"op": "add"}]}, [{"op": "add"}]),
+    ({"ops": []}, []),
+    ([{"op": "delete", "label": "x"}], [{"op": "delete", "label": "x"}]),
+    ({"items": [{"label": "a", "value": "b"}]}, None),
+    ({"operations": "add everything"}, None),
+    ("text", None),
+])
+def test_parse_operations(parsed, expected):
+    assert parse_operations(parsed) == expected
+
+
+@pytest.mark.parametrize("op, label", [
+    ("update", "опыт работы"),
+    ("replace", "Опыт  работы"),
+    ("edit", "ОПЫТ РАБОТЫ"),
+])
+def test_modify_aliases_match_labels_loosely_and_keep_position(op, label):
+    merged, report, applied = merge_operations(CURRENT, [{"op": op, "label": label, "value": "5 лет"}])
+
+    assert merged[1] == {"label": "Опыт работы", "value": "5 лет"}
+    assert [item["label"] for item in merged] == ["Имя", "Опыт работы", "Навыки"]
+    assert applied == 1
+
+
+def test_add_aliases_append_and_list_values_are_joined():
+    merged, _, applied = merge_operations(CURRENT, [
+        {"action": "create", "label": "Языки", "value": ["русский", "английский"]},
+        {"op": "insert", "label": "Образование", "value": "МГУ"},
+    ])
+
+    assert merged[2] == {"label": "Навыки", "value": "Python, SQL"}
+    assert merged[3:] == [{"label": "Языки", "value": "русский, английский"}, {"label": "Образование", "value": "МГУ"}]
+    assert applied == 2
+
+
+def test_delete_of_unknown_label_is_ignored_and_not_counted():
+    merged, report, applied = merge_operations(CURRENT, [{"op": "remove", "label": "Хобби"}])
+
+    assert [item["label"] for item in merged] == ["Имя", "Опыт работы", "Навыки"]
+    assert applied == 0
+    assert report == ["ignored delete of unknown label 'Хобби'"]
+
+
+def test_last_operation_on_a_label_wins():
+    merged, _, applied = merge_operations(CURRENT, [
+        {"op": "modify", "label": "Имя", "value": "Пётр"},
+        {"op": "delete", "label": "Имя"},
+        {"op": "add", "label": "имя", "value": "Сергей"},
+    ])
+
+    assert merged[-1] == {"label": "имя", "value": "Сергей"}
+    assert [item["label"] for item in merged].count("Имя") == 0
+    assert applied == 3
+
+
+def test_malformed_operations_are_skipped_and_not_counted():
+    merged, report, applied = merge_operations(CURRENT, [
+        "delete everything",
+        {"op": "explode", "label": "Имя"},
+        {"op": "modify", "label": "  "},
+        {"op": "modify", "label": "Имя"},
+    ])
+
+    assert [item["value"] for item in merged] == ["Иван", "3 года", "Python, SQL"]
+    assert applied == 0
+    assert len(report) == 4
+
+
+class _ScriptedNeuralService(NeuralService):
+    """NeuralService whose model answers are scripted, one per _call_api call."""
+
+    def __init__(self, answers):
+        super().__init__(settings)
+        self.answers = list(answers)
+        self.calls = 0
+
+    async def _call_api(self, *args, **kwargs):
+        self.calls += 1
+        return json.dumps(self.answers.pop(0), ensure_ascii=False)
+
+
+@pytest.fixture
+def delta_mode(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_UPDATE_MODE", "delta")
+
+
+FULL_UPDATE = [{"label": "Имя", "value": "Иван"}, {"label": "Опыт работы", "value": "5 лет"}]
+
+
+@pytest.mark.anyio
+async def test_update_applies_operations(delta_mode):
+    service = _ScriptedNeuralService([{"operations": [{"op": "modify", "label": "Опыт работы", "value": "5 лет"}]}])
+
+    result = await service.update_resume(CURRENT, "Опыт теперь 5 лет")
+
+    assert result[1] == {"label": "Опыт работы", "value": "5 лет"}
+    assert service.calls == 1
+
+
+@pytest.mark.anyio
+async def test_update_with_no_applicable_operation_falls_back_to_full_update(delta_mode):
+    service = _ScriptedNeuralService([
+        {"operations": [{"op": "explode", "label": "Опыт работы"}, {"op": "delete", "label": "Хобби"}]},
+        FULL_UPDATE,
+    ])
+
+    result = await service.update_resume(CURRENT, "Опыт теперь 5 лет")
+
+    assert result == FULL_UPDATE
+    assert service.calls == 2
+
+
+@pytest.mark.anyio
+async def test_update_answered_with_label_value_items_uses_them_as_the_full_update(delta_mode):
+    service = _ScriptedNeuralService([FULL_UPDATE])
+
+    result = await service.update_resume(CURRENT, "Опыт теперь 5 лет")
+
+    assert result == FULL_UPDATE
+    assert service.calls == 1
+
+
+@pytest.mark.anyio
+async def test_update_with_empty_operations_keeps_the_data(delta_mode):
+    service = _ScriptedNeuralService([{"operations": []}])
+
+    result = await service.update_resume(CURRENT, "Ничего не меняй")
+
+    assert [item["label"] for item in result] == ["Имя", "Опыт работы", "Навыки"]
+    assert service.calls == 1
@@ -0,0 +1,116 @@
+import asyncio
+
+import pytest
+
+from ai_service.config import settings
+from ai_service.services.session_store import InterviewSession, MemorySessionStore, TarantoolSessionStore
+from benchmarks.fake_tarantool import FakeTarantool
+
+RESUME_DATA = [{"label": "Навыки", "value": ["Python", "FastAPI"]}]
+
+
+@pytest.fixture(params=["memory", "tarantool"])
+def make_store(request, monkeypatch):
+    """Builds stores of the parametrized kind; Tarantool stores made by one call share a FakeTarantool (like replicas)."""
+    connection = FakeTarantool(latency=0.001)
+
+    def make(ttl: float = 60.0):
+        monkeypatch.setattr(settings, "SESSION_TTL", ttl)
+        if request.param == "memory":
+            return MemorySessionStore(settings)
+        return TarantoolSessionStore(settings, connection=connection)
+    return make
+
+
+@pytest.mark.anyio
+async def test_create_load_save_round_trip(make_store):
+    store = make_store()
+    session = await store.create("user-1", {"Как вас зовут?": "Иван"})
+
+    loaded = await store.get(session.session_id)
+    loaded.answers["Опыт работы?"] = "5 лет"
+    loaded.questions = ["Какие проекты?"]
+    loaded.resume_data = RESUME_DATA
+    await store.save(loaded)
+
+    again = await store.get(session.session_id)
+    assert again.to_dict() == loaded.to_dict()
+    assert again.owner == "user-1"
+    assert again.answers == {"Как вас зовут?": "Иван", "Опыт работы?": "5 лет"}
+
+
+@pytest.mark.anyio
+async def test_loaded_sessions_are_independent_copies(make_store):
+    store = make_store()
+    session = await store.create("user-1", {"Как вас зовут?": "Иван"})
+
+    loaded = await store.get(session.session_id)
+    loaded.answers["Опыт работы?"] = "5 лет"
+
+    assert (await store.get(session.session_id)).answers == {"Как вас зовут?": "Иван"}
+
+
+@pytest.mark.anyio
+async def test_delete_and_missing_session(make_store):
+    store = make_store()
+    session = await store.create("user-1")
+
+    await store.delete(session.session_id)
+
+    assert await store.get(session.session_id) is None
+    assert await store.get("no-such-session") is None
+
+
+@pytest.mark.anyio
+async def test_sessions_expire_after_ttl_and_save_extends_it(make_store):
+    store = make_store(ttl=0.1)
+    kept = await store.create("user-1")
+    expired = await store.create("user-1")
+
+    await asyncio.sleep(0.06)
+    await store.save(await store.get(kept.session_id))
+    await asyncio.sleep(0.06)
+
+    assert await store.get(expired.session_id) is None
+    assert await store.get(kept.session_id) is not None
+
+
+@pytest.mark.anyio
+async def test_concurrent_merges_under_the_session_lock_keep_every_answer(make_store):
+    store = make_store()
+    session = await store.create("user-1")
+
+    async def add_answer(i: int) -> None:
+        async with store.lock(session.session_id):
+            current = await store.get(session.session_id)
+            await asyncio.sleep(0)
+            current.answers[f"Вопрос {i}"] = f"Ответ {i}"
+            await store.save(current)
+
+    await asyncio.gather(*(add_answer(i) for i in range(20)))
+
+    assert len((await store.get(session.session_id)).answers) == 20
+
+
+@pytest.mark.anyio
+async def test_session_lock_is_process_local(monkeypatch):
+    """Two replicas on one Tarantool space: their locks do not exclude each other and the last save wins."""
+    monkeypatch.setattr(settings, "SESSION_TTL", 60.0)
+    connection = FakeTarantool(latency=0.001)
+    replicas = [TarantoolSessionStore(settings, connection=connection) for _ in range(2)]
+    session = await replicas[0].create("user-1")
+
+    async def add_answer(store: TarantoolSessionStore, question: str) -> None:
+        async with store.lock(session.session_id):
+            current = await store.get(session.session_id)
+            current.answers[question] = "да"
+            await store.save(current)
+
+    await asyncio.gather(add_answer(replicas[0], "Первый?"), add_answer(replicas[1], "Второй?"))
+
+    assert len((await replicas[0].get(session.session_id)).answers) == 1
+
+
+def test_session_from_dict_round_trip():
+    session = InterviewSession("s1", "user-1", answers={"a": "b"}, resume_data=RESUME_DATA)
+    assert InterviewSession.from_dict(session.to_dict()).to_dict() == session.to_dict()
@@ -0,0 +1,78 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from ai_service.config import settings
+from ai_service.services.http_clients import http_clients
+from ai_service.services.llm_cache import LLMResponseCache
+from ai_service.services.llm_scheduler import LLMScheduler, Priority
+from ai_service.services.neural_1 import NeuralService
+from ai_service.services.speculation import SpeculativeExtractions
+
+ANSWERS = {"Как вас зовут?": "Иван", "Опыт работы?": "5 лет"}
+RESULT = [{"label": "Имя", "value": "Иван"}]
+
+
+@pytest.fixture
+def service(monkeypatch):
+    """A NeuralService with its own scheduler (one slot) and an upstream that records what it receives."""
+    monkeypatch.setattr(settings, "LLM_MAX_CONCURRENCY", 1)
+    monkeypatch.setattr(settings, "LLM_QUEUE_TIMEOUT", 0)
+    monkeypatch.setattr(settings, "SPECULATIVE_EXTRACTION", True)
+    monkeypatch.setattr(settings, "LLM_CACHE_DB_PATH", "")
+    received = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        received.append(json.loads(request.content))
+        content = json.dumps(RESULT, ensure_ascii=False)
+        return httpx.Response(200, json={"choices": [{"message": {"content": content}, "finish_reason": "stop"}]})
+
+    monkeypatch.setitem(http_clients._clients, "llm", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    neural = NeuralService(settings, cache=LLMResponseCache(settings), scheduler=LLMScheduler(settings))
+    neural.received = received
+    return neural
+
+
+def _speculate(speculations: SpeculativeExtractions, neural: NeuralService) -> bool:
+    return speculations.start(
+        "user:1", ANSWERS, lambda: neural.process_answers(ANSWERS, use_cache=False, priority=Priority.BACKGROUND, coalesce=False)
+    )
+
+
+async def _settle() -> None:
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.anyio
+async def test_preempted_speculation_dispatches_nothing(service):
+    speculations = SpeculativeExtractions(settings)
+    await service.scheduler.acquire(Priority.INTERACTIVE)  # foreground work holds the only slot
+    assert _speculate(speculations, service)
+    await _settle()
+    assert service.scheduler.queue_depth == 1
+
+    assert await speculations.lookup("user:1", ANSWERS) is None
+    await _settle()
+    service.scheduler.release()
+    await _settle()
+
+    assert speculations.counters["preempted"] == 1
+    assert service.scheduler.queue_depth == 0
+    assert service.scheduler.counters["dispatched"] == 1  # only the foreground acquire
+    assert service.received == []
+
+
+@pytest.mark.anyio
+async def test_dispatched_speculation_is_awaited_and_reused(service):
+    speculations = SpeculativeExtractions(settings)
+    assert _speculate(speculations, service)
+    await _settle()  # got its slot right away
+
+    result = await speculations.lookup("user:1", {**ANSWERS, "Навыки?": "Python"})
+
+    assert result == (RESULT, {"Навыки?": "Python"})
+    assert speculations.counters["superset_hits"] == 1
+    assert len(service.received) == 1